@@ -1,12 +1,30 @@
 from fastapi import FastAPI
+import asyncio
 import os
+import time
 from dotenv import load_dotenv
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
+from starlette.concurrency import run_in_threadpool
 from ollama_client import create_client, close_client
+import chroma_db
 from ingest import ingest_docs
-from api.routes import chat, rag, docs, jobfit_route, resume_analyze, interview, trend, custom
+from api.routes import chat, rag, docs, jobfit_route, resume_analyze, interview, trend, custom, metrics, admin
 from api.db.redis import get_redis_client  # 새 모듈 임포트
+from api.db.mysql import init_mysql_pool, close_mysql_pool, get_mysql_pool
+from api.services.job_trend_agg import job_trend_agg
+from api.services.job_index import job_index
+from api.services.job_vectors import job_vectors
+from api.services.upload import UploadLimitMiddleware, UPLOAD_BULK_MAX_BYTES, start_upload_sweeper, stop_upload_sweeper
+from api.services.ocr import JD_OCR_ENABLED, close_image_client
+from api.services.html_parse import PARSER_MODULES
+from api.services.image_prep import IMAGE_MODULES
+from api.services.pdf_parse import PDF_MODULES
+from api.rag.rag import get_chroma
+from api.services.workers import warm_process_pool, shutdown_process_pool
+from api.services.bulk_crawl import cancel_bulk_crawl
+from api.llm.models import model_manager
+from api.metrics import REQUEST_LATENCY, REQUESTS_IN_FLIGHT
 
 load_dotenv()
 
@@ -18,6 +36,22 @@ async def lifespan(app: FastAPI):
     print("🔥 FastAPI STARTUP: create_client()", flush=True)
     await create_client()
 
+    # 서로 독립적인 초기화는 동시에 진행 (시작 시간 = 가장 느린 단계)
+    # - 채팅 / 임베딩 (+ OCR 사용 시 VLM) 모델 미리 로드 후 상주 감시
+    # - Chroma 연결 (재시도, 실패해도 첫 사용 시 다시 연결)
+    # - HTML 파싱 / PDF 추출 / 이미지 전처리 워커 프로세스 기동 + 라이브러리 import
+    print("🔥 FastAPI STARTUP: 모델 warm-up / Chroma / CPU 워커 풀", flush=True)
+    await asyncio.gather(
+        model_manager.start(),
+        chroma_db.connect(),
+        run_in_threadpool(get_chroma),
+        warm_process_pool(
+            "api.services.html_parse", *PARSER_MODULES,
+            "api.services.pdf_parse", *PDF_MODULES,
+            *(["api.services.image_prep", *IMAGE_MODULES] if JD_OCR_ENABLED else []),
+        ),
+    )
+
     print("🔥 FastAPI STARTUP: ingest_docs()", flush=True)
     if(INGEST_ON_STARTUP == "true"):
         await ingest_docs()
@@ -26,15 +60,41 @@ async def lifespan(app: FastAPI):
     print("🔥 FastAPI STARTUP: Redis 연결", flush=True)
     await get_redis_client()  # 연결 테스트 포함
 
+    # MySQL 풀은 앱 전체에서 1개만 사용
+    print("🔥 FastAPI STARTUP: MySQL pool", flush=True)
+    await init_mysql_pool()
+
+    # job_trend 키워드 빈도 집계 + 주기적 증분 갱신
+    print("🔥 FastAPI STARTUP: job_trend 집계", flush=True)
+    await job_trend_agg.start(get_mysql_pool)
+
+    # /custom/match 용 공고 역색인
+    print("🔥 FastAPI STARTUP: job_trend 색인", flush=True)
+    await job_index.start(get_mysql_pool)
+    job_vectors.start()  # 공고 임베딩은 백그라운드 증분 동기화
+
+    # uploads/ 보존 기간 지난 파일 정리
+    start_upload_sweeper()
+
     yield
 
     print("🔥 FastAPI SHUTDOWN: close_client()", flush=True)
+    await model_manager.stop()
     await close_client()
     
     redis_client = await get_redis_client()
     if redis_client:
         await redis_client.aclose()
 
+    await cancel_bulk_crawl()
+    await close_image_client()
+    await stop_upload_sweeper()
+    await job_trend_agg.stop()
+    await job_vectors.stop()
+    await job_index.stop()
+    await close_mysql_pool()
+    shutdown_process_pool()
+
 
 
 app = FastAPI(
@@ -42,6 +102,9 @@ app = FastAPI(
     lifespan=lifespan
 )
 
+# 업로드 본문 크기 제한 (CORS 안쪽에 둬서 413 응답에도 CORS 헤더가 붙도록)
+app.add_middleware(UploadLimitMiddleware, path_limits={"/resume/screen": UPLOAD_BULK_MAX_BYTES})
+
 # -----------------------
 # CORS 설정
 # -----------------------
@@ -58,6 +121,48 @@ app.add_middleware(
 )
 
 
+# -----------------------
+# 라우트별 지연/in-flight 계측
+# -----------------------
+class RequestMetricsMiddleware:
+    """
+    ASGI 미들웨어로 구현 (@app.middleware("http") 는 receive 를 감싸서
+    라우트에서 request.is_disconnected() 로 클라이언트 연결 끊김을 알 수 없음)
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] == "/metrics":
+            return await self.app(scope, receive, send)
+
+        start = time.perf_counter()
+        REQUESTS_IN_FLIGHT.inc()
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            REQUESTS_IN_FLIGHT.dec()
+            # 경로 파라미터로 라벨이 폭증하지 않도록 라우트 템플릿 사용
+            route = scope.get("route")
+            route_path = getattr(route, "path", "unmatched")
+            REQUEST_LATENCY.labels(route_path, scope["method"], str(status)).observe(
+                time.perf_counter() - start
+            )
+
+
+app.add_middleware(RequestMetricsMiddleware)
+
+
+app.include_router(metrics.router, prefix="")
 app.include_router(chat.router, prefix="/chat")
 app.include_router(jobfit_route.router, prefix="")
 # app.include_router(rag.router, prefix="/mcp/tools")
@@ -66,3 +171,4 @@ app.include_router(resume_analyze.router, prefix="/resume")
 app.include_router(interview.router, prefix="/interview")
 app.include_router(trend.router, prefix="/trend")
 app.include_router(custom.router, prefix="/custom")
+app.include_router(admin.router, prefix="/admin")
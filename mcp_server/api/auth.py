@@ -0,0 +1,23 @@
+# api/auth.py
+"""
+관리자 API 인증 (X-Admin-Token 헤더)
+
+- ADMIN_TOKEN 이 설정되지 않았으면 관리자 API 는 꺼진 상태 → 503 (열어두지 않음)
+- 헤더가 없거나 다르면 403
+"""
+from __future__ import annotations
+
+import os
+import secrets
+
+from fastapi import Header, HTTPException
+
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+
+
+def require_admin(x_admin_token: str | None = Header(None)) -> None:
+    """라우트 dependency: Depends(require_admin)"""
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=503, detail="관리자 API 가 비활성화되어 있습니다. (ADMIN_TOKEN 미설정)")
+    if not x_admin_token or not secrets.compare_digest(x_admin_token, ADMIN_TOKEN):
+        raise HTTPException(status_code=403, detail="관리자 토큰이 올바르지 않습니다.")
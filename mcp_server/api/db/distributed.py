@@ -0,0 +1,355 @@
+# api/db/distributed.py
+"""
+멀티 워커(WEB_CONCURRENCY > 1) 공유 상태: Redis 기반 세마포어 / 토큰 버킷 / 리더 락
+
+- 워커가 1개(기본)거나 Redis 를 쓸 수 없으면 프로세스 안의 asyncio 구현으로 동작 (기존 동작과 동일)
+- 세마포어: 보유자 토큰을 ZSET 에 (만료 시각 → 토큰) 으로 저장, 보유 중에는 lease 를 주기적으로 연장
+  → 워커가 죽어도 lease 가 지나면 자리가 풀림
+- 토큰 버킷: HASH(tokens, ts), 시간은 Redis TIME 기준 (워커 / 호스트 간 시계 차이 영향 없음)
+- 리더 락: SET NX PX + 소유자 확인 후 연장 / 해제 → 주기 작업을 워커 1곳에서만 실행
+- 세 가지 모두 Lua 스크립트 1회 호출로 원자적으로 처리
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import random
+import time
+import uuid
+from contextlib import asynccontextmanager
+
+from api.db.redis import get_redis_client
+from api.metrics import DISTRIBUTED_WAIT
+
+# uvicorn / gunicorn 이 읽는 워커 수 환경변수
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", 1))
+MULTI_WORKER = os.getenv("MULTI_WORKER", str(WEB_CONCURRENCY > 1)).lower() == "true"
+
+KEY_PREFIX = os.getenv("DISTRIBUTED_KEY_PREFIX", "mcp")
+# 세마포어 / 락 보유 lease (초): 보유 중에는 lease/3 마다 연장
+DISTRIBUTED_LEASE = float(os.getenv("DISTRIBUTED_LEASE", 30))
+# 자리가 없을 때 재시도 간격 상한 (초)
+DISTRIBUTED_MAX_POLL = float(os.getenv("DISTRIBUTED_MAX_POLL", 0.2))
+
+
+_SEM_ACQUIRE = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now)
+if redis.call('ZCARD', KEYS[1]) < tonumber(ARGV[2]) then
+  redis.call('ZADD', KEYS[1], now + tonumber(ARGV[3]), ARGV[1])
+  redis.call('PEXPIRE', KEYS[1], ARGV[3])
+  return 1
+end
+return 0
+"""
+
+_SEM_RENEW = """
+if not redis.call('ZSCORE', KEYS[1], ARGV[1]) then
+  return 0
+end
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+redis.call('ZADD', KEYS[1], now + tonumber(ARGV[2]), ARGV[1])
+redis.call('PEXPIRE', KEYS[1], ARGV[2])
+return 1
+"""
+
+_BUCKET = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local v = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(v[1]) or burst
+local ts = tonumber(v[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+local wait = 0
+if tokens >= 1 then
+  tokens = tokens - 1
+else
+  wait = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil(burst / rate * 1000) + 1000)
+return tostring(wait)
+"""
+
+_LOCK_RENEW = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+  return redis.call('PEXPIRE', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+_LOCK_RELEASE = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+  return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+_warned: set[str] = set()
+
+
+async def _redis_or_none(kind: str, name: str):
+    """멀티 워커 모드에서만 Redis 사용, 연결이 없으면 (한 번만 경고하고) 프로세스 로컬로"""
+    if not MULTI_WORKER:
+        return None
+    client = await get_redis_client()
+    if client is None and name not in _warned:
+        _warned.add(name)
+        print(f"⚠️ Redis 없음 → {kind} [{name}] 를 워커 단위로만 적용", flush=True)
+    return client
+
+
+def _key(kind: str, name: str) -> str:
+    return f"{KEY_PREFIX}:{kind}:{name}"
+
+
+class _Renewer:
+    """lease 를 주기적으로 연장하는 백그라운드 태스크"""
+
+    def __init__(self, renew, lease: float, label: str):
+        self._renew = renew
+        self._lease = lease
+        self._label = label
+        self._task = asyncio.create_task(self._loop())
+
+    async def _loop(self) -> None:
+        while True:
+            await asyncio.sleep(self._lease / 3)
+            try:
+                if not await self._renew():
+                    print(f"⚠️ lease 만료됨 [{self._label}]", flush=True)
+                    return
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"⚠️ lease 연장 실패 [{self._label}]: {e}", flush=True)
+
+    def stop(self) -> None:
+        self._task.cancel()
+
+
+# -----------------------
+# 세마포어
+# -----------------------
+class DistributedSemaphore:
+    def __init__(self, name: str, limit: int, *, lease: float = DISTRIBUTED_LEASE):
+        self.name = name
+        self.limit = max(1, limit)
+        self.lease = lease
+        self._key = _key("sem", name)
+        self._local = asyncio.Semaphore(self.limit)
+
+    @asynccontextmanager
+    async def hold(self, *, poll: float = 0.02):
+        """
+        async with ocr_semaphore.hold():
+            ...
+        poll: 첫 재시도 간격 (짧을수록 빨리 자리를 잡음 → 우선순위가 높은 호출에 작게)
+        """
+        redis = await _redis_or_none("세마포어", self.name)
+        if redis is None:
+            async with self._local:
+                yield
+            return
+
+        token = uuid.uuid4().hex
+        lease_ms = int(self.lease * 1000)
+        start = time.monotonic()
+        delay = poll
+        acquired = False
+        try:
+            while not await redis.eval(_SEM_ACQUIRE, 1, self._key, token, self.limit, lease_ms):
+                await asyncio.sleep(delay * random.uniform(0.5, 1.5))
+                delay = min(delay * 2, DISTRIBUTED_MAX_POLL)
+            acquired = True
+        except asyncio.CancelledError:
+            # 자리를 받은 응답 직전에 취소됐을 수 있으므로 토큰 제거 (없으면 무시됨)
+            await asyncio.shield(redis.zrem(self._key, token))
+            raise
+        except Exception as e:
+            # Redis 장애 시 요청을 막지 않고 워커 단위 제한으로
+            print(f"⚠️ 분산 세마포어 실패 [{self.name}] → 로컬: {e}", flush=True)
+
+        if not acquired:
+            async with self._local:
+                yield
+            return
+        DISTRIBUTED_WAIT.labels("semaphore", self.name).observe(time.monotonic() - start)
+
+        async def _renew() -> bool:
+            return bool(await redis.eval(_SEM_RENEW, 1, self._key, token, lease_ms))
+
+        renewer = _Renewer(_renew, self.lease, f"sem:{self.name}")
+        try:
+            yield
+        finally:
+            renewer.stop()
+            try:
+                await redis.zrem(self._key, token)
+            except Exception as e:
+                print(f"⚠️ 분산 세마포어 반납 실패 [{self.name}]: {e}", flush=True)
+
+
+# -----------------------
+# 토큰 버킷
+# -----------------------
+class RateLimiter:
+    """토큰 버킷 (초당 rate 회, 최대 burst 회 연속 허용) - 프로세스 로컬"""
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._last = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        if self.rate <= 0:
+            return
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class DistributedRateLimiter:
+    """모든 워커가 같은 버킷을 공유하는 토큰 버킷 (멀티 워커가 아니면 RateLimiter 와 같음)"""
+
+    def __init__(self, name: str, rate: float, burst: int = 1):
+        self.name = name
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._key = _key("rate", name)
+        self._local = RateLimiter(rate, burst)
+
+    async def acquire(self) -> None:
+        if self.rate <= 0:
+            return
+        redis = await _redis_or_none("rate limit", self.name)
+        if redis is None:
+            await self._local.acquire()
+            return
+
+        start = time.monotonic()
+        try:
+            while True:
+                wait = float(await redis.eval(_BUCKET, 1, self._key, self.rate, self.burst))
+                if wait <= 0:
+                    break
+                await asyncio.sleep(wait * random.uniform(1.0, 1.2))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"⚠️ 분산 rate limit 실패 [{self.name}] → 로컬: {e}", flush=True)
+            await self._local.acquire()
+            return
+        DISTRIBUTED_WAIT.labels("rate", self.name).observe(time.monotonic() - start)
+
+
+# -----------------------
+# 리더 락
+# -----------------------
+class LeaderLock:
+    """
+    워커 중 1곳만 잡을 수 있는 락 (보유 중 자동 연장)
+    멀티 워커가 아니면 프로세스 안에서만 배타적
+    """
+
+    def __init__(self, name: str, *, lease: float = DISTRIBUTED_LEASE):
+        self.name = name
+        self.lease = lease
+        self._key = _key("lock", name)
+        self._token: str | None = None
+        self._renewer: _Renewer | None = None
+
+    @property
+    def held(self) -> bool:
+        return self._token is not None
+
+    async def acquire(self) -> bool:
+        """기다리지 않음: 잡았으면 True"""
+        if self._token is not None:
+            return False
+        redis = await _redis_or_none("리더 락", self.name)
+        token = uuid.uuid4().hex
+        if redis is not None:
+            lease_ms = int(self.lease * 1000)
+            try:
+                if not await redis.set(self._key, token, nx=True, px=lease_ms):
+                    return False
+            except Exception as e:
+                print(f"⚠️ 리더 락 실패 [{self.name}] → 로컬: {e}", flush=True)
+                redis = None
+
+        self._token = token
+        if redis is not None:
+            async def _renew() -> bool:
+                return bool(await redis.eval(_LOCK_RENEW, 1, self._key, token, lease_ms))
+
+            self._renewer = _Renewer(_renew, self.lease, f"lock:{self.name}")
+        return True
+
+    async def release(self) -> None:
+        token, self._token = self._token, None
+        if self._renewer is not None:
+            self._renewer.stop()
+            self._renewer = None
+            redis = await get_redis_client()
+            if token and redis is not None:
+                try:
+                    await redis.eval(_LOCK_RELEASE, 1, self._key, token)
+                except Exception as e:
+                    print(f"⚠️ 리더 락 해제 실패 [{self.name}]: {e}", flush=True)
+
+    @asynccontextmanager
+    async def try_hold(self):
+        """async with lock.try_hold() as leader: if leader: ..."""
+        acquired = await self.acquire()
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                await self.release()
+
+
+# -----------------------
+# 워커 간 공유 JSON 값 (상태 조회용)
+# -----------------------
+async def shared_set(name: str, value: str, *, ttl: int = 86400) -> None:
+    redis = await _redis_or_none("공유 상태", name)
+    if redis is None:
+        return
+    try:
+        await redis.set(_key("state", name), value, ex=ttl)
+    except Exception as e:
+        print(f"⚠️ 공유 상태 저장 실패 [{name}]: {e}", flush=True)
+
+
+async def shared_get(name: str) -> str | None:
+    redis = await _redis_or_none("공유 상태", name)
+    if redis is None:
+        return None
+    try:
+        return await redis.get(_key("state", name))
+    except Exception as e:
+        print(f"⚠️ 공유 상태 조회 실패 [{name}]: {e}", flush=True)
+        return None
+
+
+async def shared_delete(name: str) -> None:
+    redis = await _redis_or_none("공유 상태", name)
+    if redis is None:
+        return
+    try:
+        await redis.delete(_key("state", name))
+    except Exception as e:
+        print(f"⚠️ 공유 상태 삭제 실패 [{name}]: {e}", flush=True)
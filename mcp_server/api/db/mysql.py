@@ -3,6 +3,7 @@ import asyncio
 
 import os
 from dotenv import load_dotenv
+from api.metrics import track_call
 
 load_dotenv()  # .env 로드 (필요 시)
 
@@ -12,9 +13,29 @@ MYSQL_USER = os.getenv("MYSQL_USER")
 MYSQL_PASSWORD = os.getenv("MYSQL_PASSWORD")
 MYSQL_DB = os.getenv("MYSQL_DB")
 
-async def get_mysql_pool():
-    try:
-        pool = await mysql.create_pool(
+# 커넥션 풀 설정
+MYSQL_POOL_MINSIZE = int(os.getenv("MYSQL_POOL_MINSIZE", 1))
+MYSQL_POOL_MAXSIZE = int(os.getenv("MYSQL_POOL_MAXSIZE", 10))
+MYSQL_POOL_RECYCLE = int(os.getenv("MYSQL_POOL_RECYCLE", 3600))        # 초, 오래된 커넥션 재생성
+MYSQL_HEALTHCHECK_INTERVAL = float(os.getenv("MYSQL_HEALTHCHECK_INTERVAL", 30))
+MYSQL_CONNECT_RETRIES = int(os.getenv("MYSQL_CONNECT_RETRIES", 3))
+
+_pool = None  # lifespan 에서 생성되는 전역 풀
+_health_task: asyncio.Task | None = None
+_pool_lock = asyncio.Lock()
+
+
+class _InstrumentedCursor(mysql.Cursor):
+    """쿼리마다 호출 수 / 에러 / in-flight 계측"""
+
+    async def execute(self, query, args=None):
+        with track_call("mysql", "query"):
+            return await super().execute(query, args)
+
+
+async def _create_pool():
+    with track_call("mysql", "connect"):
+        return await mysql.create_pool(
             host=MYSQL_HOST,
             port=MYSQL_PORT,
             user=MYSQL_USER,
@@ -22,9 +43,99 @@ async def get_mysql_pool():
             db=MYSQL_DB,
             autocommit=True,
             charset="utf8mb4",
+            minsize=MYSQL_POOL_MINSIZE,
+            maxsize=MYSQL_POOL_MAXSIZE,
+            pool_recycle=MYSQL_POOL_RECYCLE,
+            cursorclass=_InstrumentedCursor,
         )
-        print("✅ MySQL 연결 성공!")
-        return pool
+
+
+async def init_mysql_pool(retries: int = MYSQL_CONNECT_RETRIES):
+    """
+    lifespan 시작 시 1회 호출
+    - 풀 생성 (실패 시 backoff 재시도)
+    - 주기적 health check task 시작
+    """
+    global _pool, _health_task
+
+    async with _pool_lock:
+        if _pool is None:
+            for attempt in range(1, retries + 1):
+                try:
+                    _pool = await _create_pool()
+                    print(
+                        f"✅ MySQL 연결 성공! (pool {MYSQL_POOL_MINSIZE}~{MYSQL_POOL_MAXSIZE})",
+                        flush=True,
+                    )
+                    break
+                except Exception as e:
+                    print(f"❌ MySQL 연결 실패 ({attempt}/{retries}): {e}", flush=True)
+                    if attempt < retries:
+                        await asyncio.sleep(min(2 ** attempt, 10))
+
+    if _pool is not None and _health_task is None and MYSQL_HEALTHCHECK_INTERVAL > 0:
+        _health_task = asyncio.create_task(_health_check_loop())
+
+    return _pool
+
+
+async def close_mysql_pool():
+    global _pool, _health_task
+
+    if _health_task is not None:
+        _health_task.cancel()
+        try:
+            await _health_task
+        except asyncio.CancelledError:
+            pass
+        _health_task = None
+
+    if _pool is not None:
+        _pool.close()
+        await _pool.wait_closed()
+        _pool = None
+        print("🔌 MySQL pool closed", flush=True)
+
+
+async def check_mysql_health() -> bool:
+    if _pool is None:
+        return False
+    try:
+        async with _pool.acquire() as conn:
+            await conn.ping(reconnect=True)
+        return True
     except Exception as e:
-        print(f"❌ MySQL 연결 실패: {e}")
-        return None
\ No newline at end of file
+        print(f"⚠️ MySQL health check 실패: {e}", flush=True)
+        return False
+
+
+async def _health_check_loop():
+    global _pool
+
+    while True:
+        await asyncio.sleep(MYSQL_HEALTHCHECK_INTERVAL)
+        if await check_mysql_health():
+            continue
+
+        # 풀이 망가졌으면 새로 만든다
+        async with _pool_lock:
+            old, _pool = _pool, None
+        if old is not None:
+            old.close()
+        try:
+            async with _pool_lock:
+                if _pool is None:
+                    _pool = await _create_pool()
+            print("♻️ MySQL pool 재생성 완료", flush=True)
+        except Exception as e:
+            print(f"❌ MySQL pool 재생성 실패: {e}", flush=True)
+
+
+async def get_mysql_pool():
+    """
+    공유 풀 반환
+    lifespan 밖(스크립트 등)에서 호출되면 이때 생성
+    """
+    if _pool is None:
+        return await init_mysql_pool(retries=1)
+    return _pool
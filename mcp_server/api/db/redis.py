@@ -2,19 +2,30 @@
 import os
 import redis.asyncio as redis
 from dotenv import load_dotenv
+from api.metrics import track_call
 
 load_dotenv()  # .env 로드 (필요 시)
 
 REDIS_URL = os.getenv("REDIS_URL", "redis://host.docker.internal:6379/0")
 _redis_client = None  # lazy initialization
 
+
+class _InstrumentedRedis(redis.Redis):
+    """모든 Redis 명령에 호출 수 / 에러 / in-flight 계측"""
+
+    async def execute_command(self, *args, **options):
+        op = str(args[0]).lower() if args else "unknown"
+        with track_call("redis", op):
+            return await super().execute_command(*args, **options)
+
+
 async def get_redis_client():
     global _redis_client
     if _redis_client:
         return _redis_client
 
     try:
-        client = redis.from_url(REDIS_URL, decode_responses=True)
+        client = _InstrumentedRedis.from_url(REDIS_URL, decode_responses=True)
         await client.ping()
         print("✅ Redis 연결 성공")
         _redis_client = client
@@ -0,0 +1,116 @@
+# api/llm/batcher.py
+"""
+요청 간 임베딩 마이크로배치
+
+여러 요청이 동시에 보내는 단건 임베딩을 우선순위 클래스별로 잠깐(max_wait) 모았다가
+한 번의 배치 호출로 보내고, 결과 벡터를 기다리던 호출자들에게 나눠준다.
+
+- max_batch 개가 모이면 즉시 전송, 아니면 첫 요청 후 max_wait 초가 지나면 전송
+- 같은 배치 안의 중복 텍스트는 한 번만 전송
+- 배치 호출은 클래스별로 따로 → 스케줄러 슬롯은 해당 우선순위로 1개만 점유
+- 호출자가 취소되면 결과만 버림 (배치 자체는 다른 호출자를 위해 계속 진행)
+- 배치가 한 세션의 요청으로만 이뤄지면 그 세션으로, 여러 세션이 섞이면 세션 없이 전송
+  (한 세션이 다른 세션의 임베딩 비용까지 WFQ 에서 떠안지 않도록)
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+from typing import Awaitable, Callable
+
+from api.llm.scheduler import PRIORITIES, BATCH
+from api.metrics import EMBED_BATCH_SIZE, EMBED_BATCH_LINGER
+
+EMBED_BATCH_MAX_SIZE = int(os.getenv("EMBED_BATCH_MAX_SIZE", 32))
+EMBED_BATCH_MAX_WAIT_MS = float(os.getenv("EMBED_BATCH_MAX_WAIT_MS", 5))
+
+# send(texts, priority, session_id) → texts 와 같은 순서의 벡터 목록
+SendBatch = Callable[[list[str], str, "str | None"], Awaitable[list[list[float]]]]
+
+
+class _Item:
+    __slots__ = ("text", "session_id", "future")
+
+    def __init__(self, text: str, session_id: str | None, future: asyncio.Future):
+        self.text = text
+        self.session_id = session_id
+        self.future = future
+
+
+class EmbedBatcher:
+    def __init__(
+        self,
+        send: SendBatch,
+        max_batch: int = EMBED_BATCH_MAX_SIZE,
+        max_wait: float = EMBED_BATCH_MAX_WAIT_MS / 1000,
+    ):
+        self._send = send
+        self.max_batch = max(1, max_batch)
+        self.max_wait = max(0.0, max_wait)
+        self._pending: dict[str, list[_Item]] = {p: [] for p in PRIORITIES}
+        self._opened_at: dict[str, float] = {}
+        self._timers: dict[str, asyncio.TimerHandle] = {}
+        self._tasks: set[asyncio.Task] = set()
+        self.stats = {"requests": 0, "batches": 0, "inputs": 0}
+
+    async def embed(self, text: str, *, priority: str = BATCH, session_id: str | None = None) -> list[float]:
+        if priority not in PRIORITIES:
+            priority = BATCH
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        queue = self._pending[priority]
+        queue.append(_Item(text, session_id, future))
+        self.stats["requests"] += 1
+
+        if len(queue) >= self.max_batch:
+            self._flush(priority)
+        elif len(queue) == 1:
+            self._opened_at[priority] = time.monotonic()
+            self._timers[priority] = loop.call_later(self.max_wait, self._flush, priority)
+
+        return await future
+
+    def _flush(self, priority: str) -> None:
+        timer = self._timers.pop(priority, None)
+        if timer is not None:
+            timer.cancel()
+
+        items = [item for item in self._pending[priority] if not item.future.done()]
+        self._pending[priority] = []
+        opened_at = self._opened_at.pop(priority, None)
+        if not items:
+            return
+        if opened_at is not None:
+            EMBED_BATCH_LINGER.labels(priority).observe(time.monotonic() - opened_at)
+
+        task = asyncio.get_running_loop().create_task(self._run(priority, items))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, priority: str, items: list[_Item]) -> None:
+        texts = list(dict.fromkeys(item.text for item in items))
+        EMBED_BATCH_SIZE.labels(priority).observe(len(texts))
+        self.stats["batches"] += 1
+        self.stats["inputs"] += len(texts)
+
+        sessions = {item.session_id for item in items}
+        session_id = sessions.pop() if len(sessions) == 1 else None
+        try:
+            vectors = await self._send(texts, priority, session_id)
+        except BaseException as e:
+            for item in items:
+                if not item.future.done():
+                    if isinstance(e, asyncio.CancelledError):
+                        item.future.cancel()
+                    else:
+                        item.future.set_exception(e)
+            if not isinstance(e, Exception):
+                raise
+            return
+
+        by_text = dict(zip(texts, vectors))
+        for item in items:
+            if not item.future.done():
+                item.future.set_result(by_text[item.text])
@@ -0,0 +1,92 @@
+# api/llm/cancel.py
+"""
+클라이언트 연결 끊김 / 시간 초과 시 LLM 호출 취소
+
+- asyncio.wait_for 로 기다리기만 포기하면 Ollama 는 num_predict 까지 계속 생성하므로
+  LLM 호출을 태스크로 돌리면서 request.is_disconnected() 를 주기적으로 확인
+- 연결이 끊기거나 timeout 이 지나면 태스크를 취소
+  → ollama_chat 의 스트리밍 응답(httpx)이 닫히고 Ollama 도 생성을 멈춤
+  → 스케줄러 대기열에 있던 요청은 슬롯을 받기 전에 빠짐
+- 중단 건수는 route / reason 별로 기록 (mcp_llm_abandoned_total)
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+from typing import Awaitable, TypeVar
+
+from fastapi import HTTPException, Request
+
+from api.metrics import LLM_ABANDONED
+
+T = TypeVar("T")
+
+# 연결 끊김 확인 주기 (초)
+DISCONNECT_POLL_INTERVAL = float(os.getenv("DISCONNECT_POLL_INTERVAL", 0.5))
+# LLM 호출 기본 제한 시간 (초)
+LLM_REQUEST_TIMEOUT = float(os.getenv("LLM_REQUEST_TIMEOUT", 120))
+
+# nginx 관례: 응답 전에 클라이언트가 연결을 닫음
+CLIENT_CLOSED_REQUEST = 499
+
+
+async def wait_disconnect(request: Request) -> None:
+    while not await request.is_disconnected():
+        await asyncio.sleep(DISCONNECT_POLL_INTERVAL)
+
+
+async def _cancel(task: asyncio.Task) -> None:
+    task.cancel()
+    try:
+        await task
+    except asyncio.CancelledError:
+        pass
+    except Exception:
+        pass  # 취소 도중 난 에러는 버림 (응답할 대상이 없음)
+
+
+async def run_cancellable(
+    request: Request | None,
+    coro: Awaitable[T],
+    *,
+    route: str,
+    timeout: float | None = LLM_REQUEST_TIMEOUT,
+    timeout_detail: str = "LLM 응답이 지연되고 있습니다. 잠시 후 다시 시도해주세요.",
+) -> T:
+    """
+    coro 를 실행하다가 클라이언트 연결이 끊기면 499, timeout 이 지나면 504
+    (둘 다 coro 는 취소됨) / request 가 None 이면 timeout 만 적용
+    coro 안에서 요청 deadline 을 넘겨 TimeoutError 가 나도 504
+    (ollama_chat(deadline=...) 을 넘길 때는 timeout=None)
+    """
+    task = asyncio.ensure_future(coro)
+    watcher = asyncio.create_task(wait_disconnect(request)) if request is not None else None
+    waits = {task} if watcher is None else {task, watcher}
+
+    try:
+        done, _ = await asyncio.wait(waits, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+    except asyncio.CancelledError:
+        # 라우트 자체가 취소된 경우 (서버 종료 등)
+        await _cancel(task)
+        raise
+    finally:
+        if watcher is not None and not watcher.done():
+            watcher.cancel()
+
+    if task in done:
+        try:
+            return task.result()
+        except TimeoutError:
+            # 안쪽 deadline 초과 (생성 스트림은 이미 닫힘)
+            LLM_ABANDONED.labels(route, "timeout").inc()
+            raise HTTPException(status_code=504, detail=timeout_detail)
+
+    await _cancel(task)
+    reason = "disconnect" if watcher is not None and watcher in done else "timeout"
+    LLM_ABANDONED.labels(route, reason).inc()
+
+    if reason == "disconnect":
+        print(f"🔌 클라이언트 연결 끊김 → LLM 생성 중단 [{route}]", flush=True)
+        raise HTTPException(status_code=CLIENT_CLOSED_REQUEST, detail="client closed request")
+    print(f"⏱️ LLM 시간 초과({timeout:.0f}s) → 생성 중단 [{route}]", flush=True)
+    raise HTTPException(status_code=504, detail=timeout_detail)
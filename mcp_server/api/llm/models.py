@@ -0,0 +1,234 @@
+# api/llm/models.py
+"""
+Ollama 모델 상주(residency) 관리
+
+- 모델별 keep_alive / num_ctx 정책을 한 곳에서 관리
+  (같은 모델을 다른 num_ctx 로 부르면 Ollama 가 모델을 다시 로드하므로 모든 호출이 이 값을 사용)
+  (같은 모델을 여러 용도로 설정하면 가장 긴 keep_alive / 가장 큰 num_ctx 로 합침)
+- lifespan 시작 시 설정된 모델을 warm-up 요청으로 미리 로드
+- /api/ps 를 주기적으로 확인해 내려간 모델을 다시 올리고, 상주 상태를 메트릭으로 기록
+- 사용자 요청에서 load_duration 이 발생하면 cold load 이벤트로 기록
+"""
+from __future__ import annotations
+
+import asyncio
+import math
+import os
+import re
+import time
+
+from ollama_client import get_client
+from api.llm.prompt import OLLAMA_NUM_CTX
+from api.metrics import MODEL_COLD_LOADS, MODEL_RESIDENT, track_call, count_error
+
+OLLAMA_URL = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
+CHAT_MODEL = os.getenv("OLLAMA_CHAT_MODEL", "gemma3:4b")
+EMBED_MODEL = os.getenv("OLLAMA_EMBED_MODEL", "nomic-embed-text")
+CRAWL_MODEL = os.getenv("OLLAMA_CRAWL_MODEL", "qwen3-vl:2b")
+
+# 상주 확인 주기 (0 이면 확인 안 함)
+MODEL_WATCH_INTERVAL = float(os.getenv("MODEL_WATCH_INTERVAL", 30))
+MODEL_WARMUP_TIMEOUT = float(os.getenv("MODEL_WARMUP_TIMEOUT", 180))
+# load_duration 이 이 값(초) 이상이면 cold load 로 봄
+MODEL_COLD_LOAD_SECONDS = float(os.getenv("MODEL_COLD_LOAD_SECONDS", 0.5))
+
+
+def _keep_alive(value: str) -> int | str:
+    # "-1" / "0" → 정수 (초), "10m" / "1h" → 그대로
+    try:
+        return int(value)
+    except ValueError:
+        return value
+
+
+_DURATION_RE = re.compile(r"(\d+(?:\.\d+)?)(ms|s|m|h)")
+_DURATION_UNITS = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+
+
+def _keep_alive_seconds(value: int | str) -> float:
+    # 음수는 계속 상주 (무한대), 해석할 수 없는 값은 0 으로 봄
+    if isinstance(value, int):
+        return math.inf if value < 0 else float(value)
+    value = value.strip()
+    if value.startswith("-"):
+        return math.inf
+    return sum(float(n) * _DURATION_UNITS[unit] for n, unit in _DURATION_RE.findall(value))
+
+
+def _tagged(name: str) -> str:
+    # /api/ps 는 "nomic-embed-text:latest" 처럼 태그를 붙여서 돌려줌
+    return name if ":" in name else f"{name}:latest"
+
+
+class ModelPolicy:
+    __slots__ = ("name", "kind", "keep_alive", "num_ctx", "warm")
+
+    def __init__(self, name: str, kind: str, *, keep_alive: int | str, num_ctx: int, warm: bool):
+        self.name = name
+        self.kind = kind            # generate | embed
+        self.keep_alive = keep_alive
+        self.num_ctx = num_ctx
+        self.warm = warm            # 시작 시 로드 + 내려가면 다시 로드
+
+    def merge(self, other: ModelPolicy) -> ModelPolicy:
+        """같은 모델을 여러 용도로 쓸 때: 가장 긴 keep_alive / 가장 큰 num_ctx, 한쪽이라도 warm 이면 warm"""
+        return ModelPolicy(
+            self.name, self.kind,
+            keep_alive=max(self.keep_alive, other.keep_alive, key=_keep_alive_seconds),
+            num_ctx=max(self.num_ctx, other.num_ctx),
+            warm=self.warm or other.warm,
+        )
+
+
+def _default_policies() -> dict[str, ModelPolicy]:
+    ocr_enabled = os.getenv("JD_OCR_ENABLED", "false").lower() == "true"
+    policies = [
+        ModelPolicy(
+            CHAT_MODEL, "generate",
+            keep_alive=_keep_alive(os.getenv("OLLAMA_CHAT_KEEP_ALIVE", "-1")),
+            num_ctx=OLLAMA_NUM_CTX,
+            warm=True,
+        ),
+        ModelPolicy(
+            EMBED_MODEL, "embed",
+            keep_alive=_keep_alive(os.getenv("OLLAMA_EMBED_KEEP_ALIVE", "-1")),
+            num_ctx=int(os.getenv("OLLAMA_EMBED_NUM_CTX", 2048)),
+            warm=True,
+        ),
+        # VLM 은 크롤링(OCR) 때만 필요 → 기본은 쓰고 나서 10분 뒤 내림
+        ModelPolicy(
+            CRAWL_MODEL, "generate",
+            keep_alive=_keep_alive(os.getenv("OLLAMA_CRAWL_KEEP_ALIVE", "10m")),
+            num_ctx=int(os.getenv("OLLAMA_CRAWL_NUM_CTX", 4096)),
+            warm=ocr_enabled,
+        ),
+    ]
+    # OLLAMA_CRAWL_MODEL == OLLAMA_CHAT_MODEL 처럼 이름이 겹치면 나중 정책이 덮어쓰지 않도록 합침
+    merged: dict[str, ModelPolicy] = {}
+    for p in policies:
+        merged[p.name] = merged[p.name].merge(p) if p.name in merged else p
+    return merged
+
+
+class ModelManager:
+    def __init__(self, policies: dict[str, ModelPolicy] | None = None):
+        self.policies = policies or _default_policies()
+        self.resident: set[str] = set()
+        self.cold_loads: dict[str, int] = {}
+        self._task: asyncio.Task | None = None
+
+    # -----------------------
+    # 요청 payload 에 정책 적용
+    # -----------------------
+    def keep_alive(self, model: str) -> int | str | None:
+        policy = self.policies.get(model)
+        return policy.keep_alive if policy else None
+
+    def options(self, model: str) -> dict:
+        policy = self.policies.get(model)
+        return {"num_ctx": policy.num_ctx} if policy else {}
+
+    def apply(self, payload: dict) -> dict:
+        """payload 의 model 정책(keep_alive / options.num_ctx)을 채움 (이미 있는 값은 유지)"""
+        policy = self.policies.get(payload.get("model"))
+        if policy is None:
+            return payload
+        payload.setdefault("keep_alive", policy.keep_alive)
+        payload["options"] = {"num_ctx": policy.num_ctx, **(payload.get("options") or {})}
+        return payload
+
+    def observe_load(self, model: str, data: dict, source: str = "request") -> None:
+        """Ollama 응답의 load_duration 으로 cold load 여부 기록"""
+        load_ns = data.get("load_duration") or 0
+        if load_ns / 1e9 < MODEL_COLD_LOAD_SECONDS:
+            return
+        MODEL_COLD_LOADS.labels(model, source).inc()
+        if source == "request":
+            self.cold_loads[model] = self.cold_loads.get(model, 0) + 1
+            print(f"🥶 모델 cold load [{model}] {load_ns / 1e9:.1f}s (사용자 요청에서 발생)", flush=True)
+
+    # -----------------------
+    # warm-up / 상주 확인
+    # -----------------------
+    async def warm(self, policy: ModelPolicy) -> bool:
+        if policy.kind == "embed":
+            url, payload = f"{OLLAMA_URL}/api/embed", {"model": policy.name, "input": "warm-up"}
+        else:
+            # 빈 prompt 는 모델 로드만 수행
+            url, payload = f"{OLLAMA_URL}/api/generate", {"model": policy.name, "prompt": "", "stream": False}
+        self.apply(payload)
+
+        start = time.perf_counter()
+        try:
+            with track_call("ollama", "warmup"):
+                res = await get_client().post(url, json=payload, timeout=MODEL_WARMUP_TIMEOUT)
+            res.raise_for_status()
+        except Exception as e:
+            count_error("ollama", "warmup")
+            print(f"⚠️ 모델 warm-up 실패 [{policy.name}]: {e}", flush=True)
+            return False
+
+        self.observe_load(policy.name, res.json(), source="warmup")
+        self.resident.add(_tagged(policy.name))
+        MODEL_RESIDENT.labels(policy.name).set(1)
+        print(f"🔥 모델 warm-up [{policy.name}] {time.perf_counter() - start:.1f}s "
+              f"(keep_alive={policy.keep_alive}, num_ctx={policy.num_ctx})", flush=True)
+        return True
+
+    async def warm_all(self) -> None:
+        await asyncio.gather(*(self.warm(p) for p in self.policies.values() if p.warm))
+
+    async def check(self) -> set[str]:
+        """/api/ps 로 상주 모델 확인 → 내려간 warm 모델은 다시 로드"""
+        with track_call("ollama", "ps"):
+            res = await get_client().get(f"{OLLAMA_URL}/api/ps", timeout=10)
+        res.raise_for_status()
+        loaded = {_tagged(m.get("name") or m.get("model", "")) for m in res.json().get("models") or []}
+
+        for policy in self.policies.values():
+            name = _tagged(policy.name)
+            MODEL_RESIDENT.labels(policy.name).set(1 if name in loaded else 0)
+            if policy.warm and name not in loaded:
+                if name in self.resident:
+                    print(f"📤 모델이 내려감 [{policy.name}] → 다시 로드", flush=True)
+                if await self.warm(policy):
+                    loaded.add(name)
+        self.resident = loaded
+        return loaded
+
+    async def _loop(self) -> None:
+        while True:
+            await asyncio.sleep(MODEL_WATCH_INTERVAL)
+            try:
+                await self.check()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"⚠️ 모델 상주 확인 실패: {e}", flush=True)
+
+    async def start(self) -> None:
+        await self.warm_all()
+        if MODEL_WATCH_INTERVAL > 0 and self._task is None:
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def status(self) -> dict:
+        return {
+            "resident": sorted(self.resident),
+            "cold_loads": dict(self.cold_loads),
+            "policies": {
+                p.name: {"kind": p.kind, "keep_alive": p.keep_alive, "num_ctx": p.num_ctx, "warm": p.warm}
+                for p in self.policies.values()
+            },
+        }
+
+
+model_manager = ModelManager()
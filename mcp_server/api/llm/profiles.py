@@ -0,0 +1,142 @@
+# api/llm/profiles.py
+"""
+라우트별 생성 프로필 (Ollama /api/generate 옵션 묶음)
+
+- options: temperature / top_p / repeat_penalty 등
+- num_predict: 최대 생성 토큰 (출력 형태에 맞춰 작게)
+- stop: Ollama stop 시퀀스
+- format: "json" 이면 JSON 출력 강제
+- shape: 기대하는 출력 형태 (question / lines:N / json)
+  → 스트리밍으로 받으면서 형태가 완성되는 즉시 연결을 끊어 생성 중단
+"""
+from __future__ import annotations
+
+import re
+from typing import Callable
+
+
+# -----------------------
+# 출력 형태 판정: 완성되었으면 잘라낸 최종 텍스트, 아니면 None
+# -----------------------
+def _question_done(text: str) -> str | None:
+    """첫 물음표까지 (한 문장 질문)"""
+    idx = text.find("?")
+    if idx < 0:
+        return None
+    return text[:idx + 1].strip()
+
+
+def _lines_done(n: int) -> Callable[[str], str | None]:
+    def _done(text: str) -> str | None:
+        # 줄바꿈으로 끝난(= 완성된) 비어있지 않은 줄이 n 개
+        complete = [l for l in text.split("\n")[:-1] if l.strip()]
+        if len(complete) < n:
+            return None
+        return "\n".join(complete[:n]).strip()
+    return _done
+
+
+def _json_done(text: str) -> str | None:
+    """최상위 JSON 객체/배열이 닫히면 완성 (문자열 안의 괄호는 무시)"""
+    depth = 0
+    in_str = escaped = False
+    start = None
+    for i, ch in enumerate(text):
+        if in_str:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_str = False
+            continue
+        if ch == '"':
+            in_str = True
+        elif ch in "{[":
+            if start is None:
+                start = i
+            depth += 1
+        elif ch in "}]" and start is not None:
+            depth -= 1
+            if depth == 0:
+                return text[start:i + 1]
+    return None
+
+
+_LINES_RE = re.compile(r"lines:(\d+)$")
+
+
+def _shape_checker(shape: str | None) -> Callable[[str], str | None] | None:
+    if not shape:
+        return None
+    if shape == "question":
+        return _question_done
+    if shape == "json":
+        return _json_done
+    m = _LINES_RE.match(shape)
+    if m:
+        return _lines_done(int(m.group(1)))
+    raise ValueError(f"알 수 없는 출력 형태: {shape}")
+
+
+class GenerationProfile:
+    __slots__ = ("name", "options", "num_predict", "stop", "format", "shape", "done")
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        num_predict: int,
+        stop: list[str] | None = None,
+        format: str | None = None,
+        shape: str | None = None,
+        **options,
+    ):
+        self.name = name
+        self.options = options
+        self.num_predict = num_predict
+        self.stop = list(stop or [])
+        self.format = format
+        self.shape = shape
+        self.done = _shape_checker(shape)
+
+    def payload_options(self, **overrides) -> dict:
+        """요청 options (호출 측에서 넘긴 값이 우선)"""
+        options = {**self.options, "num_predict": self.num_predict}
+        if self.stop:
+            options["stop"] = list(self.stop)
+        options.update({k: v for k, v in overrides.items() if v is not None})
+        return options
+
+
+_INTERVIEW = dict(temperature=0.0, top_p=0.1, repeat_penalty=1.5)
+
+PROFILES: dict[str, GenerationProfile] = {
+    p.name: p
+    for p in (
+        # 예전 ollama_chat 기본값 (자유 형식 긴 답변)
+        GenerationProfile("default", temperature=0.7, top_p=0.9, num_predict=1000),
+        # 예전 rag_ollama_chat 기본값
+        GenerationProfile("rag", temperature=0.3, top_p=0.75, repeat_penalty=1.15, num_predict=300),
+        # 면접 첫 질문: 물음표로 끝나는 1문장
+        GenerationProfile("interview_question", num_predict=60, stop=["\n"], shape="question", **_INTERVIEW),
+        # 면접 진행: 피드백 1줄 + 질문 1줄
+        GenerationProfile("interview_turn", num_predict=120, stop=["\n\n\n", "[참고"], shape="lines:2", **_INTERVIEW),
+        # 면접 예상 질문 목록 (한 줄에 1개, 최대 15개)
+        GenerationProfile("question_list", temperature=0.7, top_p=0.9, num_predict=900),
+        # 문서 요약 (청크 / 최종)
+        GenerationProfile("summary", temperature=0.3, top_p=0.9, num_predict=700),
+        # 300자 이내 조언
+        GenerationProfile("advice", temperature=0.5, top_p=0.9, num_predict=400),
+        # JSON 만 응답 (필드 추출 / 재정렬 / 매칭 설명)
+        GenerationProfile("json", temperature=0.1, top_p=0.9, num_predict=512, format="json", shape="json"),
+    )
+}
+
+DEFAULT_PROFILE = "default"
+
+
+def get_profile(name: str | GenerationProfile | None) -> GenerationProfile:
+    if isinstance(name, GenerationProfile):
+        return name
+    return PROFILES.get(name or DEFAULT_PROFILE) or PROFILES[DEFAULT_PROFILE]
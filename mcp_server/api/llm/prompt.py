@@ -0,0 +1,191 @@
+# api/llm/prompt.py
+"""
+토큰 예산 기반 프롬프트 조립
+
+- 한국어 / 영어 혼합 텍스트의 토큰 수를 문자 종류별로 추정 (보수적으로 크게 잡음)
+- 프롬프트 = 고정 문자열(지시문) + Section(채용공고 / 이력서 / RAG 문맥 / 대화 기록 ...)
+- 예산 = 모델 컨텍스트(num_ctx) - 출력 토큰(num_predict) - 고정 문자열 - 여유분
+- 넘치면 priority 숫자가 큰(덜 중요한) 섹션부터 min_tokens 까지 줄임
+  keep="head": 앞부분 유지 (문서, 검색 결과는 관련도 순)
+  keep="tail": 뒷부분 유지 (대화 기록은 최근 것이 중요)
+- 조립 결과는 str 이며 추정 토큰 수를 함께 들고 다님 → ollama_chat 이 prompt_eval_count 와 같이 기록
+"""
+from __future__ import annotations
+
+import os
+
+from api.metrics import PROMPT_TOKENS, PROMPT_TRIMMED_TOKENS
+
+# 모델 컨텍스트 길이 (요청 options.num_ctx 로도 전달)
+OLLAMA_NUM_CTX = int(os.getenv("OLLAMA_NUM_CTX", 4096))
+# 추정 오차 대비 여유분
+PROMPT_SAFETY_TOKENS = int(os.getenv("PROMPT_SAFETY_TOKENS", 64))
+# 한글 1글자당 토큰 / 그 외 문자 몇 글자당 1토큰 (prompt_eval_count 와 비교해 조정)
+TOKENS_PER_HANGUL = float(os.getenv("PROMPT_TOKENS_PER_HANGUL", 1.0))
+CHARS_PER_TOKEN = float(os.getenv("PROMPT_CHARS_PER_TOKEN", 3.5))
+
+_TRUNCATED = " ...[생략]"
+
+
+def _char_cost(ch: str) -> float:
+    if "가" <= ch <= "힣" or "㄰" <= ch <= "㆏" or "一" <= ch <= "鿿":
+        return TOKENS_PER_HANGUL
+    if ch.isspace():
+        return 0.25 / CHARS_PER_TOKEN
+    return 1.0 / CHARS_PER_TOKEN
+
+
+def estimate_tokens(text: str) -> int:
+    if not text:
+        return 0
+    return int(sum(_char_cost(ch) for ch in text) + 0.999)
+
+
+def truncate_tokens(text: str, max_tokens: int, keep: str = "head") -> str:
+    """추정 토큰이 max_tokens 이하가 되도록 자름 (keep="tail" 이면 뒷부분 유지)"""
+    if max_tokens <= 0 or not text:
+        return ""
+    if estimate_tokens(text) <= max_tokens:
+        return text
+
+    # 생략 표시를 붙일 자리도 없으면 표시 없이 자름 (결과가 max_tokens 를 넘지 않도록)
+    marker = max_tokens > estimate_tokens(_TRUNCATED)
+    limit = max_tokens - estimate_tokens(_TRUNCATED) if marker else max_tokens
+    chars = text if keep == "head" else reversed(text)
+    used = 0.0
+    n = 0
+    for ch in chars:
+        used += _char_cost(ch)
+        if used > limit:
+            break
+        n += 1
+    if not marker:
+        return text[:n] if keep == "head" else text[len(text) - n:]
+    if keep == "head":
+        return text[:n].rstrip() + _TRUNCATED
+    return _TRUNCATED.strip() + " " + text[len(text) - n:].lstrip()
+
+
+class Section:
+    """
+    text 또는 items(줄 단위 목록) 중 하나
+    items 는 keep 방향 반대쪽 항목부터 통째로 버림 (남은 마지막 1개만 글자 단위로 자름)
+    """
+    __slots__ = ("name", "text", "items", "priority", "max_tokens", "min_tokens", "keep", "joiner")
+
+    def __init__(
+        self,
+        name: str,
+        text: str | None = None,
+        *,
+        items: list[str] | None = None,
+        priority: int = 1,
+        max_tokens: int | None = None,
+        min_tokens: int = 0,
+        keep: str = "head",
+        joiner: str = "\n",
+    ):
+        self.name = name
+        self.text = text or ""
+        self.items = items
+        self.priority = priority
+        self.max_tokens = max_tokens
+        self.min_tokens = min_tokens
+        self.keep = keep
+        self.joiner = joiner
+
+    def full_text(self) -> str:
+        return self.joiner.join(self.items) if self.items is not None else self.text
+
+    def render(self, max_tokens: int) -> str:
+        if self.items is None:
+            return truncate_tokens(self.text, max_tokens, self.keep)
+
+        items = self.items if self.keep == "head" else list(reversed(self.items))
+        kept: list[str] = []
+        used = 0
+        for item in items:
+            cost = estimate_tokens(item) + (estimate_tokens(self.joiner) if kept else 0)
+            if used + cost > max_tokens:
+                if not kept:
+                    kept.append(truncate_tokens(item, max_tokens, self.keep))
+                break
+            kept.append(item)
+            used += cost
+        if self.keep != "head":
+            kept.reverse()
+        return self.joiner.join(kept)
+
+
+class AssembledPrompt(str):
+    """조립된 프롬프트 (str) + 추정 토큰 / 섹션별 통계"""
+    route: str
+    tokens: int
+    budget: int
+    sections: dict
+
+    def __new__(cls, text: str, *, route: str, tokens: int, budget: int, sections: dict):
+        obj = super().__new__(cls, text)
+        obj.route = route
+        obj.tokens = tokens
+        obj.budget = budget
+        obj.sections = sections
+        return obj
+
+
+def assemble_prompt(
+    parts: list[str | Section],
+    *,
+    route: str,
+    num_predict: int,
+    num_ctx: int | None = None,
+    reserve: int = 0,
+    record: bool = True,
+) -> AssembledPrompt:
+    """
+    parts 를 순서대로 이어붙여 프롬프트를 만든다
+    reserve: 뒤에서 더 붙일 내용(예: RAG 문맥)을 위해 남겨둘 토큰
+    record: False 면 PROMPT_TOKENS 에 기록하지 않음 (나중에 다시 조립해서 보내는 중간 단계)
+    """
+    num_ctx = num_ctx or OLLAMA_NUM_CTX
+    sections = [p for p in parts if isinstance(p, Section)]
+    fixed = sum(estimate_tokens(p) for p in parts if not isinstance(p, Section))
+    budget = max(0, num_ctx - num_predict - fixed - PROMPT_SAFETY_TOKENS - reserve)
+
+    original = {s.name: estimate_tokens(s.full_text()) for s in sections}
+    alloc = {
+        s.name: min(original[s.name], s.max_tokens) if s.max_tokens is not None else original[s.name]
+        for s in sections
+    }
+
+    # 1차: 덜 중요한 섹션부터 min_tokens 까지 / 2차: 그래도 넘치면 min_tokens 무시
+    over = sum(alloc.values()) - budget
+    for floor in (True, False):
+        for s in sorted(sections, key=lambda s: -s.priority):
+            if over <= 0:
+                break
+            cut = min(over, max(0, alloc[s.name] - (s.min_tokens if floor else 0)))
+            alloc[s.name] -= cut
+            over -= cut
+
+    rendered: dict[str, str] = {}
+    stats: dict[str, dict] = {}
+    for s in sections:
+        text = s.full_text() if alloc[s.name] >= original[s.name] else s.render(alloc[s.name])
+        rendered[s.name] = text
+        kept = estimate_tokens(text)
+        stats[s.name] = {"tokens": kept, "original": original[s.name]}
+        if kept < original[s.name]:
+            PROMPT_TRIMMED_TOKENS.labels(route, s.name).inc(original[s.name] - kept)
+
+    text = "".join(rendered[p.name] if isinstance(p, Section) else p for p in parts)
+    tokens = fixed + sum(v["tokens"] for v in stats.values())
+    if record:
+        PROMPT_TOKENS.labels(route, "estimate").observe(tokens)
+
+    trimmed = {k: v for k, v in stats.items() if v["tokens"] < v["original"]}
+    if trimmed:
+        detail = ", ".join(f"{k} {v['original']}→{v['tokens']}" for k, v in trimmed.items())
+        print(f"✂️ 프롬프트 예산 [{route}] {tokens}/{num_ctx - num_predict} tokens ({detail})", flush=True)
+
+    return AssembledPrompt(text, route=route, tokens=tokens, budget=num_ctx - num_predict, sections=stats)
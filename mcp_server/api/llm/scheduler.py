@@ -0,0 +1,241 @@
+# api/llm/scheduler.py
+"""
+공유 Ollama 클라이언트 앞단의 LLM 스케줄러
+
+- 우선순위 클래스: interactive > batch > background
+- 같은 클래스 안에서는 session_id 기준 가중 공정 큐잉(WFQ)
+- 오래 기다린 요청은 클래스와 무관하게 먼저 처리 (starvation 방지)
+- 클래스별 대기 시간 통계 제공
+- 멀티 워커(WEB_CONCURRENCY > 1)에서는 워커 안의 슬롯을 받은 뒤 Redis 공유 세마포어로
+  전체 워커 합계도 MAX_CONCURRENCY 로 제한 (우선순위가 높을수록 짧은 간격으로 재시도)
+"""
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import os
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+
+from api.db.distributed import DistributedSemaphore
+from api.metrics import LLM_QUEUE_WAIT
+
+INTERACTIVE = "interactive"
+BATCH = "batch"
+BACKGROUND = "background"
+
+PRIORITIES = (INTERACTIVE, BATCH, BACKGROUND)
+
+# Ollama 동시 처리 수 (OLLAMA_NUM_PARALLEL 과 맞춰서 설정)
+MAX_CONCURRENCY = int(os.getenv("OLLAMA_MAX_CONCURRENCY", 2))
+
+# 클래스별로 이 시간(초) 이상 대기하면 우선순위와 무관하게 먼저 배정
+STARVATION_AFTER = {
+    INTERACTIVE: float(os.getenv("LLM_SCHED_STARVE_INTERACTIVE", 5)),
+    BATCH: float(os.getenv("LLM_SCHED_STARVE_BATCH", 30)),
+    BACKGROUND: float(os.getenv("LLM_SCHED_STARVE_BACKGROUND", 90)),
+}
+
+# 대기 시간이 이 값(초)을 넘으면 로그 출력
+SLOW_WAIT_LOG = float(os.getenv("LLM_SCHED_SLOW_WAIT_LOG", 1.0))
+
+_DEFAULT_SESSION = "_default"
+
+# 워커 간 공유 슬롯 재시도 시작 간격 (초)
+_GATE_POLL = {INTERACTIVE: 0.01, BATCH: 0.03, BACKGROUND: 0.1}
+
+
+class _Waiter:
+    __slots__ = ("priority", "session", "tag", "enqueued_at", "future")
+
+    def __init__(self, priority: str, session: str, tag: float, future: asyncio.Future):
+        self.priority = priority
+        self.session = session
+        self.tag = tag
+        self.enqueued_at = time.monotonic()
+        self.future = future
+
+
+class LLMScheduler:
+    def __init__(self, max_concurrency: int = MAX_CONCURRENCY, starvation_after: dict | None = None):
+        self.max_concurrency = max(1, max_concurrency)
+        self.starvation_after = starvation_after or dict(STARVATION_AFTER)
+
+        self._active = 0
+        self._seq = itertools.count()
+
+        # 클래스별 (finish tag 순) 힙 + 도착 순서 FIFO (starvation 체크용)
+        self._heaps: dict[str, list] = {p: [] for p in PRIORITIES}
+        self._fifos: dict[str, deque[_Waiter]] = {p: deque() for p in PRIORITIES}
+
+        # WFQ 가상 시간 / 세션별 마지막 finish tag
+        self._vtime: dict[str, float] = {p: 0.0 for p in PRIORITIES}
+        self._last_tag: dict[tuple[str, str], float] = {}
+
+        self._stats = {
+            p: {"requests": 0, "wait_total": 0.0, "wait_max": 0.0, "promoted": 0}
+            for p in PRIORITIES
+        }
+
+        # 워커 전체 합계 제한 (단일 워커면 아무 일도 하지 않는 로컬 세마포어)
+        self._gate = DistributedSemaphore("ollama", self.max_concurrency)
+
+    # -----------------------
+    # public
+    # -----------------------
+    @asynccontextmanager
+    async def slot(
+        self,
+        priority: str = BATCH,
+        session_id: str | None = None,
+        *,
+        weight: float = 1.0,
+        cost: float = 1.0,
+    ):
+        """
+        Ollama 호출 1건 동안 슬롯을 점유
+        async with scheduler.slot("interactive", sid):
+            res = await client.post(...)
+        """
+        if priority not in PRIORITIES:
+            priority = BATCH
+
+        await self._acquire(priority, session_id or _DEFAULT_SESSION, weight, cost)
+        try:
+            async with self._gate.hold(poll=_GATE_POLL[priority]):
+                yield
+        finally:
+            self._release()
+
+    def snapshot(self) -> dict:
+        """클래스별 대기열/대기시간 통계"""
+        out = {"active": self._active, "max_concurrency": self.max_concurrency, "classes": {}}
+        for p in PRIORITIES:
+            s = self._stats[p]
+            queued = sum(1 for w in self._fifos[p] if not w.future.done())
+            out["classes"][p] = {
+                "queued": queued,
+                "requests": s["requests"],
+                "promoted": s["promoted"],
+                "wait_avg": (s["wait_total"] / s["requests"]) if s["requests"] else 0.0,
+                "wait_max": s["wait_max"],
+            }
+        return out
+
+    def queued_ahead(self, priority: str = BATCH) -> int:
+        """지금 priority 로 요청하면 앞에 서게 될 대기 수 (같거나 높은 클래스, 슬롯이 남아 있으면 0)"""
+        if self._active < self.max_concurrency and not self._has_waiters():
+            return 0
+        if priority not in PRIORITIES:
+            priority = BATCH
+        ahead = PRIORITIES[:PRIORITIES.index(priority) + 1]
+        return sum(1 for p in ahead for w in self._fifos[p] if not w.future.done())
+
+    # -----------------------
+    # internal
+    # -----------------------
+    def _has_waiters(self) -> bool:
+        return any(self._peek(p) is not None for p in PRIORITIES)
+
+    async def _acquire(self, priority: str, session: str, weight: float, cost: float) -> None:
+        if self._active < self.max_concurrency and not self._has_waiters():
+            self._active += 1
+            self._record_wait(priority, 0.0)
+            return
+
+        key = (priority, session)
+        start_tag = max(self._vtime[priority], self._last_tag.get(key, 0.0))
+        tag = start_tag + cost / max(weight, 1e-6)
+        self._last_tag[key] = tag
+
+        waiter = _Waiter(priority, session, tag, asyncio.get_running_loop().create_future())
+        heapq.heappush(self._heaps[priority], (tag, next(self._seq), waiter))
+        self._fifos[priority].append(waiter)
+
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            # 슬롯을 받은 직후 취소되면 반납, 아니면 대기열에서 lazy 제거
+            if waiter.future.done() and not waiter.future.cancelled():
+                self._release()
+            else:
+                waiter.future.cancel()
+                self._dispatch()
+            raise
+
+        wait = time.monotonic() - waiter.enqueued_at
+        self._record_wait(priority, wait)
+        if wait >= SLOW_WAIT_LOG:
+            print(f"⏳ LLM queue wait [{priority}] session={session}: {wait:.2f}s", flush=True)
+
+    def _release(self) -> None:
+        self._active -= 1
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        while self._active < self.max_concurrency:
+            waiter = self._pick()
+            if waiter is None:
+                return
+            self._active += 1
+            waiter.future.set_result(None)
+
+    def _peek(self, priority: str) -> _Waiter | None:
+        heap = self._heaps[priority]
+        while heap and heap[0][2].future.done():
+            heapq.heappop(heap)
+        return heap[0][2] if heap else None
+
+    def _oldest(self, priority: str) -> _Waiter | None:
+        fifo = self._fifos[priority]
+        while fifo and fifo[0].future.done():
+            fifo.popleft()
+        return fifo[0] if fifo else None
+
+    def _pick(self) -> _Waiter | None:
+        now = time.monotonic()
+
+        # 1) starvation: 한도를 넘겨 기다린 요청 중 가장 오래된 것
+        starved = None
+        for p in PRIORITIES:
+            w = self._oldest(p)
+            if w and now - w.enqueued_at >= self.starvation_after[p]:
+                if starved is None or w.enqueued_at < starved.enqueued_at:
+                    starved = w
+        if starved is not None:
+            ahead = PRIORITIES[:PRIORITIES.index(starved.priority)]
+            if starved is not self._peek(starved.priority) or any(self._peek(p) for p in ahead):
+                self._stats[starved.priority]["promoted"] += 1
+            return starved
+
+        # 2) 우선순위 순서대로, 클래스 안에서는 finish tag 가 가장 작은 세션
+        for p in PRIORITIES:
+            w = self._peek(p)
+            if w is None:
+                continue
+            heapq.heappop(self._heaps[p])
+            self._vtime[p] = w.tag
+            self._prune_tags(p)
+            return w
+
+        return None
+
+    def _prune_tags(self, priority: str) -> None:
+        if len(self._last_tag) < 1024:
+            return
+        vtime = self._vtime[priority]
+        for key in [k for k, t in self._last_tag.items() if k[0] == priority and t <= vtime]:
+            del self._last_tag[key]
+
+    def _record_wait(self, priority: str, wait: float) -> None:
+        s = self._stats[priority]
+        s["requests"] += 1
+        s["wait_total"] += wait
+        LLM_QUEUE_WAIT.labels(priority).observe(wait)
+        if wait > s["wait_max"]:
+            s["wait_max"] = wait
+
+
+scheduler = LLMScheduler()
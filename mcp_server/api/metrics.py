@@ -0,0 +1,256 @@
+# api/metrics.py
+"""
+Prometheus 메트릭 정의 + 계측 헬퍼
+
+- 라우트별 / 단계별(crawl, pdf_extract, summarize, rag_retrieve, generate ...) 지연 히스토그램
+- 외부 호출(Ollama/Chroma/Redis/MySQL/Saramin) 호출 수, 에러 수, in-flight 게이지
+- 모델별 Ollama 토큰 처리량
+
+멀티 워커에서는 PROMETHEUS_MULTIPROC_DIR 을 설정하면 /metrics 가 워커 전체를 합산한다
+(Gauge 는 multiprocess_mode 로 합산 방식 지정, 단일 프로세스에서는 무시됨)
+"""
+from __future__ import annotations
+
+import time
+from contextlib import contextmanager
+
+from prometheus_client import Counter, Gauge, Histogram
+
+_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+REQUEST_LATENCY = Histogram(
+    "mcp_request_duration_seconds",
+    "HTTP 요청 처리 시간",
+    ["route", "method", "status"],
+    buckets=_LATENCY_BUCKETS,
+)
+REQUESTS_IN_FLIGHT = Gauge(
+    "mcp_requests_in_flight",
+    "처리 중인 HTTP 요청 수",
+    multiprocess_mode="livesum",
+)
+
+STAGE_LATENCY = Histogram(
+    "mcp_stage_duration_seconds",
+    "요청 내부 단계별 처리 시간",
+    ["stage"],
+    buckets=_LATENCY_BUCKETS,
+)
+
+EXTERNAL_CALLS = Counter(
+    "mcp_external_calls_total",
+    "외부 서비스 호출 수",
+    ["service", "op"],
+)
+EXTERNAL_ERRORS = Counter(
+    "mcp_external_errors_total",
+    "외부 서비스 호출 에러 수",
+    ["service", "op"],
+)
+EXTERNAL_IN_FLIGHT = Gauge(
+    "mcp_external_in_flight",
+    "진행 중인 외부 서비스 호출 수",
+    ["service"],
+    multiprocess_mode="livesum",
+)
+EXTERNAL_LATENCY = Histogram(
+    "mcp_external_duration_seconds",
+    "외부 서비스 호출 시간",
+    ["service", "op"],
+    buckets=_LATENCY_BUCKETS,
+)
+
+OLLAMA_TOKENS = Counter(
+    "mcp_ollama_tokens_total",
+    "Ollama 토큰 수 (kind=prompt|eval)",
+    ["model", "kind"],
+)
+OLLAMA_TOKENS_PER_SECOND = Gauge(
+    "mcp_ollama_tokens_per_second",
+    "마지막 호출 기준 Ollama 토큰 처리량 (phase=prompt_eval|eval)",
+    ["model", "phase"],
+    multiprocess_mode="mostrecent",
+)
+OLLAMA_LOAD_SECONDS = Histogram(
+    "mcp_ollama_load_duration_seconds",
+    "Ollama 모델 로드 시간 (load_duration)",
+    ["model"],
+    buckets=(0.01, 0.1, 0.5, 1, 2.5, 5, 10, 30, 60),
+)
+
+CACHE_REQUESTS = Counter(
+    "mcp_cache_requests_total",
+    "In-process 캐시 조회 수 (result=hit|miss)",
+    ["cache", "result"],
+)
+
+LLM_QUEUE_WAIT = Histogram(
+    "mcp_llm_queue_wait_seconds",
+    "LLM 스케줄러 대기 시간",
+    ["priority"],
+    buckets=_LATENCY_BUCKETS,
+)
+
+MODEL_COLD_LOADS = Counter(
+    "mcp_model_cold_loads_total",
+    "Ollama 모델 로드가 발생한 호출 수 (source=request: 사용자 요청, warmup: 미리 로드)",
+    ["model", "source"],
+)
+
+MODEL_RESIDENT = Gauge(
+    "mcp_model_resident",
+    "/api/ps 기준 모델 상주 여부 (1/0)",
+    ["model"],
+    multiprocess_mode="livemax",
+)
+
+PROMPT_TOKENS = Histogram(
+    "mcp_prompt_tokens",
+    "프롬프트 토큰 수 (source=estimate: 조립 시 추정, ollama: prompt_eval_count)",
+    ["route", "source"],
+    buckets=(128, 256, 512, 1024, 2048, 3072, 4096, 8192),
+)
+
+PROMPT_TRIMMED_TOKENS = Counter(
+    "mcp_prompt_trimmed_tokens_total",
+    "컨텍스트 예산 때문에 잘라낸 토큰 수 (추정)",
+    ["route", "section"],
+)
+
+GENERATION_TOKENS = Histogram(
+    "mcp_generation_tokens",
+    "생성 1회당 출력 토큰 수 (profile 별)",
+    ["profile"],
+    buckets=(8, 16, 32, 64, 128, 256, 512, 1024),
+)
+
+GENERATION_TOKENS_SAVED = Counter(
+    "mcp_generation_tokens_saved_total",
+    "num_predict 한도보다 일찍 끝나 생성하지 않은 토큰 수 (reason=stop|shape)",
+    ["profile", "reason"],
+)
+
+LLM_ABANDONED = Counter(
+    "mcp_llm_abandoned_total",
+    "클라이언트 연결 끊김 / 시간 초과로 중단한 LLM 호출 수 (reason=disconnect|timeout)",
+    ["route", "reason"],
+)
+
+GENERATION_TOKENS_ABANDONED = Counter(
+    "mcp_generation_tokens_abandoned_total",
+    "생성 도중 취소되어 버려진 출력 토큰 수 (스트림 청크 기준)",
+    ["profile"],
+)
+
+DEADLINE_TIMEOUTS = Counter(
+    "mcp_deadline_timeouts_total",
+    "요청 마감 시간 예산 안에 끝나지 못한 단계 수",
+    ["route", "stage"],
+)
+
+DEADLINE_DEGRADED = Counter(
+    "mcp_deadline_degraded_total",
+    "예산 부족으로 품질을 낮춰 진행한 단계 수 (skip_ocr, cached_jd, partial_pdf, truncate_summary 등)",
+    ["route", "stage", "action"],
+)
+
+EMBED_BATCH_SIZE = Histogram(
+    "mcp_embed_batch_size",
+    "임베딩 마이크로배치 1회당 입력 수",
+    ["priority"],
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128),
+)
+
+EMBED_BATCH_LINGER = Histogram(
+    "mcp_embed_batch_linger_seconds",
+    "임베딩 요청이 배치에 모이기까지 대기한 시간 (첫 요청 기준)",
+    ["priority"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05),
+)
+
+HTML_PARSE_SECONDS = Histogram(
+    "mcp_html_parse_seconds",
+    "사람인 HTML 파싱 / 마크다운 변환 시간 (워커 내부 측정, page=list|detail)",
+    ["page", "parser"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1),
+)
+
+SUMMARIES = Counter(
+    "mcp_summaries_total",
+    "요약 엔진별 요약 수 (engine=llm|extractive, reason=requested|short|saturated|deadline|auto)",
+    ["engine", "reason"],
+)
+
+SCREEN_RESUMES = Counter(
+    "mcp_screen_resumes_total",
+    "일괄 이력서 스크리닝 처리 수 (outcome=ranked|analyzed|failed)",
+    ["outcome"],
+)
+
+DISTRIBUTED_WAIT = Histogram(
+    "mcp_distributed_wait_seconds",
+    "멀티 워커 공유 세마포어 / rate limit 대기 시간 (kind=semaphore|rate)",
+    ["kind", "name"],
+    buckets=_LATENCY_BUCKETS,
+)
+
+
+@contextmanager
+def track_call(service: str, op: str):
+    """외부 호출 1건 계측 (호출 수 / 에러 수 / in-flight / 지연)"""
+    EXTERNAL_CALLS.labels(service, op).inc()
+    EXTERNAL_IN_FLIGHT.labels(service).inc()
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        EXTERNAL_ERRORS.labels(service, op).inc()
+        raise
+    finally:
+        EXTERNAL_LATENCY.labels(service, op).observe(time.perf_counter() - start)
+        EXTERNAL_IN_FLIGHT.labels(service).dec()
+
+
+def count_error(service: str, op: str) -> None:
+    """예외 없이 실패 응답을 받은 경우 (status != 200 등)"""
+    EXTERNAL_ERRORS.labels(service, op).inc()
+
+
+@contextmanager
+def stage_timer(stage: str):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_LATENCY.labels(stage).observe(time.perf_counter() - start)
+
+
+def record_generation(profile: str, data: dict, num_predict: int) -> None:
+    """profile 별 출력 토큰 수 + 한도 대비 절약한 토큰 수 기록"""
+    eval_count = data.get("eval_count") or 0
+    GENERATION_TOKENS.labels(profile).observe(eval_count)
+    reason = data.get("done_reason") or "stop"
+    if reason in ("stop", "shape") and num_predict > eval_count:
+        GENERATION_TOKENS_SAVED.labels(profile, reason).inc(num_predict - eval_count)
+
+
+def record_ollama_usage(model: str, data: dict) -> None:
+    """Ollama 응답의 eval_count / eval_duration 등으로 토큰 처리량 기록 (duration 은 ns)"""
+    prompt_count = data.get("prompt_eval_count") or 0
+    prompt_ns = data.get("prompt_eval_duration") or 0
+    eval_count = data.get("eval_count") or 0
+    eval_ns = data.get("eval_duration") or 0
+    load_ns = data.get("load_duration")
+
+    if prompt_count:
+        OLLAMA_TOKENS.labels(model, "prompt").inc(prompt_count)
+    if eval_count:
+        OLLAMA_TOKENS.labels(model, "eval").inc(eval_count)
+
+    if prompt_count and prompt_ns:
+        OLLAMA_TOKENS_PER_SECOND.labels(model, "prompt_eval").set(prompt_count / (prompt_ns / 1e9))
+    if eval_count and eval_ns:
+        OLLAMA_TOKENS_PER_SECOND.labels(model, "eval").set(eval_count / (eval_ns / 1e9))
+
+    if load_ns is not None:
+        OLLAMA_LOAD_SECONDS.labels(model).observe(load_ns / 1e9)
@@ -3,23 +3,53 @@
 from __future__ import annotations
 
 from typing import List
-import chromadb
 import os
-import httpx
+import threading
 from fastapi import HTTPException
 from starlette.concurrency import run_in_threadpool
 
 from ollama import ollama_chat, ollama_embed, ollama_embed_batch  # async 버전만 사용
 from ollama_client import get_client
+from api.db.distributed import MULTI_WORKER
+from api.llm.scheduler import BATCH, INTERACTIVE
+from api.llm.profiles import get_profile
+from api.llm.prompt import Section, assemble_prompt
+from api.metrics import track_call, stage_timer
 
 
 OLLAMA_URL = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
 CHAT_MODEL = os.getenv("OLLAMA_CHAT_MODEL", "gemma3:4b")
 
-# ChromaDB 클라이언트 (동기)
+# rag_ollama_chat 에 붙이는 검색 청크 전체의 최대 토큰
+RAG_CONTEXT_TOKENS = int(os.getenv("RAG_CONTEXT_TOKENS", 900))
+
+# ChromaDB 클라이언트 (동기, 첫 사용 시 생성)
+# persistent: 로컬 디렉터리 (프로세스 1개 전용) / http: Chroma 서버 (워커 여러 개가 공유)
+# 같은 디렉터리를 여러 프로세스가 PersistentClient 로 열면 안전하지 않으므로 멀티 워커 기본값은 http
 CHROMA_DB_PATH = os.getenv("CHROMA_DB_PATH", "./chroma_db")
+CHROMA_CLIENT = os.getenv("CHROMA_CLIENT", "http" if MULTI_WORKER else "persistent").lower()
+
+_chroma = None
+_chroma_lock = threading.Lock()
+
+
+def get_chroma():
+    global _chroma
+    if _chroma is None:
+        with _chroma_lock:
+            if _chroma is None:
+                import chromadb  # import 만 ~0.8s → 앱 import 시간에서 제외
+                if CHROMA_CLIENT == "http":
+                    _chroma = chromadb.HttpClient(
+                        host=os.getenv("CHROMA_HOST", "chroma"),
+                        port=int(os.getenv("CHROMA_PORT", 8000)),
+                    )
+                else:
+                    if MULTI_WORKER:
+                        print("⚠️ 멀티 워커에서 PersistentClient 사용 (워커 간 데이터 손상 위험)", flush=True)
+                    _chroma = chromadb.PersistentClient(path=CHROMA_DB_PATH)
+    return _chroma
 
-client = chromadb.PersistentClient(path="./chroma_db")
 
 def _get_client():
     client = get_client()
@@ -56,22 +86,29 @@ def _save_to_chroma_sync(chunks: List[str], embeddings: List[List[float]], colle
     if len(chunks) != len(embeddings):
         raise ValueError("chunks/embeddings 길이가 다릅니다.")
 
-    collection = client.get_or_create_collection(name=collection_name)
+    collection = get_chroma().get_or_create_collection(name=collection_name)
 
     ids = [f"chunk_{i}" for i in range(len(chunks))]
     metadatas = [{"source": "resume", "chunk_index": i} for i in range(len(chunks))]
 
-    collection.add(
-        documents=chunks,
-        embeddings=embeddings,
-        ids=ids,
-        metadatas=metadatas,
-    )
+    with track_call("chroma", "add"):
+        collection.add(
+            documents=chunks,
+            embeddings=embeddings,
+            ids=ids,
+            metadatas=metadatas,
+        )
 
     print(f"ChromaDB 저장 완료: {collection_name} (총 {len(chunks)} chunks)")
 
 
-async def save_to_chroma(text: str, collection_name: str) -> None:
+async def save_to_chroma(
+    text: str,
+    collection_name: str,
+    *,
+    priority: str = BATCH,
+    session_id: str | None = None,
+) -> None:
     """
     ✅ /start에서 호출할 함수 (async)
     - 임베딩 생성은 async(메인 루프)
@@ -87,7 +124,7 @@ async def save_to_chroma(text: str, collection_name: str) -> None:
         return
 
     # 임베딩은 async로 한 번에 생성
-    embeddings = await ollama_embed_batch(chunks)
+    embeddings = await ollama_embed_batch(chunks, priority=priority, session_id=session_id)
 
     # Chroma 저장만 threadpool
     await run_in_threadpool(_save_to_chroma_sync, chunks, embeddings, collection_name)
@@ -95,15 +132,23 @@ async def save_to_chroma(text: str, collection_name: str) -> None:
 
 def _query_chroma_sync(query_embedding: List[float], collection_name: str, top_k: int) -> List[str]:
     """Chroma query는 동기 함수(=threadpool에서 호출)"""
-    collection = client.get_collection(name=collection_name)
-    results = collection.query(query_embeddings=[query_embedding], n_results=top_k)
+    with track_call("chroma", "query"):
+        collection = get_chroma().get_collection(name=collection_name)
+        results = collection.query(query_embeddings=[query_embedding], n_results=top_k)
 
     if results and results.get("documents"):
         return results["documents"][0] or []
     return []
 
 
-async def retrieve_from_chroma(query: str, collection_name: str, top_k: int = 3) -> List[str]:
+async def retrieve_from_chroma(
+    query: str,
+    collection_name: str,
+    top_k: int = 3,
+    *,
+    priority: str = INTERACTIVE,
+    session_id: str | None = None,
+) -> List[str]:
     """
     ✅ 검색은 async 함수로 제공
     - query 임베딩: async
@@ -114,8 +159,9 @@ async def retrieve_from_chroma(query: str, collection_name: str, top_k: int = 3)
         if not q:
             return []
 
-        query_embedding = await ollama_embed(q)
-        return await run_in_threadpool(_query_chroma_sync, query_embedding, collection_name, top_k)
+        with stage_timer("rag_retrieve"):
+            query_embedding = await ollama_embed(q, priority=priority, session_id=session_id)
+            return await run_in_threadpool(_query_chroma_sync, query_embedding, collection_name, top_k)
 
     except Exception:
         import traceback
@@ -125,7 +171,8 @@ async def retrieve_from_chroma(query: str, collection_name: str, top_k: int = 3)
 
 def delete_chroma_collection(collection_name: str):
     try:
-        client.delete_collection(name=collection_name)
+        with track_call("chroma", "delete"):
+            get_chroma().delete_collection(name=collection_name)
         print(f"ChromaDB 컬렉션 삭제 완료: {collection_name}")
     except Exception as e:
         print(f"컬렉션 삭제 실패 ({collection_name}): {e}")
@@ -134,62 +181,53 @@ def delete_chroma_collection(collection_name: str):
 async def rag_ollama_chat(
     base_prompt: str,
     collection_name: str,
-    temperature: float = 0.3,
-    top_p: float = 0.75,
-    repeat_penalty: float = 1.15,
-    num_predict: int = 300,          # 너무 긴 답변 방지용으로 기본값 낮춤
+    temperature: float | None = None,
+    top_p: float | None = None,
+    repeat_penalty: float | None = None,
+    num_predict: int | None = None,
+    priority: str = INTERACTIVE,
+    session_id: str | None = None,
+    profile: str = "rag",
+    on_token=None,
     **extra_options
 ):
-    retrieved = await retrieve_from_chroma(base_prompt, collection_name, top_k=3)
+    """
+    검색한 자기소개서 청크를 붙여 생성
+    profile(api.llm.profiles) 이 옵션 / stop / 최대 토큰을 정하고, 넘긴 인자가 있으면 그 값이 우선
+    on_token: 생성 조각 스트리밍 콜백 (ollama_chat 참고)
+    """
+    retrieved = await retrieve_from_chroma(
+        base_prompt, collection_name, top_k=3, priority=priority, session_id=session_id
+    )
 
     if retrieved:
-        rag_context = "\n\n[참고할 자기소개서 관련 내용]\n" + "\n".join(
-            f"- {chunk[:300]}..." for chunk in retrieved
-        )
-        full_prompt = base_prompt + rag_context
+        # 남은 컨텍스트 예산 안에서 관련도 높은 청크부터 (RAG_CONTEXT_TOKENS 상한)
+        parts = [
+            base_prompt,
+            "\n\n[참고할 자기소개서 관련 내용]\n",
+            Section("rag", items=[f"- {chunk}" for chunk in retrieved], max_tokens=RAG_CONTEXT_TOKENS),
+        ]
     else:
-        full_prompt = base_prompt
+        parts = [base_prompt]
         print("RAG 검색 결과 없음 → 일반 ollama_chat으로 fallback")
 
-    # 직접 payload 구성
-    payload = {
-        "model": CHAT_MODEL,
-        "prompt": full_prompt.strip(),
-        "stream": False,
-        "keep_alive": -1,
-        "options": {
-            "temperature": temperature,
-            "top_p": top_p,
-            "repeat_penalty": repeat_penalty,
-            "num_predict": 150,
-            **extra_options
-        }
-    }
-
-    # ollama_chat 내부에서 쓰던 동일한 client 재사용
-    client = _get_client()  # ollama_chat에서 정의된 함수라고 가정
-    # 만약 _get_client()가 접근 불가라면 아래처럼 직접 생성해도 됨
-    # client = httpx.AsyncClient()
-
-    res = await client.post(f"{OLLAMA_URL}/api/generate", json=payload)
-
-    if res.status_code != 200:
-        raise HTTPException(
-            status_code=500,
-            detail=f"Ollama error: {res.text}"
-        )
+    full_prompt = assemble_prompt(
+        parts,
+        route=getattr(base_prompt, "route", "rag"),
+        num_predict=num_predict or get_profile(profile).num_predict,
+    )
 
-    data = res.json()
-
-    return {
-        "success": True,
-        "answer": data.get("response", ""),
-        "model": data.get("model", CHAT_MODEL),
-        "metadata": {
-            "total_duration": data.get("total_duration"),
-            "load_duration": data.get("load_duration"),
-            "prompt_eval_count": data.get("prompt_eval_count"),
-            "eval_count": data.get("eval_count"),
-            "eval_duration": data.get("eval_duration"),
-        },
-    }
\ No newline at end of file
+    res = await ollama_chat(
+        full_prompt,
+        priority=priority,
+        session_id=session_id,
+        profile=profile,
+        temperature=temperature,
+        top_p=top_p,
+        repeat_penalty=repeat_penalty,
+        num_predict=num_predict,
+        on_token=on_token,
+        **extra_options,
+    )
+    res.pop("question", None)
+    return res
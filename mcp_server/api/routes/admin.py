@@ -0,0 +1,64 @@
+from fastapi import APIRouter, Depends, HTTPException
+from pydantic import BaseModel, Field
+
+from api.auth import require_admin
+from api.db.mysql import get_mysql_pool
+from api.llm.models import model_manager
+from api.services.bulk_crawl import (
+    BulkCrawler,
+    BULK_CRAWL_CONCURRENCY,
+    BULK_CRAWL_PAGES,
+    BULK_CRAWL_RATE,
+    crawl_status,
+    start_bulk_crawl,
+    cancel_bulk_crawl,
+)
+
+# 모든 관리자 API 는 X-Admin-Token 필요 (ADMIN_TOKEN 미설정이면 503)
+router = APIRouter(dependencies=[Depends(require_admin)])
+
+
+class CrawlRequest(BaseModel):
+    categories: list[str] | None = None     # cat_mcls 코드, 없으면 전체
+    pages: int = Field(BULK_CRAWL_PAGES, gt=0, le=100)
+    concurrency: int = Field(BULK_CRAWL_CONCURRENCY, gt=0, le=16)
+    rate: float = Field(BULK_CRAWL_RATE, gt=0, le=10)      # 사람인 요청 / 초 (0 이면 제한이 풀리므로 금지)
+    extract: bool = True
+    ocr: bool = False                       # 공고 이미지 OCR
+    reset: bool = False                     # 체크포인트 무시하고 첫 페이지부터
+
+
+@router.post("/crawl")
+async def start_crawl(request: CrawlRequest):
+    pool = await get_mysql_pool()
+    if pool is None:
+        raise HTTPException(status_code=500, detail="MySQL 연결 실패")
+
+    crawler = BulkCrawler(
+        categories=request.categories,
+        max_pages=request.pages,
+        concurrency=request.concurrency,
+        rate=request.rate,
+        extract=request.extract,
+        ocr=request.ocr,
+        reset=request.reset,
+        pool=pool,
+    )
+    if not await start_bulk_crawl(crawler):
+        raise HTTPException(status_code=409, detail="이미 크롤링이 실행 중입니다.")
+    return {"started": True, "categories": crawler.categories}
+
+
+@router.get("/crawl")
+async def get_crawl():
+    return {"crawl": await crawl_status()}
+
+
+@router.delete("/crawl")
+async def stop_crawl():
+    return {"cancelled": await cancel_bulk_crawl(everywhere=True), "crawl": await crawl_status()}
+
+
+@router.get("/models")
+async def get_models():
+    return {"models": model_manager.status()}
@@ -1,12 +1,14 @@
 # backend/api/routes/chat.py
 
 from __future__ import annotations
-from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Query
+from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Query, Request, WebSocket, WebSocketDisconnect
 from pydantic import BaseModel
 from starlette.concurrency import run_in_threadpool
 from urllib.parse import urlparse
+import os
 import re
 import json
+import asyncio
 from uuid import uuid4
 
 from api.db.redis import get_redis_client
@@ -14,9 +16,16 @@ from api.db.redis import get_redis_client
 # from api.services.crawl import crawl_url
 from api.services.get_single_recruit import get_single_recruit
 from api.services.extract import extract_pdf_text
+from api.services.upload import ingest_pdf
 from api.services.summarize import summarize_text
 from ollama import ollama_chat, ollama_embed_batch  # 기존 ollama_chat 유지 (fallback용)
-from api.rag.rag import rag_ollama_chat, save_to_chroma, delete_chroma_collection, chunk_text
+from api.rag.rag import rag_ollama_chat, save_to_chroma, delete_chroma_collection, chunk_text, RAG_CONTEXT_TOKENS
+from api.llm.scheduler import BATCH, INTERACTIVE
+from api.llm.profiles import get_profile
+from api.llm.prompt import Section, assemble_prompt
+from api.llm.cancel import run_cancellable
+from api.metrics import track_call, LLM_ABANDONED
+from api.services.deadline import Deadline
 
 router = APIRouter()
 
@@ -28,6 +37,15 @@ STARTED_KEY = "session:started:{sid}"
 TOPIC_TURN_KEY = "session:topic_turn:{sid}"  # 꼬리질문 카운트용
 MAX_FOLLOWUPS = 2  # 꼬리질문 2번 하고 나면 새 질문으로 전환
 
+# WebSocket 세션: 메모리 상태를 Redis 에 모아서 저장하는 주기 (초)
+WS_FLUSH_INTERVAL = float(os.getenv("CHAT_WS_FLUSH_INTERVAL", 2.0))
+WS_SESSION_NOT_FOUND = 4404
+WS_UNSUPPORTED_DATA = 1003
+
+# 프롬프트 토큰 예산 (api.llm.prompt)
+CHAT_HISTORY_TOKENS = int(os.getenv("CHAT_HISTORY_TOKENS", 800))            # 매 턴 대화 기록 상한
+CHAT_TURN_RESERVE_TOKENS = int(os.getenv("CHAT_TURN_RESERVE_TOKENS", 2200))  # 시스템 프롬프트 외 매 턴에 필요한 몫
+
 READY_MESSAGE = "모의 면접 준비 완료! 아래에 '시작하기'라고 입력하면 면접을 시작합니다."
 
 
@@ -60,7 +78,23 @@ def _build_system_prompt(job_text: str, resume_text: str) -> str:
     job_text = _clean_text(job_text)
     resume_text = _clean_text(resume_text)
 
-    return f"""
+    # 매 턴 지시문 / 대화 기록 / RAG 문맥이 들어갈 자리를 남기고 채용공고 → 이력서 순으로 줄임
+    head, tail = _SYSTEM_PROMPT_TEMPLATE.split("{sections}")
+    return assemble_prompt(
+        [
+            head,
+            Section("jd", job_text, priority=2, min_tokens=400),
+            "\n\n[이력서 요약]\n",
+            Section("resume", resume_text, priority=1, min_tokens=300),
+            tail,
+        ],
+        route="chat_start",
+        num_predict=get_profile("interview_turn").num_predict,
+        reserve=CHAT_TURN_RESERVE_TOKENS,
+    )
+
+
+_SYSTEM_PROMPT_TEMPLATE = """
 너는 특정 회사의 채용 면접을 진행하는 **실무 면접관**이다.
 
 [역할]
@@ -81,21 +115,29 @@ def _build_system_prompt(job_text: str, resume_text: str) -> str:
 - 다만, 원문 문장을 그대로 읽거나 나열하지 말고, 질문에만 참고자료로 활용한다.
 
 [채용공고 요약]
-{job_text}
-
-[이력서 요약]
-{resume_text}
-    """.strip()
+{sections}""".strip()
 
 
-def _format_history(history: list[dict[str, str]]) -> str:
-    # Ollama에 넣기 쉬운 형태로 대화 로그를 평문으로 만듦
+def _history_section(history: list[dict[str, str]]) -> Section:
+    # Ollama에 넣기 쉬운 형태로 대화 로그를 평문으로 만듦 (예산이 부족하면 오래된 턴부터 제외)
     # history item: {"role": "user"/"assistant", "content": "..."}
     lines = []
     for m in history:
         role = "User" if m["role"] == "user" else "Assistant"
         lines.append(f"{role}: {m['content']}")
-    return "\n".join(lines).strip()
+    return Section("history", items=lines, keep="tail", max_tokens=CHAT_HISTORY_TOKENS)
+
+
+def _turn_prompt(profile: str, *parts) -> str:
+    # RAG 문맥(rag_ollama_chat 에서 추가) 자리를 남기고 조립
+    # 토큰 수는 rag_ollama_chat 이 최종 프롬프트를 조립할 때 한 번만 기록
+    return assemble_prompt(
+        list(parts),
+        route="chat_message",
+        num_predict=get_profile(profile).num_predict,
+        reserve=RAG_CONTEXT_TOKENS,
+        record=False,
+    )
 
 
 def _is_start_trigger(text: str) -> bool:
@@ -115,48 +157,40 @@ async def start(
         raise HTTPException(status_code=500, detail="Redis 연결 실패")
 
     sid = session_id or str(uuid4())
+    # 요청 전체 마감 시간 (크롤링 / 추출 / 요약이 남은 시간을 나눠 씀)
+    deadline = Deadline("chat_start")
 
     _validate_url(url)
 
-    if file.content_type != "application/pdf":
-        raise HTTPException(status_code=400, detail="PDF 파일만 업로드할 수 있습니다.")
-
-    # 1) 파일 bytes 먼저 읽기
-    pdf_bytes = await file.read()
-    if not pdf_bytes:
-        raise HTTPException(status_code=400, detail="업로드된 PDF가 비어 있습니다.")
+    # 1) 업로드 검증 (타입 / 크기 / 해시, 스풀 파일 그대로 사용)
+    upload = await ingest_pdf(file)
 
     # 2) crawl
-    job_crawl = await get_single_recruit(url)
+    job_crawl = await get_single_recruit(url, deadline=deadline)
+    if not job_crawl:
+        raise HTTPException(status_code=502, detail="채용공고 크롤링에 실패했습니다.")
     job_text = job_crawl["content"]
     print(job_text)
     # print("타입은?", type(job_text))
 
     # 3) extract
-    resume_text = await run_in_threadpool(extract_pdf_text, pdf_bytes, summarize=False)
+    resume_text = await run_in_threadpool(extract_pdf_text, upload.file, summarize=False, deadline=deadline)
     # print("이력서 타입은?", type(resume_text))
 
     # 4) summary (기존 요약 유지)
-    resume_summary = await summarize_text(resume_text, language="ko", style="structured")
+    resume_summary = await summarize_text(
+        resume_text, language="ko", style="structured", priority=BATCH, session_id=sid, deadline=deadline
+    )
 
-    # 5) system prompt 생성 + 저장
+    # 5) system prompt 생성 + 세션 상태 초기화 (Redis, 파이프라인 1회)
     system_prompt = _build_system_prompt(job_text=job_text, resume_text=resume_summary)
-    await redis_client.set(PROMPT_KEY.format(sid=sid), system_prompt, ex=TTL_SECONDS)
-
-    # 6) 세션 상태 초기화 (Redis)
-    await redis_client.set(STARTED_KEY.format(sid=sid), "False", ex=TTL_SECONDS)
-    await redis_client.set(TOPIC_TURN_KEY.format(sid=sid), "0", ex=TTL_SECONDS)
     history = [{"role": "assistant", "content": READY_MESSAGE}]
-    await redis_client.set(
-        HISTORY_KEY.format(sid=sid),
-        json.dumps(history, ensure_ascii=False),
-        ex=TTL_SECONDS,
-    )
+    await InterviewSession(sid, system_prompt, history, False, 0).save(redis_client)
 
     # 추가: ChromaDB에 resume_text 저장 (RAG용)
     collection_name = f"resume_{sid}"
     try:
-        await save_to_chroma(resume_text, collection_name)
+        await save_to_chroma(resume_text, collection_name, priority=BATCH, session_id=sid)
     except Exception as e:
         # ChromaDB 실패 시 로그만 남기고 진행 (종속되지 않음)
         print(f"ChromaDB 저장 실패: {e}")
@@ -202,58 +236,76 @@ async def history(sessionId: str = Query(...)):
     }
 
 
-@router.post("/message")
-async def message(req: MessageReq):
-    redis_client = await get_redis_client()
-    if redis_client is None:
-        raise HTTPException(status_code=500, detail="Redis 연결 실패")
+# -----------------------
+# 면접 세션 상태 (HTTP / WebSocket 공용)
+# -----------------------
+def _decode(value) -> str | None:
+    if value is None:
+        return None
+    return value.decode("utf-8") if isinstance(value, (bytes, bytearray)) else str(value)
 
-    sid = (req.sessionId or "").strip()
-    user_text = (req.message or "").strip()
 
-    if not sid:
-        raise HTTPException(status_code=400, detail="sessionId가 필요합니다.")
+class InterviewSession:
+    """세션 Redis 키 4개(prompt / history / started / topic_turn)를 한 번에 읽고 쓴다"""
+    __slots__ = ("sid", "system_prompt", "history", "started", "topic_turn")
 
-    if not user_text:
-        raise HTTPException(status_code=400, detail="message가 비어 있습니다.")
+    def __init__(self, sid: str, system_prompt: str, history: list[dict], started: bool, topic_turn: int):
+        self.sid = sid
+        self.system_prompt = system_prompt
+        self.history = history
+        self.started = started
+        self.topic_turn = topic_turn
 
-    # Redis에서 prompt 확인 (세션 존재 여부)
-    system_prompt_b = await redis_client.get(PROMPT_KEY.format(sid=sid))
-    if not system_prompt_b:
-        raise HTTPException(
-            status_code=404,
-            detail="세션을 찾을 수 없습니다. 먼저 /chat/start를 호출하세요.",
+    @classmethod
+    async def load(cls, redis_client, sid: str) -> "InterviewSession | None":
+        """prompt 가 없으면(세션 없음 / 만료) None"""
+        prompt, history_json, started, topic_turn = map(_decode, await redis_client.mget(
+            PROMPT_KEY.format(sid=sid),
+            HISTORY_KEY.format(sid=sid),
+            STARTED_KEY.format(sid=sid),
+            TOPIC_TURN_KEY.format(sid=sid),
+        ))
+        if not prompt:
+            return None
+        topic_turn = topic_turn or "0"
+        return cls(
+            sid,
+            prompt,
+            json.loads(history_json) if history_json else [],
+            started == "True",
+            int(topic_turn) if topic_turn.isdigit() else 0,
         )
 
-    if isinstance(system_prompt_b, (bytes, bytearray)):
-        system_prompt = system_prompt_b.decode("utf-8")
-    else:
-        system_prompt = str(system_prompt_b)
-
-    # history 로드
-    history_json = await redis_client.get(HISTORY_KEY.format(sid=sid))
-    if history_json and isinstance(history_json, (bytes, bytearray)):
-        history_json = history_json.decode("utf-8")
-    history = json.loads(history_json) if history_json else []
-
-    # 사용자 메시지 추가
-    history.append({"role": "user", "content": user_text})
-
-    # started 로드
-    started_b = await redis_client.get(STARTED_KEY.format(sid=sid))
-    started_s = "False" if started_b is None else (
-        started_b.decode("utf-8") if isinstance(started_b, (bytes, bytearray)) else str(started_b)
-    )
-    started = started_s == "True"
+    async def save(self, redis_client) -> None:
+        """키 4개를 파이프라인 1회로 저장 (TTL 도 함께 갱신)"""
+        with track_call("redis", "session_save"):
+            async with redis_client.pipeline(transaction=False) as pipe:
+                pipe.set(PROMPT_KEY.format(sid=self.sid), self.system_prompt, ex=TTL_SECONDS)
+                pipe.set(HISTORY_KEY.format(sid=self.sid), json.dumps(self.history, ensure_ascii=False), ex=TTL_SECONDS)
+                pipe.set(STARTED_KEY.format(sid=self.sid), str(self.started), ex=TTL_SECONDS)
+                pipe.set(TOPIC_TURN_KEY.format(sid=self.sid), str(self.topic_turn), ex=TTL_SECONDS)
+                await pipe.execute()
+
+
+async def _interview_turn(session: InterviewSession, user_text: str, *, generate, on_token=None) -> str:
+    """
+    면접 1턴: 사용자 메시지 → 면접관 응답
+    generate: rag_ollama_chat 코루틴을 받아 실행 (취소 / 시간 초과 처리는 호출하는 쪽)
+    응답을 받은 경우에만 session 상태(history / started / topic_turn)를 바꾼다
+    """
+    history = session.history + [{"role": "user", "content": user_text}]
+    started, topic_turn = session.started, session.topic_turn
+    collection_name = f"resume_{session.sid}"
 
     # 시작 트리거 처리 (아직 started=False 인 상태)
     if not started:
-        if _is_start_trigger(user_text):
-            await redis_client.set(STARTED_KEY.format(sid=sid), "True", ex=TTL_SECONDS)
-            await redis_client.set(TOPIC_TURN_KEY.format(sid=sid), "0", ex=TTL_SECONDS)
-
-            prompt = f"""
-{system_prompt}
+        if not _is_start_trigger(user_text):
+            # 아직 시작 전이면 READY_MESSAGE 반복
+            answer = READY_MESSAGE
+        else:
+            prompt = _turn_prompt(
+                "interview_question",
+                f"""{session.system_prompt}
 
 [이번 턴의 목표]
 - 지금부터 **첫 번째 면접 질문**을 만든다.
@@ -266,54 +318,25 @@ async def message(req: MessageReq):
 - 반드시 물음표(?)로 끝나야 한다.
 - 두 개 이상의 질문을 한 문장에 넣지 않는다.
 
-위 조건을 만족하는 첫 질문 1개만 출력해라.
-""".strip()
+위 조건을 만족하는 첫 질문 1개만 출력해라.""",
+            )
 
-            collection_name = f"resume_{sid}"
-            res = await rag_ollama_chat(
+            res = await generate(rag_ollama_chat(
                 base_prompt=prompt,
                 collection_name=collection_name,
-                temperature=0.0,           # 0.0으로 고정 (창의성 완전 차단)
-                top_p=0.1,
-                repeat_penalty=1.5,        # 반복/장황함 강하게 억제
-                num_predict=120
-                )
+                profile="interview_question",  # temperature 0, 물음표 1문장에서 생성 종료
+                priority=INTERACTIVE,
+                session_id=session.sid,
+                on_token=on_token,
+            ))
             answer = (res.get("answer") or "").strip() or "좋습니다. 먼저 자기소개를 1분 정도로 해주세요."
-
-            history.append({"role": "assistant", "content": answer})
-            await redis_client.set(
-                HISTORY_KEY.format(sid=sid),
-                json.dumps(history, ensure_ascii=False),
-                ex=TTL_SECONDS,
-            )
-
-            return {"sessionId": sid, "answer": answer}
-
-        # 아직 시작 전이면 READY_MESSAGE 반복
-        answer = READY_MESSAGE
-        history.append({"role": "assistant", "content": answer})
-        await redis_client.set(
-            HISTORY_KEY.format(sid=sid),
-            json.dumps(history, ensure_ascii=False),
-            ex=TTL_SECONDS,
-        )
-        return {"sessionId": sid, "answer": answer}
-
-    # === 여기부터는 started == True, 면접 진행 중 ===
-
-    # 꼬리질문 카운트 로드
-    topic_turn_b = await redis_client.get(TOPIC_TURN_KEY.format(sid=sid))
-    topic_turn_s = "0" if topic_turn_b is None else (
-        topic_turn_b.decode("utf-8") if isinstance(topic_turn_b, (bytes, bytearray)) else str(topic_turn_b)
-    )
-    topic_turn = int(topic_turn_s) if topic_turn_s.isdigit() else 0
-
-    collection_name = f"resume_{sid}"
+            started, topic_turn = True, 0
 
     # 1) 아직 꼬리질문 횟수가 MAX_FOLLOWUPS 미만이면 → 같은 주제에 대한 follow-up
-    if topic_turn < MAX_FOLLOWUPS:
-        prompt = f"""
-{system_prompt}
+    elif topic_turn < MAX_FOLLOWUPS:
+        prompt = _turn_prompt(
+            "interview_turn",
+            f"""{session.system_prompt}
 
 너는 이제 방금 직전에 지원자가 한 답변에 대해
 1) 아주 짧은 피드백
@@ -329,36 +352,32 @@ async def message(req: MessageReq):
 - 전체 출력은 반드시 2줄이어야 한다.
 
 [참고용 최근 대화 일부]
-{_format_history(history)}
+""",
+            _history_section(history),
+            """
 
 위 형식을 절대 어기지 말고,
-정확히 2줄만 출력해라.
-""".strip()
-
+정확히 2줄만 출력해라.""",
+        )
 
-        res = await rag_ollama_chat(
+        res = await generate(rag_ollama_chat(
             base_prompt=prompt,
             collection_name=collection_name,
-            temperature=0.0,           # 0.0으로 고정 (창의성 완전 차단)
-            top_p=0.1,
-            repeat_penalty=1.5,        # 반복/장황함 강하게 억제
-            num_predict=120
-            )
+            profile="interview_turn",  # temperature 0, 2줄이 완성되면 생성 종료
+            priority=INTERACTIVE,
+            session_id=session.sid,
+            on_token=on_token,
+        ))
         answer = res.get("answer", "").strip()
         if not answer:
             answer = "좋은 답변이에요. 조금 더 구체적으로 상황(S), 과제(T), 행동(A), 결과(R)를 나눠서 설명해줄 수 있을까요?"
-
         topic_turn += 1
-        await redis_client.set(
-            TOPIC_TURN_KEY.format(sid=sid),
-            str(topic_turn),
-            ex=TTL_SECONDS,
-        )
 
     # 2) 꼬리질문을 충분히 한 경우 → 새로운 주제의 질문으로 전환
     else:
-        prompt = f"""
-{system_prompt}
+        prompt = _turn_prompt(
+            "interview_turn",
+            f"""{session.system_prompt}
 
 이제 방금까지 이야기하던 주제와는 **다른 새로운 주제**로 질문을 바꿔야 한다.
 지원자의 이력서와 채용공고를 참고하여,
@@ -377,51 +396,225 @@ async def message(req: MessageReq):
 2줄째: 새로운 주제의 면접 질문 1개 (최대 35자, 반드시 물음표로 끝남)
 
 [참고용 최근 대화 일부]
-{_format_history(history)}
+""",
+            _history_section(history),
+            """
 
 위 형식에서 벗어나지 말고,
-정확히 2줄만 출력해라.
-""".strip()
+정확히 2줄만 출력해라.""",
+        )
 
-        res = await rag_ollama_chat(
+        res = await generate(rag_ollama_chat(
             base_prompt=prompt,
             collection_name=collection_name,
-            temperature=0.0,           # 0.0으로 고정 (창의성 완전 차단)
-            top_p=0.1,
-            repeat_penalty=1.5,        # 반복/장황함 강하게 억제
-            num_predict=120
-            )
+            profile="interview_turn",  # temperature 0, 2줄이 완성되면 생성 종료
+            priority=INTERACTIVE,
+            session_id=session.sid,
+            on_token=on_token,
+        ))
         answer = res.get("answer", "").strip()
         if not answer:
             answer = "좋습니다. 다른 경험 하나를 골라서, 본인이 가장 성장했다고 느낀 순간을 이야기해 주실 수 있을까요?"
-
         # 새 주제로 넘어갔으니 꼬리질문 카운트 리셋
         topic_turn = 0
-        await redis_client.set(
-            TOPIC_TURN_KEY.format(sid=sid),
-            str(topic_turn),
-            ex=TTL_SECONDS,
-        )
 
-    # 공통: history 저장
     history.append({"role": "assistant", "content": answer})
-    try:
-        await redis_client.set(
-            HISTORY_KEY.format(sid=sid),
-            json.dumps(history, ensure_ascii=False),
-            ex=TTL_SECONDS,
+    session.history, session.started, session.topic_turn = history, started, topic_turn
+    return answer
+
+
+@router.post("/message")
+async def message(req: MessageReq, request: Request):
+    redis_client = await get_redis_client()
+    if redis_client is None:
+        raise HTTPException(status_code=500, detail="Redis 연결 실패")
+
+    sid = (req.sessionId or "").strip()
+    user_text = (req.message or "").strip()
+
+    if not sid:
+        raise HTTPException(status_code=400, detail="sessionId가 필요합니다.")
+
+    if not user_text:
+        raise HTTPException(status_code=400, detail="message가 비어 있습니다.")
+
+    # Redis에서 세션 상태 로드 (prompt 가 없으면 세션 없음)
+    session = await InterviewSession.load(redis_client, sid)
+    if session is None:
+        raise HTTPException(
+            status_code=404,
+            detail="세션을 찾을 수 없습니다. 먼저 /chat/start를 호출하세요.",
         )
-        # 디버깅용 로그
-        saved = await redis_client.get(HISTORY_KEY.format(sid=sid))
-        if saved:
-            saved_decoded = saved.decode("utf-8") if isinstance(saved, bytes) else saved
-            print(f"Redis 저장 확인: {len(json.loads(saved_decoded))} 메시지")
+
+    answer = await _interview_turn(
+        session,
+        user_text,
+        generate=lambda coro: run_cancellable(request, coro, route="chat_message"),
+    )
+
+    try:
+        await session.save(redis_client)
+        print(f"Redis 저장 확인: {len(session.history)} 메시지")
     except Exception as redis_err:
         print(f"Redis 저장 실패: {redis_err}")
 
     return {"sessionId": sid, "answer": answer}
 
 
+# -----------------------
+# WebSocket 면접 (/chat/ws?sessionId=...)
+# -----------------------
+class SessionWriteBehind:
+    """
+    WebSocket 연결 동안 세션 상태는 메모리에 두고 Redis 에는 모아서 저장
+    - 턴이 끝나면 mark() → WS_FLUSH_INTERVAL 안의 변경은 한 번에 저장
+    - 연결이 끝나면 close() 로 즉시 저장 (재접속 / HTTP API 가 같은 키를 읽음)
+    """
+    __slots__ = ("redis_client", "session", "interval", "dirty", "_task")
+
+    def __init__(self, redis_client, session: InterviewSession, interval: float):
+        self.redis_client = redis_client
+        self.session = session
+        self.interval = interval
+        self.dirty = False
+        self._task: asyncio.Task | None = None
+
+    def mark(self) -> None:
+        self.dirty = True
+        if self._task is None:
+            self._task = asyncio.create_task(self._flush_later())
+
+    async def _flush_later(self) -> None:
+        await asyncio.sleep(self.interval)
+        self._task = None
+        await self.flush()
+
+    async def flush(self) -> None:
+        if not self.dirty:
+            return
+        self.dirty = False
+        try:
+            await self.session.save(self.redis_client)
+        except Exception as e:
+            self.dirty = True
+            print(f"⚠️ 세션 저장 실패 [{self.session.sid}]: {e}", flush=True)
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        await self.flush()
+
+
+def _ws_text(raw: str) -> str:
+    # {"type": "message", "message": "..."} 또는 평문
+    try:
+        data = json.loads(raw)
+    except ValueError:
+        return raw.strip()
+    if isinstance(data, dict):
+        return str(data.get("message") or "").strip()
+    return str(data).strip()
+
+
+@router.websocket("/ws")
+async def interview_ws(websocket: WebSocket, sessionId: str = Query(...)):
+    """
+    서버 → 클라이언트
+      {"type": "ready", "sessionId", "started", "history"}   접속 직후 (재접속이면 이어서 진행)
+      {"type": "token", "text"}                              생성 중 조각
+      {"type": "answer", "answer"}                           턴 종료 (history 에 저장되는 최종 응답)
+      {"type": "error", "detail"}
+    클라이언트 → 서버
+      {"type": "message", "message": "..."} 또는 평문
+    세션 키는 /chat/message 와 같으므로 연결이 안 되면 HTTP API 로 그대로 이어갈 수 있음
+    """
+    await websocket.accept()
+    sid = (sessionId or "").strip()
+
+    redis_client = await get_redis_client()
+    session = await InterviewSession.load(redis_client, sid) if redis_client is not None and sid else None
+    if session is None:
+        await websocket.send_json({"type": "error", "detail": "세션을 찾을 수 없습니다. 먼저 /chat/start를 호출하세요."})
+        await websocket.close(code=WS_SESSION_NOT_FOUND)
+        return
+
+    writer = SessionWriteBehind(redis_client, session, WS_FLUSH_INTERVAL)
+    await websocket.send_json({
+        "type": "ready",
+        "sessionId": sid,
+        "started": session.started,
+        "history": session.history,
+    })
+
+    # 생성 중에도 연결 끊김을 알 수 있도록 수신은 별도 태스크 (None = 연결 끊김)
+    inbox: asyncio.Queue[str | None] = asyncio.Queue()
+
+    async def _reader():
+        try:
+            while True:
+                message = await websocket.receive()
+                if message["type"] == "websocket.disconnect":
+                    break
+                if message.get("text") is None:
+                    # 바이너리 프레임은 받지 않음 → 1003 (unsupported data) 으로 종료
+                    await websocket.close(code=WS_UNSUPPORTED_DATA)
+                    break
+                await inbox.put(message["text"])
+        except WebSocketDisconnect:
+            pass
+        except Exception as e:
+            print(f"⚠️ WebSocket 수신 실패 [{sid}]: {e}", flush=True)
+        finally:
+            # 어떤 이유로 끝나든 본 루프가 기다리지 않도록
+            inbox.put_nowait(None)
+
+    async def _send_token(text: str):
+        await websocket.send_json({"type": "token", "text": text})
+
+    reader = asyncio.create_task(_reader())
+    try:
+        while (raw := await inbox.get()) is not None:
+            user_text = _ws_text(raw)
+            if not user_text:
+                await websocket.send_json({"type": "error", "detail": "message가 비어 있습니다."})
+                continue
+
+            turn = asyncio.create_task(_interview_turn(
+                session,
+                user_text,
+                generate=lambda coro: run_cancellable(None, coro, route="chat_ws"),
+                on_token=_send_token,
+            ))
+            await asyncio.wait({turn, reader}, return_when=asyncio.FIRST_COMPLETED)
+            if not turn.done():
+                # 생성 도중 연결 끊김 → 생성 중단 (상태는 바뀌지 않음)
+                turn.cancel()
+                await asyncio.gather(turn, return_exceptions=True)
+                LLM_ABANDONED.labels("chat_ws", "disconnect").inc()
+                print(f"🔌 WebSocket 연결 끊김 → LLM 생성 중단 [{sid}]", flush=True)
+                break
+
+            try:
+                answer = turn.result()
+            except HTTPException as e:
+                await websocket.send_json({"type": "error", "detail": e.detail})
+                continue
+            except Exception as e:
+                if reader.done():
+                    break  # 토큰 전송 중 연결 끊김
+                print(f"⚠️ WebSocket 면접 턴 실패 [{sid}]: {e}", flush=True)
+                await websocket.send_json({"type": "error", "detail": "응답 생성에 실패했습니다."})
+                continue
+            writer.mark()
+            await websocket.send_json({"type": "answer", "answer": answer})
+    except WebSocketDisconnect:
+        pass
+    finally:
+        reader.cancel()
+        await writer.close()
+
+
 @router.post("/terminate")
 async def terminate(req: TerminateReq):
     redis_client = await get_redis_client()
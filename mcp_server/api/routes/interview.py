@@ -1,18 +1,31 @@
 import re
+import os
+import json
+import time
 import asyncio
-from fastapi import APIRouter, UploadFile, File, Form, HTTPException
+from uuid import uuid4
+from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Request
+from fastapi.responses import StreamingResponse
 from starlette.concurrency import run_in_threadpool
 from pydantic import HttpUrl
 
 from api.services.extract import extract_pdf_text
+from api.services.upload import ingest_pdf
 # from api.services.crawl import crawl_url
 from ollama import ollama_chat
+from api.llm.prompt import Section, assemble_prompt
+from api.llm.cancel import run_cancellable, wait_disconnect
+from api.metrics import LLM_ABANDONED
+from api.services.deadline import Deadline
 from pydantic import BaseModel
 from typing import Optional
 from api.services.get_single_recruit import get_single_recruit
 
 router = APIRouter()
 
+QUESTION_TOKENS = 60  # 질문 1줄당 최대 토큰 (question_list 프로필)
+FEEDBACK_BATCH_MAX_ITEMS = int(os.getenv("FEEDBACK_BATCH_MAX_ITEMS", 20))  # /feedback/batch 1회 최대 항목 수
+
 def _parse_questions(raw: str, limit: int = 5) -> list[str]:
   """
   LLM 출력이 번호/블릿/줄바꿈 형태여도 질문 리스트로 최대한 파싱
@@ -36,7 +49,7 @@ def _parse_questions(raw: str, limit: int = 5) -> list[str]:
           
   return out
 
-async def _call_ollama(prompt: str):
+async def _call_ollama(prompt: str, **kwargs):
   """
   ollama_chat이 async일 수도, sync일 수도 있는 환경을 방어적으로 처리
   resume_analyze.py에서는 await ollama_chat(prompt) 형태라 async일 가능성이 큼.
@@ -44,47 +57,45 @@ async def _call_ollama(prompt: str):
   import inspect
   
   if inspect.iscoroutinefunction(ollama_chat):
-    return await ollama_chat(prompt)
-  return await run_in_threadpool(ollama_chat, prompt)
+    return await ollama_chat(prompt, **kwargs)
+  return await run_in_threadpool(lambda: ollama_chat(prompt, **kwargs))
 
   
 @router.post("/questions")
 async def make_questions(
+  request: Request,
   jc_code: str = Form(...),
   job_name: str | None = Form(None),
   url: HttpUrl = Form(...),
   file: UploadFile = File(...),
   n_questions: int = Form(4),
 ):
+  # 요청 전체 마감 시간 (크롤링 / 추출 / 생성이 남은 시간을 나눠 씀)
+  deadline = Deadline("interview_questions")
+
   # 1) 유효성 체크
   if not jc_code:
       raise HTTPException(status_code=400, detail="jc_code가 필요합니다.")
-  if file.content_type != "application/pdf":
-      raise HTTPException(status_code=400, detail="PDF만 업로드 가능합니다.")
   if n_questions < 4 or n_questions > 15:
       raise HTTPException(status_code=400, detail="n_questions는 4~15 사이여야 합니다.")
     
-  # 1) PDF bytes 읽기
-  pdf_bytes = await file.read()
-  if not pdf_bytes:
-      raise HTTPException(status_code=400, detail="업로드된 파일이 비어있습니다.") 
+  # 1) PDF 업로드 검증 (타입 / 크기 / 해시)
+  upload = await ingest_pdf(file, empty_detail="업로드된 파일이 비어있습니다.")
   
   # 2) extract.py 사용해서 텍스트 추출 (동기 함수 -> threadpool)
-  resume_text = await run_in_threadpool(extract_pdf_text, pdf_bytes)
+  resume_text = await run_in_threadpool(extract_pdf_text, upload.file, deadline=deadline)
   resume_text = (resume_text or "").strip()
   
   if not resume_text or "추출하지 못했습니다" in resume_text or resume_text == "Not text":
       raise HTTPException(status_code=400, detail="PDF 텍스트 추출에 실패했습니다.")
   if len(resume_text) < 200:
       raise HTTPException(status_code=400, detail="추출된 텍스트가 너무 짧습니다(200자 미만).")
-  if len(resume_text) > 8000:
-      resume_text = resume_text[:8000]
   
-  # 3) 채용공고 크롤링(타임아웃)
+  # 3) 채용공고 크롤링 (생성 단계 몫을 남긴 예산 안에서, 실패 / 시간 초과면 캐시 또는 실패 문구)
   jd_text = ""
 
   try:
-    job_crawl = await asyncio.wait_for(get_single_recruit(str(url)), timeout=120)
+    job_crawl = await get_single_recruit(str(url), deadline=deadline)
     
     if not job_crawl or not job_crawl.get("content"):
       jd_text = "채용공고 크롤링 실패했습니다"
@@ -99,9 +110,12 @@ async def make_questions(
       
   job_label = job_name or jc_code
   
-  # 3) 프롬포트
-  prompt = f"""
-당신은 채용 면접관입니다. 사용자가 입력한 자료(직무/채용공고/자기소개서)를 분석해 "면접 예상 질문"만 생성 해주세요.
+  # 3) 프롬포트 (컨텍스트 예산 안에서 채용공고 → 자기소개서 순으로 줄임)
+  # 질문 1개 ≈ 60토큰 → 개수에 맞춰 최대 토큰 제한
+  num_predict = QUESTION_TOKENS * n_questions + 40
+  prompt = assemble_prompt(
+    [
+      f"""당신은 채용 면접관입니다. 사용자가 입력한 자료(직무/채용공고/자기소개서)를 분석해 "면접 예상 질문"만 생성 해주세요.
 절대 단순 요약을 하지 마세요. 절대 해설/답변/머리말/부연설명/카테고리 제목을 쓰지 마세요.
 반드시 물음표 "?" 로 끝나는 문장만 출력하세요.
 
@@ -109,23 +123,37 @@ async def make_questions(
 {job_label}
 
 [채용공고]
-{jd_text}
+""",
+      Section("jd", jd_text, priority=2, min_tokens=400),
+      """
 
 [자기소개서]
-{resume_text}
+""",
+      Section("resume", resume_text, priority=1, min_tokens=500),
+      f"""
 
 출력 규칙(중요):
 - 질문은 총 {n_questions}개
 - 한 줄에 질문 1개
 - 해설/머리말/추가 설명 금지.
 - 리스트 형태로 출력해주세요.
-- 반드시 물음표 "?" 로 끝나는 문장만 출력해주세요.
-""".strip()
+- 반드시 물음표 "?" 로 끝나는 문장만 출력해주세요.""",
+    ],
+    route="interview_questions",
+    num_predict=num_predict,
+  )
 
 
-  # 4) Ollama 호출
+  # 4) Ollama 호출 (클라이언트 연결이 끊기거나 시간 초과면 생성까지 중단)
   try:
-    result = await asyncio.wait_for(_call_ollama(prompt), timeout=120)
+    result = await run_cancellable(
+      request,
+      _call_ollama(prompt, profile="question_list", num_predict=num_predict, deadline=deadline),
+      route="interview_questions",
+      timeout=None,
+    )
+  except HTTPException:
+    raise
   except Exception:
     raise HTTPException(status_code=504, detail="LLM 응답이 지연되고 있습니다. 잠시 후 다시 시도해주세요.")
   
@@ -162,24 +190,30 @@ async def make_questions(
 class InterviewFeedbackRequest(BaseModel):
   question: str
   user_answer: str
-  
-@router.post("/feedback")
-async def make_feedback(req: InterviewFeedbackRequest):
-  # 1) 예외 처리
 
-  q = (req.question or "").strip()
+
+class InterviewFeedbackBatchRequest(BaseModel):
+  items: list[InterviewFeedbackRequest]
+  sessionId: Optional[str] = None  # 있으면 스케줄러 공정 큐잉 단위로 사용
+
+
+def _feedback_input(question: str, user_answer: str) -> tuple[str, str]:
+  """질문 / 답변 검증 + 정리 (문제가 있으면 HTTPException 400)"""
+  q = (question or "").strip()
   if not q:
     raise HTTPException(status_code=400, detail="question이 필요합니다.")
-  
-  user_answer = (req.user_answer or "").strip()
+
+  user_answer = (user_answer or "").strip()
   if len(user_answer) < 20:
     raise HTTPException(status_code=400, detail="user_answer는 최소 20자 이상이어야 합니다.")
   if len(user_answer) > 2000:
     user_answer = user_answer[:2000]
-    
+  return q, user_answer
 
-# 3) prompt (피드백만, 구조화)
-  prompt = f"""
+
+def _feedback_prompt(q: str, user_answer: str) -> str:
+  # 피드백만, 구조화
+  return f"""
 너는 면접 코치다. 아래 입력을 바탕으로 "지원자의 답변 피드백"을 한국어로 작성해라.
 절대 면접관 역할극을 하지 말고, 평가/개선 중심으로 코칭하라.
 
@@ -202,19 +236,38 @@ async def make_feedback(req: InterviewFeedbackRequest):
 
 """.strip()
 
-  try:
-    result = await asyncio.wait_for(_call_ollama(prompt), timeout=120)
-  except Exception:
-      raise HTTPException(status_code=504, detail="LLM 응답이 지연되고 있습니다. 잠시 후 다시 시도해주세요.")
-    
+
+def _feedback_result(result) -> tuple[str, str]:
+  """LLM 결과 → (feedback, model)"""
   model = ""
   if isinstance(result, dict):
       feedback = result.get("answer", "") or result.get("content", "") or ""
       model = result.get("model") or ""
   else:
       feedback = str(result)
-      
-  feedback = (feedback or "").strip()
+  return (feedback or "").strip(), model
+
+
+@router.post("/feedback")
+async def make_feedback(req: InterviewFeedbackRequest, request: Request):
+  deadline = Deadline("interview_feedback")
+
+  # 1) 예외 처리
+  q, user_answer = _feedback_input(req.question, req.user_answer)
+
+  # 2) prompt
+  prompt = _feedback_prompt(q, user_answer)
+
+  try:
+    result = await run_cancellable(
+      request, _call_ollama(prompt, deadline=deadline), route="interview_feedback", timeout=None
+    )
+  except HTTPException:
+    raise
+  except Exception:
+      raise HTTPException(status_code=504, detail="LLM 응답이 지연되고 있습니다. 잠시 후 다시 시도해주세요.")
+
+  feedback, model = _feedback_result(result)
   if not feedback:
       raise HTTPException(status_code=500, detail="빈 피드백이 반환되었습니다.")
     
@@ -224,6 +277,101 @@ async def make_feedback(req: InterviewFeedbackRequest):
       "model": model,
       "question": q,
     }
-      
-    
-    
\ No newline at end of file
+
+
+def _ndjson(obj: dict) -> str:
+  return json.dumps(obj, ensure_ascii=False) + "\n"
+
+
+@router.post("/feedback/batch")
+async def make_feedback_batch(req: InterviewFeedbackBatchRequest, request: Request):
+  """
+  면접 전체 채점: (question, user_answer) 목록을 한 번에 받아 동시에 생성
+  - 같은 (질문, 답변) 은 한 번만 생성해서 해당 index 모두에 전달
+  - 생성 동시 수는 공유 Ollama 스케줄러가 제한 (배치 전체가 하나의 세션으로 공정 큐잉)
+  - 끝나는 순서대로 NDJSON 한 줄씩 응답
+      {"index", "success": true, "question", "feedback", "model"}
+      {"index", "success": false, "question", "error"}        항목별 오류 (검증 실패 / 시간 초과 등)
+      {"done": true, "total", "unique", "failed", "elapsed"}  마지막 줄
+  - 전체 마감 시간(REQUEST_DEADLINE_SECONDS)이 지나면 남은 항목은 시간 초과 오류
+  - 클라이언트 연결이 끊기면 남은 생성은 중단
+  """
+  if not req.items:
+    raise HTTPException(status_code=400, detail="items가 비어 있습니다.")
+  if len(req.items) > FEEDBACK_BATCH_MAX_ITEMS:
+    raise HTTPException(status_code=400, detail=f"items는 최대 {FEEDBACK_BATCH_MAX_ITEMS}개까지 허용합니다.")
+
+  deadline = Deadline("interview_feedback_batch")
+  batch_id = (req.sessionId or "").strip() or f"feedback-{uuid4()}"
+
+  # (질문, 답변) → 해당 index 목록
+  groups: dict[tuple[str, str], list[int]] = {}
+  invalid: list[dict] = []
+  for i, item in enumerate(req.items):
+    try:
+      key = _feedback_input(item.question, item.user_answer)
+    except HTTPException as e:
+      invalid.append({"index": i, "success": False, "question": item.question, "error": e.detail})
+      continue
+    groups.setdefault(key, []).append(i)
+
+  async def _grade(key: tuple[str, str]) -> tuple[str, str, str | None]:
+    """(feedback, model, error)"""
+    try:
+      result = await _call_ollama(_feedback_prompt(*key), session_id=batch_id, deadline=deadline)
+    except TimeoutError:
+      return "", "", "LLM 응답이 지연되고 있습니다. 잠시 후 다시 시도해주세요."
+    except HTTPException as e:
+      return "", "", str(e.detail)
+    except Exception as e:
+      print(f"⚠️ 피드백 생성 실패: {e}", flush=True)
+      return "", "", "피드백 생성에 실패했습니다."
+    feedback, model = _feedback_result(result)
+    if not feedback:
+      return "", model, "빈 피드백이 반환되었습니다."
+    return feedback, model, None
+
+  async def _stream():
+    start = time.perf_counter()
+    failed = len(invalid)
+    tasks = {asyncio.create_task(_grade(key)): key for key in groups}
+    watcher = asyncio.create_task(wait_disconnect(request))
+    pending = set(tasks)
+    try:
+      for line in invalid:
+        yield _ndjson(line)
+
+      while pending:
+        done, pending = await asyncio.wait(pending | {watcher}, return_when=asyncio.FIRST_COMPLETED)
+        if watcher in done:
+          return  # 클라이언트 연결 끊김 → 남은 생성은 finally 에서 중단
+        pending.discard(watcher)
+
+        for task in done:
+          key = tasks[task]
+          feedback, model, error = task.result()
+          for i in groups[key]:
+            if error:
+              failed += 1
+              yield _ndjson({"index": i, "success": False, "question": key[0], "error": error})
+            else:
+              yield _ndjson({"index": i, "success": True, "question": key[0], "feedback": feedback, "model": model})
+
+      yield _ndjson({
+        "done": True,
+        "total": len(req.items),
+        "unique": len(groups),
+        "failed": failed,
+        "elapsed": round(time.perf_counter() - start, 3),
+      })
+    finally:
+      # 다 끝나기 전에 멈춘 경우 (연결 끊김 → 응답 스트림 취소 포함)
+      watcher.cancel()
+      pending.discard(watcher)
+      if pending:
+        LLM_ABANDONED.labels("interview_feedback_batch", "disconnect").inc(len(pending))
+        print(f"🔌 클라이언트 연결 끊김 → 채점 {len(pending)}건 중단", flush=True)
+      for task in pending:
+        task.cancel()
+
+  return StreamingResponse(_stream(), media_type="application/x-ndjson")
@@ -1,9 +1,10 @@
 from fastapi import APIRouter, UploadFile, File, Form
 from pydantic import BaseModel
 from ollama import ollama_chat
-from pathlib import Path
-import uuid
+from api.llm.profiles import get_profile
+from api.llm.prompt import Section, assemble_prompt
 from api.services.extract import extract_pdf_text  # 앞서 작성한 PDF 추출 함수
+from api.services.upload import IngestedUpload, ingest_pdf, save_upload
 from api.services.crawl import crawl_url
 from starlette.concurrency import run_in_threadpool
 from api.services.get_single_recruit import get_single_recruit
@@ -13,27 +14,14 @@ from collections import defaultdict
 
 router = APIRouter()
 
-UPLOAD_DIR = Path("uploads")
-UPLOAD_DIR.mkdir(exist_ok=True)
-
-async def read_pdf_text(file: UploadFile) -> str:
+async def read_pdf_text(upload: IngestedUpload) -> str:
     """
-    UploadFile 형태의 PDF 파일을 읽어서 텍스트로 반환합니다.
+    검증된 업로드(스풀 파일)에서 텍스트를 추출합니다.
     """
-    # PDF인지 체크 (간단히 MIME 타입으로)
-    if file.content_type != "application/pdf":
-        return "업로드한 파일이 PDF가 아닙니다."
-
-    # 비동기로 파일 내용 읽기
-    file.file.seek(0)  # 파일 포인터 처음으로 되돌리기
-    pdf_bytes = await file.read()
-    
-    print("pdd read len:", len(pdf_bytes))
+    print("pdf read len:", upload.size)
 
-    # extract_pdf_text 함수로 텍스트 추출
-    text = extract_pdf_text(pdf_bytes)
-
-    return text
+    # extract_pdf_text 함수로 텍스트 추출 (동기 함수 -> threadpool)
+    return await run_in_threadpool(extract_pdf_text, upload.file)
 
 def find_sentences_with_keywords(text, keywords):
     """
@@ -95,13 +83,9 @@ async def jobfit(
     url: str = Form(None),
     coverLetter: UploadFile = File(...)
 ):
-    # 1️⃣ 파일 저장
-    file_ext = Path(coverLetter.filename).suffix
-    save_name = f"{uuid.uuid4()}{file_ext}"
-    save_path = UPLOAD_DIR / save_name
-
-    with open(save_path, "wb") as f:
-        f.write(await coverLetter.read())
+    # 1️⃣ 파일 검증 + 저장 (내용 해시 이름, threadpool 에서 기록)
+    upload = await ingest_pdf(coverLetter)
+    save_path = await save_upload(upload)
 
     
     print("job:", job)
@@ -109,7 +93,7 @@ async def jobfit(
     print("filename:", coverLetter.filename)
     print("saved:", save_path)
     
-    pdftext = await read_pdf_text(coverLetter)
+    pdftext = await read_pdf_text(upload)
     print("pdftext:", pdftext[:100])
     
      # crawl
@@ -123,23 +107,31 @@ async def jobfit(
     
 
     # 2️⃣ AI 프롬프트 생성
-    final_prompt = f"""
-너는 유능한 AI 어시스턴트야.
+    final_prompt = assemble_prompt(
+        [
+            f"""너는 유능한 AI 어시스턴트야.
 질문에 대해 정확하고 간결하게 답해줘.
 
 [직무]
 {job}
 
 [취업공고]
-{job_text}
+""",
+            Section("jd", job_text or "", priority=2, min_tokens=400),
+            """
 여기에 지원할꺼야!!
 
 [자기소개서]
-{pdftext}
+""",
+            Section("resume", pdftext, priority=1, min_tokens=500),
+            """
 
 [질문]
-취업 전략에 대한 종합적인 피드백을 요약해줘
-""".strip()
+취업 전략에 대한 종합적인 피드백을 요약해줘""",
+        ],
+        route="jobfit",
+        num_predict=get_profile("default").num_predict,
+    )
 
     result = await ollama_chat(final_prompt)
 
@@ -0,0 +1,17 @@
+# api/routes/metrics.py
+import os
+
+from fastapi import APIRouter, Response
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, generate_latest, multiprocess
+
+router = APIRouter()
+
+
+@router.get("/metrics")
+async def metrics():
+    # 멀티 워커: 워커별로 기록된 파일을 합산 (요청을 받은 워커만이 아니라 전체)
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return Response(content=generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
+    return Response(content=generate_latest(), media_type=CONTENT_TYPE_LATEST)
@@ -1,23 +1,69 @@
-from fastapi import APIRouter, HTTPException, Form
+import json
+import asyncio
+from functools import partial
+from uuid import uuid4
+from fastapi import APIRouter, HTTPException, Form, Request, UploadFile, File
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from starlette.concurrency import run_in_threadpool
 # from api.services.crawl import crawl_url
 from ollama import ollama_chat
+from api.llm.profiles import get_profile
+from api.llm.prompt import Section, assemble_prompt
+from api.llm.cancel import run_cancellable, wait_disconnect
+from api.services.deadline import Deadline
 from pydantic import BaseModel, HttpUrl
 from api.services.get_single_recruit import get_single_recruit
-import asyncio
+from api.services.upload import ingest_pdf
+from api.services.screening import ResumeScreening, SCREEN_MAX_FILES, SCREEN_MAX_TOP_K, SCREEN_TOP_K
 from urllib.parse import urlparse
 
 router = APIRouter()
 
+
+def _analyze_prompt(job_label: str, jd_text: str, resume_text: str, *, route: str = "resume_analyze") -> str:
+  """자기소개서(최대 4000자)는 최대한 유지하고 채용공고를 예산에 맞춰 줄임"""
+  return assemble_prompt(
+    [
+      f"""너는 전문 자기소개서/면접 코치야.
+아래 [직무], [채용공고], [자기소개서]를 바탕으로 '구체적이고 실행 가능한 피드백'을 제공해.
+
+[직무]
+{job_label}
+
+[채용공고]
+""",
+      Section("jd", jd_text, priority=2, min_tokens=400),
+      """
+
+[자기소개서]
+""",
+      Section("resume", resume_text, priority=1),
+      """
+
+출력 규칙(중요):
+- 강점 3가지 (근거 문장 포함)
+- 개선점 3가지 (왜 문제인지 + 어떻게 고칠지)
+- 추가 조언 1가지만 간략하게 알려주기
+- 해설/머리말/추가 설명 금지
+- 1500자 이내로 알려주기""",
+    ],
+    route=route,
+    num_predict=get_profile("default").num_predict,
+  )
+
+
 @router.post("/analyze")
 async def make_analyze(
+  request: Request,
   jc_code: str = Form(...),
   job_name: str | None = Form(None),
   url: str = Form(...),
   resume_text: str = Form(...),
 ):
-  
+  # 요청 전체 마감 시간 (크롤링 → 생성)
+  deadline = Deadline("resume_analyze")
+
   # 0) URL 검증/정리
   url = (url or "").strip()
   if not (url.startswith("http://") or url.startswith("https://")):
@@ -37,11 +83,11 @@ async def make_analyze(
   if len(text) > 4000:
     raise HTTPException(status_code=400, detail="resume_text는 최대 4000자까지 허용합니다.")
   
- # 3) 채용공고 크롤링(타임아웃)
+ # 3) 채용공고 크롤링 (생성 단계 몫을 남긴 예산 안에서, 실패 / 시간 초과면 캐시 또는 실패 문구)
   jd_text = ""
 
   try:
-    job_crawl = await asyncio.wait_for(get_single_recruit(str(url)), timeout=120)
+    job_crawl = await get_single_recruit(str(url), deadline=deadline)
     
     if not job_crawl or not job_crawl.get("content"):
       jd_text = "채용공고 크롤링 실패했습니다"
@@ -54,30 +100,12 @@ async def make_analyze(
         jd_text = "채용공고 크롤링에 실패했습니다."
         
   job_label = job_name or jc_code
-  
-  
-  prompt = f"""
-너는 전문 자기소개서/면접 코치야.
-아래 [직무], [채용공고], [자기소개서]를 바탕으로 '구체적이고 실행 가능한 피드백'을 제공해.
-
-[직무]
-{job_label}
+  prompt = _analyze_prompt(job_label, jd_text, text)
 
-[채용공고]
-{jd_text}
-
-[자기소개서]
-{text}
-
-출력 규칙(중요):
-- 강점 3가지 (근거 문장 포함)
-- 개선점 3가지 (왜 문제인지 + 어떻게 고칠지)
-- 추가 조언 1가지만 간략하게 알려주기
-- 해설/머리말/추가 설명 금지
-- 1500자 이내로 알려주기
-""".strip()
-
-  result = await ollama_chat(prompt)
+  # 클라이언트 연결이 끊기거나 시간 초과면 생성까지 중단
+  result = await run_cancellable(
+    request, ollama_chat(prompt, deadline=deadline), route="resume_analyze", timeout=None
+  )
   
   if isinstance(result, dict):
       feedback = result.get("answer", "")
@@ -91,4 +119,71 @@ async def make_analyze(
       "feedback": feedback,
       "model": model,
     }
-  
\ No newline at end of file
+  
+
+
+@router.post("/screen")
+async def screen_resumes(
+  request: Request,
+  jc_code: str = Form(...),
+  job_name: str | None = Form(None),
+  url: str = Form(...),
+  top_k: int = Form(SCREEN_TOP_K),
+  files: list[UploadFile] = File(...),
+):
+  """
+  채용공고 1개에 이력서 PDF 여러 개를 한 번에 스크리닝
+  - 공고는 1번만 크롤링, PDF 추출은 프로세스 풀, 임베딩 유사도로 전체 순위 → 상위 top_k 만 LLM 분석
+  - 진행 상황 / 결과를 NDJSON 한 줄씩 응답 (형식은 api/services/screening.py 참고)
+  - 클라이언트 연결이 끊기면 남은 추출 / 생성은 중단
+  """
+  url = (url or "").strip()
+  if not (url.startswith("http://") or url.startswith("https://")):
+    raise HTTPException(status_code=400, detail="url은 http:// 또는 https://로 시작해야합니다.")
+  if not jc_code:
+    raise HTTPException(status_code=400, detail="jc_code가 필요합니다.")
+  if not files:
+    raise HTTPException(status_code=400, detail="files가 비어 있습니다.")
+  if len(files) > SCREEN_MAX_FILES:
+    raise HTTPException(status_code=400, detail=f"files는 최대 {SCREEN_MAX_FILES}개까지 허용합니다.")
+  if top_k < 1 or top_k > SCREEN_MAX_TOP_K:
+    raise HTTPException(status_code=400, detail=f"top_k는 1~{SCREEN_MAX_TOP_K} 사이여야 합니다.")
+
+  screening = ResumeScreening(
+    url,
+    job_name or jc_code,
+    partial(_analyze_prompt, route="resume_screen"),
+    top_k=top_k,
+    batch_id=f"screen-{uuid4()}",
+  )
+
+  # 파일별 검증 (타입 / 크기 / 시그니처) → 실패한 파일만 항목별 오류
+  for i, file in enumerate(files):
+    try:
+      screening.add(i, file.filename, await ingest_pdf(file))
+    except HTTPException as e:
+      screening.reject(i, file.filename, e.detail)
+
+  async def _stream():
+    events = screening.events()
+    watcher = asyncio.create_task(wait_disconnect(request))
+    try:
+      while True:
+        step = asyncio.ensure_future(anext(events))
+        done, _ = await asyncio.wait({step, watcher}, return_when=asyncio.FIRST_COMPLETED)
+        if watcher in done:
+          step.cancel()
+          return  # 클라이언트 연결 끊김 → 남은 작업은 finally 에서 중단
+        try:
+          event = step.result()
+        except StopAsyncIteration:
+          return
+        yield json.dumps(event, ensure_ascii=False) + "\n"
+    finally:
+      # 다 끝나기 전에 멈춘 경우 (연결 끊김 → 응답 스트림 취소 포함)
+      watcher.cancel()
+      abandoned = screening.cancel()
+      if abandoned:
+        print(f"🔌 클라이언트 연결 끊김 → 스크리닝 분석 {abandoned}건 중단", flush=True)
+
+  return StreamingResponse(_stream(), media_type="application/x-ndjson")
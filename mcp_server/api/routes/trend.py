@@ -1,104 +1,181 @@
 import json
-from multiprocessing import pool
+import os
 import re
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel
 
+from api.auth import require_admin
 from api.db.mysql import get_mysql_pool
+from api.services.cache import TTLCache
+from api.services.get_recruit_util_py import SARAMIN_CATEGORIES
+from api.services.job_trend_agg import job_trend_agg
+from api.services.keyword_scoring import keyword_scorer
 
 from ollama import ollama_chat
+from api.llm.scheduler import BACKGROUND
 
 router = APIRouter()
 
+# job_cat 별 프롬프트용 트렌드 요약 캐시
+# 키에 집계 버전을 포함하므로 job_trend 가 갱신되면 자동으로 새로 만든다
+JOB_TREND_CACHE_TTL = float(os.getenv("JOB_TREND_CACHE_TTL", 600))
+job_trend_cache = TTLCache("job_trend", ttl=JOB_TREND_CACHE_TTL, maxsize=64)
+
+
+# /jobfit 에서 LLM 재정렬 사용 여부 (요청의 rerank 값이 우선)
+JOBFIT_LLM_RERANK = os.getenv("JOBFIT_LLM_RERANK", "false").lower() == "true"
+JOBFIT_RERANK_CANDIDATES = int(os.getenv("JOBFIT_RERANK_CANDIDATES", 15))
+
+_KNOWN_JOB_CATS = frozenset(SARAMIN_CATEGORIES.values())
+
+
 class TrendRequest(BaseModel):
     job_cat: str
+    rerank: bool | None = None
+
+
+class InvalidateRequest(BaseModel):
+    job_cat: str | None = None
+
+
+def invalidate_job_trend_cache(job_cat: str | None = None) -> None:
+    """job_trend 가 바뀌었을 때 호출 (job_cat 이 None 이면 전체)"""
+    if job_cat is None:
+        job_trend_cache.invalidate()
+    else:
+        job_trend_cache.invalidate((job_cat, job_trend_agg.version(job_cat)))
+
+
+def _check_job_cat(job_cat: str) -> None:
+    # 임의 문자열로 집계 갱신(DB 조회)을 반복시키지 못하도록 알려진 직무만 허용
+    if job_cat not in _KNOWN_JOB_CATS and job_cat not in job_trend_agg.categories():
+        raise HTTPException(status_code=400, detail=f"알 수 없는 job_cat 입니다: {job_cat}")
+
+
+async def _ensure_loaded(pool) -> None:
+    # 시작 시 집계가 실패해서 아직 한 번도 읽지 못한 경우에만 요청에서 갱신 (이후는 주기적 갱신에 맡김)
+    if job_trend_agg.last_refresh is None:
+        await job_trend_agg.refresh(pool)
+
+
+def _format_terms(items: list[dict]) -> list[str]:
+    return [f"{it['term']}({it['count']})" for it in items]
+
+
+def _render_job_trend(job_cat: str) -> str:
+    """집계된 top-N 만 사용 → 공고 수와 무관하게 프롬프트 크기 일정"""
+    data = {"공고 수": job_trend_agg.rows(job_cat)}
+    if job_cat == "IT개발·데이터":
+        data["기술 트렌드"] = _format_terms(job_trend_agg.top(job_cat, "job_tech"))
+        data["핵심 역량"] = _format_terms(job_trend_agg.top(job_cat, "job_core"))
+    else:
+        data["키워드"] = _format_terms(job_trend_agg.top(job_cat, "job_keyword"))
+    return json.dumps(data, ensure_ascii=False)
+
 
 async def fetch_job_trend_data(job_cat: str) -> str:
+    _check_job_cat(job_cat)
     pool = await get_mysql_pool()
     if pool is None:
         return {"error": "MySQL 연결 실패"}
-    
-    async with pool.acquire() as conn:
-        async with conn.cursor() as cursor:
-            if job_cat == "IT개발·데이터":
-                sql = "SELECT job_tech, job_core FROM job_trend WHERE job_cat = %s"
-                
-                await cursor.execute(sql, (job_cat,))
-                trends = await cursor.fetchall()
-                
-                tech_list = []
-                core_list = []
-                
-                for row in trends:
-                    job_tech = row[0]
-                    job_core = row[1]
-                    tech_list.append(job_tech)
-                    core_list.append(job_core)
-                job_analysis = f'"기술 트렌드": [{', '.join(tech_list)}], "핵심 역량": [{', '.join(core_list)}]'
-            
-            else:
-                sql = "SELECT job_keyword FROM job_trend WHERE job_cat = %s"
-                
-                await cursor.execute(sql, (job_cat,))
-                keywords = await cursor.fetchall()
-                
-                keyword_list = []
-                for row in keywords:
-                    keyword = row[0]
-                    keyword_list.append(keyword)
-                job_analysis = ", ".join(keyword_list)
-                
+    await _ensure_loaded(pool)
+
+    key = (job_cat, job_trend_agg.version(job_cat))
+    job_analysis = job_trend_cache.get(key)
+    if job_analysis is None:
+        job_analysis = _render_job_trend(job_cat)
+        job_trend_cache.set(key, job_analysis)
     return job_analysis
 
-@router.post("/jobfit")
-async def jobfit(request: TrendRequest):
-    job_analysis = await fetch_job_trend_data(request.job_cat)
-    
+
+@router.post("/cache/invalidate", dependencies=[Depends(require_admin)])
+async def invalidate_cache(request: InvalidateRequest):
+    # 집계를 먼저 증분 갱신한 뒤 프롬프트 캐시 무효화
+    changed = await job_trend_agg.refresh(await get_mysql_pool())
+    invalidate_job_trend_cache(request.job_cat)
+    return {
+        "invalidated": request.job_cat or "all",
+        "refreshed": sorted(changed),
+        "cache": job_trend_cache.stats(),
+    }
+
+
+async def _llm_rerank(job_cat: str, candidates: list[dict]) -> list[dict] | None:
+    """로컬 점수 후보를 LLM 이 재정렬 (후보 밖의 키워드는 버림), 실패 시 None"""
+    candidate_json = json.dumps(
+        [{"keyword": c["keyword"], "score": c["score"], "count": c["count"]} for c in candidates],
+        ensure_ascii=False,
+    )
     prompt = f"""
-        아래는 {request.job_cat} 분야의 최근 채용 트렌드를 요약한 JSON 형식의 데이터입니다.
-        이를 참고하여 해당 직무에 적합한 추가적인 핵심 키워드를 선정해 주세요.
-        선택된 키워드에 많이 언급되거나 중요한 정도에 따라 0부터 10 사이의 점수를 부여하고 각 키워드와 점수를 함께 JSON 배열로 응답해주세요.
+        아래는 {job_cat} 분야 채용 공고에서 통계적으로 추출한 키워드 후보와 점수(0~10), 등장 공고 수입니다.
+        해당 직무에 실제로 중요한 순서로 5개를 골라 다시 점수를 매겨 주세요.
+        반드시 후보 목록에 있는 키워드만 사용하세요.
         예시 응답 형식: {{"keywords": [{{"keyword": "키워드1", "score": 10}}, ... ]}}
         반드시 주어진 예시 응답 형식의 JSON 형식으로만 응답해야 하며, 다른 설명이나 부가적인 내용은 포함하지 마세요.
-        
-        채용 트렌드 JSON 데이터:
-        {job_analysis}
-        
-        응답할 JSON의 키워드 개수는 반드시 5개 이상, 10개 이하여야합니다.
+
+        키워드 후보:
+        {candidate_json}
     """
-        
-    res = await ollama_chat(prompt)
+
+    res = await ollama_chat(prompt, priority=BACKGROUND, profile="json")
     answer_raw = res.get("answer", "")
+    print("Jobfit 재정렬 응답:", answer_raw)
 
-    print("Jobfit 분석 응답:", answer_raw)
     try:
         sanitized_answer_str = re.sub(r"```json|```", "", answer_raw).strip()
-        
         jobfits = json.loads(sanitized_answer_str)
-        if not jobfits.get("keywords"):
-            print(jobfits)
-            return {"error": "키워드 분석 실패"}
-    
-        result = []
-        
-        for item in jobfits["keywords"]:
-            keyword = item.get("keyword")
-            if keyword == request.job_cat:
-                continue  # 직무명과 동일한 키워드는 제외
-            result.append(item)
-            if len(result) >= 5:
-                break
-            
-        if result[0]["score"] <= 1:
-            map(lambda x: x.update({"score": x["score"] * 10}), result)
-            
-        print(result)
-        return {"jobfit": result}
-        
-    except (json.JSONDecodeError, TypeError) as e:
-        return {"error": f"JSON 파싱 실패: {e}", "raw_answer": answer_raw}
-            
+        items = jobfits.get("keywords") or []
+    except (json.JSONDecodeError, TypeError, AttributeError) as e:
+        print(f"Jobfit 재정렬 JSON 파싱 실패 → 로컬 점수 사용: {e}")
+        return None
+
+    allowed = {c["keyword"] for c in candidates}
+    result = []
+    for item in items:
+        if not isinstance(item, dict) or item.get("keyword") not in allowed:
+            continue
+        try:
+            score = float(item.get("score", 0))
+        except (TypeError, ValueError):
+            continue
+        result.append({"keyword": item["keyword"], "score": score})
+        if len(result) >= 5:
+            break
+
+    # 모든 점수가 1 이하일 때만 0~1 스케일로 답한 것으로 보고 10배, 그 외에는 0~10 으로 자름
+    scale = 10.0 if result and all(r["score"] <= 1 for r in result) else 1.0
+    for r in result:
+        r["score"] = min(10.0, max(0.0, r["score"] * scale))
+
+    return result or None
+
+
+@router.post("/jobfit")
+async def jobfit(request: TrendRequest):
+    _check_job_cat(request.job_cat)
+    pool = await get_mysql_pool()
+    if pool is None:
+        return {"error": "MySQL 연결 실패"}
+    await _ensure_loaded(pool)
+
+    # 1) 로컬 TF-IDF 점수 (ms 단위, GPU 불필요)
+    candidates = keyword_scorer.score(request.job_cat, top_n=JOBFIT_RERANK_CANDIDATES)
+    if not candidates:
+        return {"error": "키워드 분석 실패"}
+
+    local = [{"keyword": c["keyword"], "score": c["score"]} for c in candidates[:5]]
+
+    # 2) (선택) LLM 재정렬
+    rerank = JOBFIT_LLM_RERANK if request.rerank is None else request.rerank
+    if rerank:
+        reranked = await _llm_rerank(request.job_cat, candidates)
+        if reranked:
+            return {"jobfit": reranked, "engine": "llm"}
+
+    return {"jobfit": local, "engine": "local"}
+
+
 @router.post("/career_advice")
 async def career_advice(request: TrendRequest):
     job_analysis = await fetch_job_trend_data(request.job_cat)
@@ -116,7 +193,7 @@ async def career_advice(request: TrendRequest):
         반드시 한국어로 답변해주세요.
     """
 
-    res = await ollama_chat(prompt)
+    res = await ollama_chat(prompt, priority=BACKGROUND, profile="advice")
     answer_raw = res.get("answer", "")
     
     return {"career": answer_raw}
\ No newline at end of file
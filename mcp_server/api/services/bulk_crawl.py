@@ -0,0 +1,474 @@
+# api/services/bulk_crawl.py
+"""
+사람인 대량 크롤링 → job_trend 적재
+
+직종(cat_mcls)별 목록 페이지를 순회하며 공고 상세를 수집한다.
+- 목록에서 이미 제목/회사/직종을 알기 때문에 공고당 상세 페이지 1회만 요청
+  (extract_jd_markdown 처럼 21개 직종 검색을 다시 하지 않음)
+- 동시 처리 수 제한 + 전역 요청 속도 제한 (모든 사람인 요청 공통)
+- 이미 적재된 rec_idx (MySQL + JSONL) 는 건너뜀
+- 배치 단위로 MySQL INSERT + JSONL 기록 후 체크포인트 저장 → 중단 후 이어서 실행 가능
+- 선택: LLM 으로 기술 스택 / 핵심 역량 / 키워드 추출 (BACKGROUND 우선순위)
+- 선택: 공고 이미지 OCR (--ocr, api.services.ocr 의 캐시 / 동시 호출 제한 공유)
+- 멀티 워커: 리더 락으로 서버 전체에서 1개만 실행, 진행 상황 / 중단 요청은 Redis 로 공유
+
+CLI:
+    python -m api.services.bulk_crawl --categories 2 16 --pages 5 --rate 2
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import re
+import time
+from pathlib import Path
+
+import httpx
+from starlette.concurrency import run_in_threadpool
+
+from api.db.distributed import DistributedRateLimiter, LeaderLock, shared_get, shared_set, shared_delete
+from api.llm.scheduler import BACKGROUND
+from api.metrics import track_call, HTML_PARSE_SECONDS
+from api.services.get_recruit_util_py import SARAMIN_CATEGORIES, HEADERS, render_detail_markdown
+from api.services.html_parse import HTML_PARSER, parse_list_postings
+from api.services.ocr import close_image_client
+from api.services.workers import run_in_process
+
+BULK_CRAWL_DIR = Path(os.getenv("BULK_CRAWL_DIR", "jd_crawled"))
+BULK_CRAWL_CONCURRENCY = int(os.getenv("BULK_CRAWL_CONCURRENCY", 4))
+BULK_CRAWL_RATE = float(os.getenv("BULK_CRAWL_RATE", 2.0))          # 사람인 요청 / 초 (전체)
+BULK_CRAWL_PAGES = int(os.getenv("BULK_CRAWL_PAGES", 5))            # 직종별 최대 목록 페이지
+BULK_CRAWL_PAGE_COUNT = int(os.getenv("BULK_CRAWL_PAGE_COUNT", 50))  # 목록 페이지당 공고 수
+BULK_CRAWL_BATCH = int(os.getenv("BULK_CRAWL_BATCH", 50))
+BULK_CRAWL_CONTENT_CHARS = int(os.getenv("BULK_CRAWL_CONTENT_CHARS", 4000))
+
+LIST_URL = "https://www.saramin.co.kr/zf_user/jobs/list/job-category?cat_mcls={code}&page={page}&page_count={count}"
+DETAIL_URL = "https://www.saramin.co.kr/zf_user/jobs/relay/view-detail?rec_idx={rec_idx}"
+VIEW_URL = "https://www.saramin.co.kr/zf_user/jobs/relay/view?view_type=list&rec_idx={rec_idx}"
+
+INSERT_SQL = (
+    "INSERT INTO job_trend (rec_idx, job_cat, job_title, job_company, job_url, job_tech, job_core, job_keyword)"
+    " VALUES (%s, %s, %s, %s, %s, %s, %s, %s)"
+)
+
+
+# -----------------------
+# LLM 필드 추출
+# -----------------------
+async def extract_fields(title: str, content: str) -> dict:
+    """공고 본문 → {"job_tech": [...], "job_core": "...", "job_keyword": "..."} (실패 시 빈 값)"""
+    from ollama import ollama_chat
+
+    prompt = f"""
+다음 채용 공고에서 정보를 추출해 JSON 으로만 답하세요. 설명은 쓰지 마세요.
+- job_tech: 요구/우대 기술 스택 목록 (최대 10개, 없으면 [])
+- job_core: 핵심 직무 역량 (쉼표로 구분, 최대 5개)
+- job_keyword: 공고를 대표하는 키워드 (쉼표로 구분, 최대 5개)
+형식: {{"job_tech": ["..."], "job_core": "...", "job_keyword": "..."}}
+
+[공고 제목] {title}
+[공고 본문]
+{content[:BULK_CRAWL_CONTENT_CHARS]}
+"""
+    try:
+        res = await ollama_chat(prompt, priority=BACKGROUND, profile="json")
+        answer_raw = re.sub(r"```json|```", "", res.get("answer", "")).strip()
+        data = json.loads(answer_raw)
+    except Exception as e:
+        print(f"⚠️ 공고 필드 추출 실패 ({title}): {e}", flush=True)
+        return {"job_tech": [], "job_core": "", "job_keyword": ""}
+
+    def _join(v):
+        return ", ".join(map(str, v)) if isinstance(v, list) else str(v or "")
+
+    tech = data.get("job_tech") or []
+    if isinstance(tech, str):
+        tech = [t.strip() for t in tech.split(",") if t.strip()]
+    return {
+        "job_tech": [str(t) for t in tech][:10],
+        "job_core": _join(data.get("job_core")),
+        "job_keyword": _join(data.get("job_keyword")),
+    }
+
+
+class BulkCrawler:
+    def __init__(
+        self,
+        *,
+        categories: list[str] | None = None,
+        max_pages: int = BULK_CRAWL_PAGES,
+        page_count: int = BULK_CRAWL_PAGE_COUNT,
+        concurrency: int = BULK_CRAWL_CONCURRENCY,
+        rate: float = BULK_CRAWL_RATE,
+        batch_size: int = BULK_CRAWL_BATCH,
+        extract: bool = True,
+        ocr: bool = False,
+        reset: bool = False,
+        out_dir: Path = BULK_CRAWL_DIR,
+        pool=None,
+        transport: httpx.AsyncBaseTransport | None = None,
+    ):
+        self.categories = [c for c in (categories or list(SARAMIN_CATEGORIES)) if c in SARAMIN_CATEGORIES]
+        self.max_pages = max_pages
+        self.page_count = page_count
+        self.concurrency = concurrency
+        self.batch_size = batch_size
+        self.extract = extract
+        self.ocr = ocr
+        self.reset = reset
+        self.pool = pool
+        self.out_dir = Path(out_dir)
+        self.jsonl_path = self.out_dir / "postings.jsonl"
+        self.checkpoint_path = self.out_dir / "checkpoint.json"
+
+        self._limiter = DistributedRateLimiter("saramin_bulk", rate, burst=max(1, concurrency))
+        self._transport = transport
+        self._seen: set[str] = set()
+        self._pages_done: dict[str, int] = {}
+        self._saved_before = 0
+        self._buffer: list[dict] = []
+        self._flush_lock = asyncio.Lock()
+
+        self.stats = {
+            "state": "idle",
+            "saved": 0,
+            "skipped": 0,
+            "failed": 0,
+            "list_pages": 0,
+            "started_at": None,
+            "elapsed": 0.0,
+            "postings_per_min": 0.0,
+            "current": None,
+        }
+
+    # -----------------------
+    # 체크포인트 / 중복 제거
+    # -----------------------
+    def _load_local_state(self) -> None:
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        if self.checkpoint_path.exists():
+            data = json.loads(self.checkpoint_path.read_text(encoding="utf-8"))
+            self._saved_before = int(data.get("saved", 0))
+            # reset: 목록을 처음 페이지부터 다시 훑음 (이미 수집한 rec_idx 는 그대로 건너뜀)
+            if not self.reset:
+                self._pages_done = {str(k): int(v) for k, v in data.get("pages_done", {}).items()}
+        if self.jsonl_path.exists():
+            with open(self.jsonl_path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        self._seen.add(str(json.loads(line)["rec_idx"]))
+                    except (json.JSONDecodeError, KeyError):
+                        continue  # 중단 중 잘린 마지막 줄
+
+    def _save_checkpoint(self) -> None:
+        tmp = self.checkpoint_path.with_suffix(".tmp")
+        tmp.write_text(
+            json.dumps(
+                {"pages_done": self._pages_done, "saved": self._saved_before + self.stats["saved"]},
+                ensure_ascii=False,
+            ),
+            encoding="utf-8",
+        )
+        os.replace(tmp, self.checkpoint_path)
+
+    async def _load_seen_from_db(self) -> None:
+        if self.pool is None:
+            return
+        async with self.pool.acquire() as conn:
+            async with conn.cursor() as cursor:
+                await cursor.execute("SELECT rec_idx FROM job_trend WHERE rec_idx IS NOT NULL")
+                rows = await cursor.fetchall()
+        self._seen.update(str(r[0]) for r in rows)
+
+    # -----------------------
+    # 기록
+    # -----------------------
+    def _append_jsonl(self, records: list[dict]) -> None:
+        with open(self.jsonl_path, "a", encoding="utf-8") as f:
+            for r in records:
+                f.write(json.dumps(r, ensure_ascii=False) + "\n")
+
+    async def _flush(self, *, checkpoint: bool = True) -> None:
+        async with self._flush_lock:
+            records, self._buffer = self._buffer, []
+            if records:
+                if self.pool is not None:
+                    rows = [
+                        (r["rec_idx"], r["job_cat"], r["job_title"], r["job_company"], r["job_url"],
+                         json.dumps(r["job_tech"], ensure_ascii=False), r["job_core"], r["job_keyword"])
+                        for r in records
+                    ]
+                    async with self.pool.acquire() as conn:
+                        async with conn.cursor() as cursor:
+                            await cursor.executemany(INSERT_SQL, rows)
+                await run_in_threadpool(self._append_jsonl, records)
+                self.stats["saved"] += len(records)
+                self._update_rate()
+                await self._publish()
+                print(
+                    f"📦 bulk crawl: +{len(records)}건 저장 (누적 {self.stats['saved']}건, "
+                    f"{self.stats['postings_per_min']:.1f}건/분)",
+                    flush=True,
+                )
+            if checkpoint:
+                await run_in_threadpool(self._save_checkpoint)
+
+    async def _publish(self) -> None:
+        """다른 워커의 GET /admin/crawl 용 (멀티 워커가 아니면 아무것도 안 함)"""
+        await shared_set(_STATUS_KEY, json.dumps(self.stats, ensure_ascii=False))
+
+    def _update_rate(self) -> None:
+        if self.stats["started_at"] is None:
+            return
+        elapsed = time.time() - self.stats["started_at"]
+        self.stats["elapsed"] = round(elapsed, 1)
+        self.stats["postings_per_min"] = round(self.stats["saved"] / elapsed * 60, 2) if elapsed > 0 else 0.0
+
+    # -----------------------
+    # 크롤링
+    # -----------------------
+    async def _get(self, client: httpx.AsyncClient, url: str, op: str) -> httpx.Response:
+        await self._limiter.acquire()
+        with track_call("saramin", op):
+            res = await client.get(url)
+            res.raise_for_status()
+        return res
+
+    async def _crawl_posting(self, client, code: str, rec_idx: str, title: str, company: str) -> bool:
+        """실패하면 False (_seen 에서 빼서 다음 실행에서 다시 시도)"""
+        try:
+            res = await self._get(client, DETAIL_URL.format(rec_idx=rec_idx), "detail")
+            content = await render_detail_markdown(res.text, ocr=self.ocr)
+            if not content:
+                self.stats["failed"] += 1
+                self._seen.discard(rec_idx)
+                return False
+
+            fields = (
+                await extract_fields(title, content)
+                if self.extract
+                else {"job_tech": [], "job_core": "", "job_keyword": ""}
+            )
+            self._buffer.append({
+                "rec_idx": rec_idx,
+                "job_cat": SARAMIN_CATEGORIES[code],
+                "job_title": title,
+                "job_company": company,
+                "job_url": VIEW_URL.format(rec_idx=rec_idx),
+                **fields,
+                "content": content,
+                "crawled_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            })
+        except Exception as e:
+            self.stats["failed"] += 1
+            self._seen.discard(rec_idx)  # 다음 실행에서 다시 시도
+            print(f"⚠️ 공고 수집 실패 ({rec_idx}): {e}", flush=True)
+            return False
+
+        if len(self._buffer) >= self.batch_size:
+            await self._flush(checkpoint=False)
+        return True
+
+    async def _crawl_category(self, client, code: str, semaphore: asyncio.Semaphore) -> None:
+        start_page = self._pages_done.get(code, 0) + 1
+        # 실패한 공고가 있는 페이지부터는 체크포인트를 멈춤 → 다음 실행에서 그 페이지부터 다시
+        # (이미 저장된 공고는 _seen 으로 건너뜀)
+        advance = True
+        for page in range(start_page, self.max_pages + 1):
+            if await shared_get(_CANCEL_KEY):
+                print("🛑 bulk crawl: 다른 워커에서 중단 요청", flush=True)
+                raise asyncio.CancelledError
+            self.stats["current"] = f"{SARAMIN_CATEGORIES[code]} p{page}"
+            try:
+                res = await self._get(
+                    client, LIST_URL.format(code=code, page=page, count=self.page_count), "list"
+                )
+            except httpx.HTTPError as e:
+                # 체크포인트는 전진하지 않음 → 다음 실행에서 이 페이지부터
+                print(f"⚠️ 목록 페이지 실패 ({SARAMIN_CATEGORIES[code]} p{page}): {e}", flush=True)
+                break
+            postings, elapsed = await run_in_process(parse_list_postings, res.content)
+            HTML_PARSE_SECONDS.labels("list", HTML_PARSER).observe(elapsed)
+            self.stats["list_pages"] += 1
+            if not postings:
+                break
+
+            new = []
+            for rec_idx, title, company in postings:
+                if rec_idx in self._seen:
+                    self.stats["skipped"] += 1
+                    continue
+                self._seen.add(rec_idx)
+                new.append((rec_idx, title, company))
+
+            async def _bounded(item):
+                async with semaphore:
+                    return await self._crawl_posting(client, code, *item)
+
+            ok = await asyncio.gather(*(_bounded(item) for item in new))
+            if not all(ok):
+                advance = False
+
+            # 이 페이지의 공고가 모두 기록된 뒤에 체크포인트 전진
+            if advance:
+                self._pages_done[code] = page
+            await self._flush()
+
+    async def run(self) -> dict:
+        self.stats.update(state="running", started_at=time.time())
+        await shared_delete(_CANCEL_KEY)
+        await self._publish()
+        await run_in_threadpool(self._load_local_state)
+        await self._load_seen_from_db()
+        print(
+            f"🚚 bulk crawl 시작: 직종 {len(self.categories)}개, 기존 공고 {len(self._seen)}건 건너뜀 대상",
+            flush=True,
+        )
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+        try:
+            async with httpx.AsyncClient(
+                headers=HEADERS, follow_redirects=True, timeout=10, transport=self._transport
+            ) as client:
+                for code in self.categories:
+                    await self._crawl_category(client, code, semaphore)
+            self.stats["state"] = "done"
+        except asyncio.CancelledError:
+            self.stats["state"] = "cancelled"
+            raise
+        except Exception as e:
+            self.stats["state"] = "failed"
+            self.stats["error"] = str(e)
+            print(f"❌ bulk crawl 실패: {e}", flush=True)
+        finally:
+            # 취소 / 실패여도 수집된 만큼은 기록 (체크포인트는 완료된 페이지까지만)
+            await self._flush()
+            self._update_rate()
+            self.stats["current"] = None
+            await self._publish()
+            print(
+                f"🏁 bulk crawl {self.stats['state']}: 저장 {self.stats['saved']}건, "
+                f"건너뜀 {self.stats['skipped']}건, 실패 {self.stats['failed']}건, "
+                f"{self.stats['postings_per_min']:.1f}건/분",
+                flush=True,
+            )
+        return self.stats
+
+
+# -----------------------
+# 관리자 엔드포인트용 (서버 전체에서 1개 작업)
+# -----------------------
+_STATUS_KEY = "bulk_crawl:status"
+_CANCEL_KEY = "bulk_crawl:cancel"
+
+_current: BulkCrawler | None = None
+_task: asyncio.Task | None = None
+_leader = LeaderLock("bulk_crawl")
+
+
+async def crawl_status() -> dict | None:
+    """이 워커에서 실행한 작업이 없으면 다른 워커가 공유한 상태"""
+    if _current is None:
+        shared = await shared_get(_STATUS_KEY)
+        return json.loads(shared) if shared else None
+    if _current.stats["state"] == "running":
+        _current._update_rate()
+    return dict(_current.stats)
+
+
+async def _run_as_leader(crawler: BulkCrawler) -> dict:
+    try:
+        return await crawler.run()
+    finally:
+        await _leader.release()
+
+
+async def start_bulk_crawl(crawler: BulkCrawler) -> bool:
+    """이미 (어느 워커에서든) 실행 중이면 False"""
+    global _current, _task
+    if _task is not None and not _task.done():
+        return False
+    if not await _leader.acquire():
+        return False
+    _current = crawler
+    _task = asyncio.create_task(_run_as_leader(crawler))
+    return True
+
+
+async def cancel_bulk_crawl(*, everywhere: bool = False) -> bool:
+    """everywhere=True 면 다른 워커에서 실행 중인 작업에도 중단 요청 (다음 목록 페이지 전에 멈춤)"""
+    if _task is None or _task.done():
+        if everywhere and (await crawl_status() or {}).get("state") == "running":
+            await shared_set(_CANCEL_KEY, "1", ttl=3600)
+            return True
+        return False
+    _task.cancel()
+    try:
+        await _task
+    except asyncio.CancelledError:
+        pass
+    return True
+
+
+# -----------------------
+# CLI
+# -----------------------
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="사람인 대량 크롤링 → job_trend")
+    parser.add_argument("--categories", nargs="+", default=None,
+                        help=f"cat_mcls 코드 (기본: 전체) {sorted(SARAMIN_CATEGORIES, key=int)}")
+    parser.add_argument("--pages", type=int, default=BULK_CRAWL_PAGES)
+    parser.add_argument("--page-count", type=int, default=BULK_CRAWL_PAGE_COUNT)
+    parser.add_argument("--concurrency", type=int, default=BULK_CRAWL_CONCURRENCY)
+    parser.add_argument("--rate", type=float, default=BULK_CRAWL_RATE, help="사람인 요청 / 초")
+    parser.add_argument("--batch", type=int, default=BULK_CRAWL_BATCH)
+    parser.add_argument("--out-dir", default=str(BULK_CRAWL_DIR))
+    parser.add_argument("--no-extract", action="store_true", help="LLM 필드 추출 생략")
+    parser.add_argument("--ocr", action="store_true", help="공고 이미지 OCR (OLLAMA_CRAWL_MODEL)")
+    parser.add_argument("--no-mysql", action="store_true", help="JSONL 에만 기록")
+    parser.add_argument("--reset", action="store_true", help="체크포인트를 무시하고 첫 페이지부터 (중복 공고는 계속 건너뜀)")
+    return parser.parse_args(argv)
+
+
+async def _main(args) -> dict:
+    from ollama_client import create_client, close_client
+    from api.db.mysql import init_mysql_pool, close_mysql_pool
+
+    pool = None if args.no_mysql else await init_mysql_pool()
+    if not args.no_mysql and pool is None:
+        raise SystemExit("MySQL 연결 실패 (--no-mysql 로 JSONL 만 기록 가능)")
+    use_ollama = not args.no_extract or args.ocr
+    if use_ollama:
+        await create_client()
+
+    crawler = BulkCrawler(
+        categories=args.categories,
+        max_pages=args.pages,
+        page_count=args.page_count,
+        concurrency=args.concurrency,
+        rate=args.rate,
+        batch_size=args.batch,
+        extract=not args.no_extract,
+        ocr=args.ocr,
+        reset=args.reset,
+        out_dir=Path(args.out_dir),
+        pool=pool,
+    )
+    try:
+        return await crawler.run()
+    finally:
+        if use_ollama:
+            await close_client()
+        await close_image_client()
+        await close_mysql_pool()
+
+
+def main(argv=None):
+    stats = asyncio.run(_main(parse_args(argv)))
+    print(json.dumps(stats, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,6 @@
 # services/crawl.py
 import re
 import httpx
-from bs4 import BeautifulSoup
 
 def _clean_text(text: str) -> str:
     text = re.sub(r"\s+", " ", text).strip()
@@ -16,6 +15,8 @@ def crawl_url(url: str, timeout: float = 15.0) -> str:
         resp = client.get(url)
         resp.raise_for_status()
 
+    from bs4 import BeautifulSoup
+
     soup = BeautifulSoup(resp.text, "html.parser")
 
     # 불필요 태그 제거
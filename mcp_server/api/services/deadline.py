@@ -0,0 +1,74 @@
+# api/services/deadline.py
+"""
+요청 단위 마감 시간(deadline) 예산
+
+라우트 진입 시 Deadline 을 만들고 크롤링 → PDF 추출 → 요약 → 생성 단계에 그대로 넘긴다.
+각 단계는 남은 시간만 쓰고, 예산이 모자라면 실패 대신 품질을 낮춰 진행한다.
+- 크롤링: OCR 생략 / 시간 초과 시 이전에 크롤링한 공고(캐시) 사용
+- PDF 추출: 남은 페이지 생략
+- 요약: 남은 청크 요약 생략 (요약된 부분까지만 사용, 하나도 못 했으면 추출 요약)
+- 생성: 남은 시간이 지나면 스트림을 닫고 504
+
+단계별 시간 초과 / 품질 저하는 route, stage 라벨로 기록
+(mcp_deadline_timeouts_total, mcp_deadline_degraded_total)
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+from contextlib import asynccontextmanager
+
+from api.metrics import DEADLINE_TIMEOUTS, DEADLINE_DEGRADED
+
+# 요청 1건 전체 예산 (초)
+REQUEST_DEADLINE_SECONDS = float(os.getenv("REQUEST_DEADLINE_SECONDS", 120))
+# 앞 단계(크롤링 / 추출 / 요약)가 끝나도 생성 단계에 남겨둘 시간
+DEADLINE_LLM_RESERVE_SECONDS = float(os.getenv("DEADLINE_LLM_RESERVE_SECONDS", 45))
+
+
+class Deadline:
+    __slots__ = ("route", "seconds", "expires_at")
+
+    def __init__(self, route: str, seconds: float = REQUEST_DEADLINE_SECONDS):
+        self.route = route
+        self.seconds = seconds
+        self.expires_at = time.monotonic() + seconds
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def budget(self, cap: float | None = None, reserve: float = 0.0) -> float:
+        """이번 단계가 쓸 수 있는 시간 = min(cap, 남은 시간 - 뒤 단계 몫)"""
+        budget = self.remaining() - reserve
+        if cap is not None:
+            budget = min(budget, cap)
+        return max(0.0, budget)
+
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    def timed_out(self, stage: str) -> None:
+        DEADLINE_TIMEOUTS.labels(self.route, stage).inc()
+        print(f"⏱️ 마감 시간 초과 [{self.route}] {stage} (전체 {self.seconds:.0f}s)", flush=True)
+
+    def degrade(self, stage: str, action: str) -> None:
+        DEADLINE_DEGRADED.labels(self.route, stage, action).inc()
+        print(f"🪫 예산 부족 [{self.route}] {stage} → {action} (남은 {self.remaining():.1f}s)", flush=True)
+
+    @asynccontextmanager
+    async def stage(self, stage: str, *, cap: float | None = None, reserve: float = 0.0):
+        """
+        async with deadline.stage("crawl", cap=30, reserve=...) as budget:
+        budget 초 안에 끝나지 않으면 안쪽 작업을 취소하고 TimeoutError
+        """
+        budget = self.budget(cap, reserve)
+        if budget <= 0:
+            self.timed_out(stage)
+            raise TimeoutError(f"{stage}: 남은 예산 없음")
+        try:
+            async with asyncio.timeout(budget):
+                yield budget
+        except TimeoutError:
+            self.timed_out(stage)
+            raise
@@ -1,27 +1,36 @@
 # services/extract.py
 import io
-import re
-import pdfplumber
-from api.services.summarize import summarize_text
+from typing import BinaryIO
 
-def _clean_text(text: str) -> str:
-    text = re.sub(r"[ \t]+", " ", text)
-    text = re.sub(r"\n{3,}", "\n\n", text)
-    return text.strip()
+from api.services.summarize import summarize_text
+from api.services.deadline import Deadline, DEADLINE_LLM_RESERVE_SECONDS
+from api.services.pdf_parse import PDF_MAX_CHARS, clean_text as _clean_text
+from api.metrics import stage_timer
 
 def extract_pdf_text(
-    pdf_bytes: bytes,
+    pdf_bytes: bytes | BinaryIO,
     *,
     summarize: bool = False,
     summary_style: str = "structured",   # "bullet" | "structured"
     return_mode: str = "text",           # "text" | "summary" | "both"
+    deadline: Deadline | None = None,
 ) -> str:
+    """deadline 이 있으면 생성 단계 몫만 남았을 때 남은 페이지는 건너뜀"""
     if not pdf_bytes:
         return "Not text"
 
+    # 업로드 스풀 파일 객체는 그대로 사용 (bytes 로 복사하지 않음)
+    source = io.BytesIO(pdf_bytes) if isinstance(pdf_bytes, (bytes, bytearray)) else pdf_bytes
+
+    import pdfplumber  # pdfminer 포함 무거운 import → 업로드 처리 시점에 로드
+
     out = []
-    with pdfplumber.open(io.BytesIO(pdf_bytes)) as pdf:
-        for page in pdf.pages:
+    with stage_timer("pdf_extract"), pdfplumber.open(source) as pdf:
+        for i, page in enumerate(pdf.pages):
+            if out and deadline is not None and deadline.remaining() < DEADLINE_LLM_RESERVE_SECONDS:
+                deadline.degrade("pdf_extract", "partial_pdf")
+                print(f"📄 PDF {i}/{len(pdf.pages)} 페이지까지만 추출", flush=True)
+                break
             t = page.extract_text() or ""
             t = t.strip()
             if t:
@@ -30,9 +39,8 @@ def extract_pdf_text(
     text = "\n\n".join(out)
     text = _clean_text(text)
 
-    MAX_CHARS = 20000
-    if len(text) > MAX_CHARS:
-        text = text[:MAX_CHARS] + " ...[truncated]"
+    if len(text) > PDF_MAX_CHARS:
+        text = text[:PDF_MAX_CHARS] + " ...[truncated]"
 
     if not text:
         return "PDF에서 텍스트를 추출하지 못했습니다."
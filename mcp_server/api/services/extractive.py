@@ -0,0 +1,221 @@
+# api/services/extractive.py
+"""
+추출 요약 (LLM 없이 CPU 만 사용, TextRank)
+
+- 문장 분리: 줄 단위 → 문장부호(. ! ? 。) / 한국어 종결어미(습니다, 입니다, 했다 …) 뒤 공백에서 분리
+  (불릿 / 번호 머리표는 떼고, "# 제목" / "경력:" 같은 짧은 줄은 소제목으로 취급)
+  B.S. / Ph.D. / e.g. / Dr. 같은 약어의 마침표에서는 자르지 않음
+- max_chars 보다 긴 문장(문장부호 없는 긴 텍스트 등)은 ; , 공백 위치에서 강제로 나눔
+- 문장 표현: 영문 / 숫자는 단어, 한글은 글자 bigram (형태소 분석기 없이 조사가 붙어도 겹치도록)
+- 문장 그래프: TextRank 유사도 |A∩B| / (log|A| + log|B|) → PageRank
+- 숫자(기간 / 성과 수치 / 날짜)가 있는 문장은 가중치를 조금 더 줌
+- 점수 순으로 max_chars 안에서 고르되 이미 고른 문장과 거의 같은 문장은 건너뛰고, 원문 순서로 출력
+
+순수 함수 + 표준 라이브러리만 사용 (이력서 1장 기준 수 ms)
+"""
+from __future__ import annotations
+
+import math
+import re
+
+_SENTENCE_END_RE = re.compile(
+    # 한 글자 약어(B.S., Ph.D., e.g., 이니셜) / 자주 쓰는 두 글자 약어의 마침표는 제외
+    r"(?<!\b[A-Za-z]\.)(?<!\b(?:Mr|Ms|Dr|Jr|Sr|vs|St|No)\.)(?<=[.!?。])\s+"
+    r"|(?:(?<=습니다|입니다|합니다)|(?<=했다|였다|한다|이다))\s+(?=\S)"
+)
+_BULLET_RE = re.compile(r"^\s*(?:[-•·▪◦*]|\d{1,2}[.)]|[①-⑳])\s*")
+_HEADING_RE = re.compile(r"^\s*(?:#{1,6}\s*(.+?)\s*#*|\[(.+?)\]|(.{1,20}?)\s*:)\s*$")
+# 줄이 이 글자로 끝나면 문장이 끝난 것으로 봄 (아니면 PDF 줄바꿈으로 보고 다음 줄과 이어 붙임)
+_LINE_END_CHARS = ".!?。:다요음함됨임)"
+_TOKEN_RE = re.compile(r"[가-힣]+|[a-z][a-z0-9+#.]*|\d+")
+_DIGIT_RE = re.compile(r"\d")
+
+_MIN_SENTENCE_CHARS = 8
+_MAX_SENTENCES = 300        # TextRank 는 O(n²) → 이보다 많으면 앞에서부터 이만큼만 사용
+_DAMPING = 0.85
+_MAX_ITER = 50
+_TOLERANCE = 1e-4
+_NUMBER_BOOST = 1.15
+_DUPLICATE_JACCARD = 0.7
+
+
+class _Sentence:
+    __slots__ = ("text", "position", "heading", "tokens", "score")
+
+    def __init__(self, text: str, position: int, heading: str | None):
+        self.text = text
+        self.position = position
+        self.heading = heading
+        self.tokens = _tokens(text)
+        self.score = 0.0
+
+
+def _tokens(text: str) -> frozenset[str]:
+    out = set()
+    for word in _TOKEN_RE.findall(text.lower()):
+        if "가" <= word[0] <= "힣":
+            if len(word) == 1:
+                continue
+            out.update(word[i:i + 2] for i in range(len(word) - 1))
+        elif len(word) > 1 or word.isdigit():
+            out.add(word)
+    return frozenset(out)
+
+
+def _lines(text: str):
+    """(줄, 소제목 여부) / PDF 에서 중간에 끊긴 줄은 이어 붙임"""
+    buf = ""
+    for line in (text or "").splitlines():
+        line = line.strip()
+        heading = bool(line) and _HEADING_RE.match(line) is not None
+        if buf and line and not heading and not _BULLET_RE.match(line) and buf[-1] not in _LINE_END_CHARS:
+            buf = f"{buf} {line}"
+            continue
+        if buf:
+            yield buf, False
+            buf = ""
+        if heading:
+            yield line, True
+        elif line:
+            buf = line
+    if buf:
+        yield buf, False
+
+
+def split_sentences(text: str) -> list[tuple[str, str | None]]:
+    """텍스트 → [(문장, 소제목)] (원문 순서)"""
+    out: list[tuple[str, str | None]] = []
+    heading = None
+    for line, is_heading in _lines(text):
+        if is_heading:
+            m = _HEADING_RE.match(line)
+            heading = next(g for g in m.groups() if g).strip()
+            continue
+        line = _BULLET_RE.sub("", line)
+        for sentence in _SENTENCE_END_RE.split(line):
+            sentence = sentence.strip()
+            if len(sentence) >= _MIN_SENTENCE_CHARS:
+                out.append((sentence, heading))
+    return out
+
+
+def _hard_split(sentence: str, limit: int) -> list[str]:
+    """limit 보다 긴 문장을 ; , 공백 위치에서 나눔 (구분자가 앞쪽 절반에만 있으면 공백, 공백도 없으면 글자 수)"""
+    pieces = []
+    while len(sentence) > limit:
+        window = sentence[:limit + 1]
+        cut = max(window.rfind("; "), window.rfind(", ")) + 1
+        if cut <= limit // 2:
+            cut = window.rfind(" ")
+        if cut <= 0:
+            cut = limit
+        pieces.append(sentence[:cut].strip())
+        sentence = sentence[cut:].strip()
+    if sentence:
+        pieces.append(sentence)
+    return pieces
+
+
+def _similarity(a: frozenset[str], b: frozenset[str]) -> float:
+    if len(a) < 2 or len(b) < 2:
+        return 0.0
+    overlap = len(a & b)
+    if not overlap:
+        return 0.0
+    return overlap / (math.log(len(a)) + math.log(len(b)))
+
+
+def _rank(sentences: list[_Sentence]) -> None:
+    n = len(sentences)
+    weights: list[list[tuple[int, float]]] = [[] for _ in range(n)]
+    out_sum = [0.0] * n
+    for i in range(n):
+        for j in range(i + 1, n):
+            w = _similarity(sentences[i].tokens, sentences[j].tokens)
+            if w > 0:
+                weights[i].append((j, w))
+                weights[j].append((i, w))
+                out_sum[i] += w
+                out_sum[j] += w
+
+    scores = [1.0] * n
+    for _ in range(_MAX_ITER):
+        new = [
+            (1 - _DAMPING) + _DAMPING * sum(w / out_sum[j] * scores[j] for j, w in weights[i])
+            for i in range(n)
+        ]
+        delta = max(abs(a - b) for a, b in zip(new, scores))
+        scores = new
+        if delta < _TOLERANCE:
+            break
+
+    for s, score in zip(sentences, scores):
+        s.score = score * (_NUMBER_BOOST if _DIGIT_RE.search(s.text) else 1.0)
+
+
+def _jaccard(a: frozenset[str], b: frozenset[str]) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def extractive_summary(text: str, *, max_chars: int = 1200, style: str = "structured") -> str:
+    """
+    중요 문장만 골라 원문 순서로 반환
+    style="bullet": "- 문장" 목록 / "structured": 소제목별로 묶은 목록 (소제목이 없으면 bullet 과 같음)
+    """
+    # 출력 한 줄 = "- " + 문장 → 어떤 문장이든 혼자서는 max_chars 안에 들어가도록 나눔
+    limit = max(1, max_chars - 2)
+    pieces = [
+        (piece, heading)
+        for s, heading in split_sentences(text)
+        for piece in (_hard_split(s, limit) if len(s) > limit else (s,))
+    ]
+    sentences = [_Sentence(s, i, heading) for i, (s, heading) in enumerate(pieces[:_MAX_SENTENCES])]
+    if not sentences:
+        return (text or "").strip()[:max_chars]
+
+    _rank(sentences)
+
+    # 출력 길이 = 줄마다 ("- " + 문장 + 줄바꿈) + structured 면 처음 나오는 소제목마다 "[소제목]" 줄 + 빈 줄
+    structured = style == "structured"
+    picked: list[_Sentence] = []
+    headings: set[str] = set()
+    used = -1  # 마지막 줄에는 줄바꿈이 없음
+    for s in sorted(sentences, key=lambda s: (-s.score, s.position)):
+        cost = len(s.text) + 3
+        if structured and s.heading and s.heading not in headings:
+            cost += len(s.heading) + 4
+        if used + cost > max_chars:
+            continue
+        if any(_jaccard(s.tokens, p.tokens) >= _DUPLICATE_JACCARD for p in picked):
+            continue
+        picked.append(s)
+        used += cost
+        if structured and s.heading:
+            headings.add(s.heading)
+    picked.sort(key=lambda s: s.position)
+
+    out = _format(picked, style)
+    # 같은 소제목이 떨어진 위치에 다시 나오는 경우 등 추정보다 길면 점수 낮은 문장부터 뺌
+    while len(out) > max_chars and len(picked) > 1:
+        picked.remove(min(picked, key=lambda s: (s.score, -s.position)))
+        out = _format(picked, style)
+    return out if picked else _format(sentences[:1], "bullet")
+
+
+def _format(picked: list[_Sentence], style: str) -> str:
+    if style != "structured" or all(s.heading is None for s in picked):
+        return "\n".join(f"- {s.text}" for s in picked)
+
+    lines: list[str] = []
+    heading = object()
+    for s in picked:
+        if s.heading != heading:
+            heading = s.heading
+            if lines:
+                lines.append("")
+            if heading:
+                lines.append(f"[{heading}]")
+        lines.append(f"- {s.text}")
+    return "\n".join(lines)
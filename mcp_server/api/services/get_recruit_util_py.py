@@ -1,21 +1,25 @@
 import asyncio
 import os
 import httpx
-from bs4 import BeautifulSoup
 
 import ollama
 
-import base64
-from PIL import Image
-from io import BytesIO
-import html2text
 import re
 import json
-from ollama_client import get_client
+from api.metrics import track_call, HTML_PARSE_SECONDS
+from api.services.html_parse import HTML_PARSER, head_section, parse_list_page, detail_images, detail_to_markdown
+from api.services.ocr import JD_OCR_ENABLED, OCR_MAX_IMAGES, OCR_POSTING_TIMEOUT, ocr_images
+from api.services.workers import run_in_process
+from api.db.distributed import DistributedSemaphore
 
 OLLAMA_URL = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
 CRAWL_MODEL = os.getenv("OLLAMA_CRAWL_MODEL", "qwen3-vl:2b")
 
+# 사람인 동시 요청 수: 검색 1건당 5개 + 서버 전체(멀티 워커면 모든 워커 합계) 상한
+SARAMIN_SEARCH_CONCURRENCY = 5
+SARAMIN_MAX_CONCURRENCY = int(os.getenv("SARAMIN_MAX_CONCURRENCY", 20))
+_saramin_semaphore = DistributedSemaphore("saramin", SARAMIN_MAX_CONCURRENCY)
+
 SARAMIN_CATEGORIES = {
     "16": "기획·전략", "14": "마케팅·홍보·조사", "3": "회계·세무·재무",
     "5": "인사·노무·HRD", "4": "총무·법무·사무", "2": "IT개발·데이터",
@@ -29,61 +33,16 @@ SARAMIN_CATEGORIES = {
 HEADERS = {
     'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0.0.0 Safari/537.36'}
 
-OCR_SEMAPHORE = asyncio.Semaphore(8)
-
-
-# async def perform_qwen3vl_ocr(img_url, client):
-#     async with OCR_SEMAPHORE:
-#         try:
-#             # 이미지 비동기 다운로드
-#             img_res = await client.get(img_url, timeout=5)
-#             img_res.raise_for_status()
-
-#             # 이미지 처리(gif, 투명 등 처리)
-#             def process_img(content):
-#                 img = Image.open(BytesIO(content))
-#                 if img.mode != 'RGB':
-#                     img = img.convert('RGB')
-#                 buffer = BytesIO()
-#                 img.save(buffer, format='PNG')
-#                 return base64.b64encode(buffer.getvalue()).decode('utf-8')
-
-#             img_base64 = await asyncio.to_thread(process_img, img_res.content)
-
-#             prompt = """
-#             이 이미지는 어느 특정 회사의 채용 공고의 일부입니다.
-#             이미지 내의 작성된 모든 내용을 마크다운 형식으로 추출해주세요.
-#             만약 표가 있다면 반드시 마크다운 표 형식을 유지해주세요.
-#             만약 이미지 내에 텍스트나 표 등이 없다면 '내용이 없습니다.'로 응답해주세요.
-#             """
-            
-#             payload = {
-#                 "model": CRAWL_MODEL,
-#                 "messages": [
-#                     {
-#                         "role": "user",
-#                         "content": prompt,
-#                         "images": [img_base64]  # base64 string (data: 제거된 상태)
-#                     }
-#                 ],
-#                 "stream": False
-#             }
-#             ollam_client = get_client()
-#             ollama_res = await ollam_client.post(f"{OLLAMA_URL}/api/chat", json=payload)
-
-#             extracted_text = ollama_res.json()['message']['content']
-#             print(f"extracted_text :  {extracted_text}")
-#             return f"\n\n> **[VLM 추출 시작]**\n{extracted_text}\n> **[VLM 추출 종료]**\n\n"
-
-#         except Exception as e:
-#             print(f"OCR failed ({img_url}): {e}")
-#             return ""
+_TITLE_RE = re.compile(r'\]\s+(.*?)(?=\([^)]*?\)\s*-\s*사람인)')
+_COMPANY_RE = re.compile(r"companyNm\s*=\s*'([^']+)'")
 
 
 def get_info_from_metadata(html_content):
     try:
-        title_match = re.search(r'\]\s+(.*?)(?=\([^)]*?\)\s*-\s*사람인)', html_content)
-        company_match = re.search(r"companyNm\s*=\s*'([^']+)'", html_content)
+        # <title> / companyNm 은 보통 <head> 안에 있으므로 head 만 검색, 없을 때만 전체 검색
+        head = head_section(html_content)
+        title_match = _TITLE_RE.search(head) or _TITLE_RE.search(html_content)
+        company_match = _COMPANY_RE.search(head) or _COMPANY_RE.search(html_content)
 
         title =  json.loads(f'"{title_match.group(1)}"') if title_match else "N/A"
         company = json.loads(f'"{company_match.group(1)}"') if company_match else "N/A"
@@ -94,41 +53,22 @@ def get_info_from_metadata(html_content):
         return "N/A", "N/A"
 
 
-# def format_url(src):
-#     if src.startswith('//'):
-#         full_img_url = "https:" + src
-#     elif src.startswith('/'):
-#         full_img_url = "https://www.saramin.co.kr" + src
-#     else:
-#         full_img_url = src
-#     return full_img_url
-
-
 async def fetch_recruit(code, cat_nm, title, company, semaphore, client):
     find_url = f"https://www.saramin.co.kr/zf_user/jobs/list/job-category?cat_mcls={code}&searchword={title}"
 
-    async with semaphore:
+    async with semaphore, _saramin_semaphore.hold():
         try:
-            res = await client.get(find_url, timeout=5)
-            res.raise_for_status()
-
-            soup = BeautifulSoup(res.content, 'html.parser')
-
-            recruit_list = soup.select_one('div.common_recruilt_list')
-            if not recruit_list:
-                return None
+            with track_call("saramin", "list"):
+                res = await client.get(find_url, timeout=5)
+                res.raise_for_status()
 
-            recruits = recruit_list.select('div.list_item')
-            for recruit in recruits:
-                fetch_title = recruit.select_one('div.job_tit a.str_tit span')
-                fetch_company = recruit.select_one('div.company_nm a')
+            # 목록 div 만 파싱 (워커 프로세스)
+            recruits, elapsed = await run_in_process(parse_list_page, res.content)
+            HTML_PARSE_SECONDS.labels("list", HTML_PARSER).observe(elapsed)
 
-                if fetch_title and fetch_company:
-                    fetch_title_nm = fetch_title.text.strip()
-                    fetch_company_nm = fetch_company.text.strip()
-
-                    if title == fetch_title_nm and company == fetch_company_nm:
-                        return cat_nm
+            for fetch_title_nm, fetch_company_nm in recruits:
+                if title == fetch_title_nm and company == fetch_company_nm:
+                    return cat_nm
 
         except Exception as e:
             print(f"Failed to fetch {cat_nm} job recruit list: {e}")
@@ -138,7 +78,7 @@ async def fetch_recruit(code, cat_nm, title, company, semaphore, client):
 
 async def get_cat_mcls_by_search(title, company, client):
     # 동시 접속 제한(사람인 보안 정책 고려)
-    semaphore = asyncio.Semaphore(5)
+    semaphore = asyncio.Semaphore(SARAMIN_SEARCH_CONCURRENCY)
 
     # 모든 카테고리에 대한 작업 리스트 생성
     task = [
@@ -151,11 +91,36 @@ async def get_cat_mcls_by_search(title, company, client):
 
     return [res for res in result if res is not None]
 
-async def extract_jd_markdown(jd_url, client):
+async def render_detail_markdown(html, *, ocr=None, ocr_timeout=None):
+    """
+    상세 페이지 HTML → 마크다운 (ocr=True 면 공고 이미지를 VLM 으로 읽어 <img> 자리에 삽입)
+    ocr_timeout: OCR 시간 상한 (None 이면 OCR_POSTING_TIMEOUT)
+    """
+    if ocr is None:
+        ocr = JD_OCR_ENABLED
+
+    ocr_texts = None
+    if ocr:
+        img_urls = await run_in_process(detail_images, html, OCR_MAX_IMAGES)
+        ocr_texts = await ocr_images(img_urls, timeout=ocr_timeout or OCR_POSTING_TIMEOUT)
+
+    markdown_result, elapsed = await run_in_process(detail_to_markdown, html, ocr_texts)
+    HTML_PARSE_SECONDS.labels("detail", HTML_PARSER).observe(elapsed)
+    print(
+        f"🧩 상세 페이지 변환 {elapsed * 1000:.1f}ms ({HTML_PARSER}, {len(html)} chars"
+        + (f", OCR {len(ocr_texts)}장" if ocr_texts else "")
+        + ")",
+        flush=True,
+    )
+    return markdown_result
+
+
+async def extract_jd_markdown(jd_url, client, ocr=None, ocr_timeout=None):
     try:
         # 메인 페이지 요청
-        res = await client.get(jd_url)
-        res.raise_for_status()
+        with track_call("saramin", "page"):
+            res = await client.get(jd_url)
+            res.raise_for_status()
         res_text = res.content.decode('utf-8')
 
         # 메타데이터 추출
@@ -171,52 +136,18 @@ async def extract_jd_markdown(jd_url, client):
         inner_url = f"https://www.saramin.co.kr/zf_user/jobs/relay/view-detail?rec_idx={match.group(1)}"
 
         # 상세 페이지 요청
-        detail_res = await client.get(inner_url)
-        detail_res.raise_for_status()
+        with track_call("saramin", "detail"):
+            detail_res = await client.get(inner_url)
+            detail_res.raise_for_status()
+
+        # <body> → 마크다운 변환 (워커 프로세스 + 선택적 이미지 OCR, 직종 검색과 동시에 진행)
+        markdown_result = await render_detail_markdown(detail_res.text, ocr=ocr, ocr_timeout=ocr_timeout)
 
         # 직종 검색 결과 대기
         cat_mcls = await cat_task
-
-        soup = BeautifulSoup(detail_res.text, 'html.parser')
-        body = soup.find('body')
-        if not body:
+        if not markdown_result:
             return ""
 
-        # img_tags = body.find_all('img')
-
-        # ocr 작업 병렬 실행
-        # ocr_tasks = []
-        # valid_imgs = []
-
-        # for img in img_tags:
-        #     src = img.get('src')
-        #     if src and not any(k in src.lower() for k in ['icon', 'logo', 'blank', 'pixel', 'watermark']):
-        #         full_img_url = format_url(src)
-        #         valid_imgs.append(img)
-        #         ocr_tasks.append(perform_qwen3vl_ocr(full_img_url, client))
-        #     else:
-        #         img.decompose()
-
-        # # ocr 작업 실행 후 결과 대기
-        # print(f"총 {len(ocr_tasks)}개의 이미지 병렬 처리 시작...")
-        # ocr_results = await asyncio.gather(*ocr_tasks)
-
-        # # 이미지 태그를 추출된 텍스트로 교체
-        # for img, ocr_text in zip(valid_imgs, ocr_results):
-        #     if ocr_text:
-        #         img.replace_with(soup.new_string(ocr_text))
-        #     else:
-        #         img.decompose()
-
-        # 마크다운 형태로 변환
-        h = html2text.HTML2Text()
-        h.ignore_links = False
-        h.bypass_tables = False
-        h.body_width = 0
-
-        markdown_content = h.handle(str(body))
-        markdown_result = re.sub(r'\n{3,}', '\n\n', markdown_content)
-
         return {
             "title": title,
             "company": company,
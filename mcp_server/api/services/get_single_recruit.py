@@ -1,24 +1,76 @@
 import asyncio
 import httpx
-from bs4 import BeautifulSoup
 import os
 import re
-from tqdm.asyncio import tqdm
+import time
 from api.services.get_recruit_util_py import extract_jd_markdown, SARAMIN_CATEGORIES, HEADERS
+from api.services.ocr import JD_OCR_ENABLED, OCR_POSTING_TIMEOUT
+from api.services.cache import TTLCache
+from api.services.deadline import Deadline, DEADLINE_LLM_RESERVE_SECONDS
+from api.metrics import stage_timer
 
 BASE_DIR = "jd_crawled"
 
+# 크롤링 단계 시간 상한 (초, deadline 이 있을 때)
+CRAWL_MAX_SECONDS = float(os.getenv("CRAWL_MAX_SECONDS", 30))
+# OCR 에 최소 이만큼 못 쓰면 OCR 생략
+OCR_MIN_SECONDS = float(os.getenv("OCR_MIN_SECONDS", 10))
+# 크롤링 결과 캐시: JD_CACHE_TTL 안이면 다시 크롤링하지 않고,
+# JD_STALE_TTL 안이면 크롤링 실패 / 시간 초과 시 대신 사용
+JD_CACHE_TTL = float(os.getenv("JD_CACHE_TTL", 600))
+JD_STALE_TTL = float(os.getenv("JD_STALE_TTL", 86400))
+# url → (크롤링 시각, 결과) / OCR 을 생략한 결과는 시각 0 (대체용으로만 사용)
+jd_cache = TTLCache("jd", ttl=JD_STALE_TTL, maxsize=int(os.getenv("JD_CACHE_SIZE", 256)))
+
 def sanitize_filename(filename):
     return re.sub(r'[\\/*?:"<>|]', "", filename)
 
 
-async def get_single_recruit(url):
-    async with httpx.AsyncClient(headers=HEADERS, follow_redirects=True, timeout=5) as client:
-        result = await extract_jd_markdown(url, client)
-        if not result or not result.get('content'):
-            print(f"분석 실패, 혹은 내용이 없습니다.: {url}")
-            return
+async def _crawl(url, *, ocr=None, ocr_timeout=None, timeout=5):
+    async with httpx.AsyncClient(headers=HEADERS, follow_redirects=True, timeout=timeout) as client:
+        with stage_timer("crawl"):
+            return await extract_jd_markdown(url, client, ocr=ocr, ocr_timeout=ocr_timeout)
+
+
+async def get_single_recruit(url, *, deadline: Deadline | None = None):
+    """
+    deadline 이 있으면 생성 단계 몫을 남기고 남은 시간 안에서만 크롤링
+    (OCR 할 시간이 없으면 OCR 생략, 시간 초과 / 실패면 이전 크롤링 결과 사용)
+    """
+    cached = jd_cache.get(url)
+    if cached is not None and time.monotonic() - cached[0] < JD_CACHE_TTL:
+        return cached[1]
+
+    ocr = None
+    result = None
+    if deadline is None:
+        result = await _crawl(url)
+    else:
+        try:
+            async with deadline.stage("crawl", cap=CRAWL_MAX_SECONDS, reserve=DEADLINE_LLM_RESERVE_SECONDS) as budget:
+                ocr_timeout = min(OCR_POSTING_TIMEOUT, budget - OCR_MIN_SECONDS)  # OCR 뒤 마크다운 변환 몫
+                if JD_OCR_ENABLED and ocr_timeout < OCR_MIN_SECONDS:
+                    ocr = False
+                    deadline.degrade("crawl", "skip_ocr")
+                result = await _crawl(url, ocr=ocr, ocr_timeout=ocr_timeout, timeout=min(5, budget))
+        except TimeoutError:
+            result = None
+
+    if result and result.get('content'):
+        if ocr is not False:
+            jd_cache.set(url, (time.monotonic(), result))
+        elif cached is None:
+            jd_cache.set(url, (0.0, result))
         return result
+
+    if cached is not None:
+        if deadline is not None:
+            deadline.degrade("crawl", "cached_jd")
+        print(f"크롤링 실패 → 이전 크롤링 결과 사용: {url}", flush=True)
+        return cached[1]
+
+    print(f"분석 실패, 혹은 내용이 없습니다.: {url}")
+    return
         # save_title = sanitize_filename(result['title'])
         # save_company = sanitize_filename(result['company'])
         # content = result['content']
@@ -0,0 +1,156 @@
+# api/services/html_parse.py
+"""
+사람인 페이지 HTML 파싱 (워커 프로세스에서 실행되는 순수 함수)
+
+- lxml 이 설치되어 있으면 lxml 파서, 없으면 html.parser
+- 목록 페이지: SoupStrainer 로 공고 목록 div 만 파싱
+- 상세 페이지: <body> 구간만 잘라서 html2text 로 바로 변환 (BeautifulSoup 트리 생성 생략)
+- 각 함수는 (결과, 소요 시간) 을 반환 → 호출한 쪽에서 메트릭 기록
+
+이 모듈은 spawn 된 워커에서 import 되므로 무거운 앱 모듈을 import 하지 않는다.
+메인 프로세스도 함수 참조를 위해 import 하므로 bs4 / html2text 는 함수 안에서 import
+(워커는 warm_process_pool 에서 미리 import 해 둔다)
+"""
+from __future__ import annotations
+
+import importlib.util
+import os
+import re
+import time
+
+# 워커에서 미리 import 할 파싱 라이브러리
+PARSER_MODULES = ("bs4", "html2text")
+
+
+def _default_parser() -> str:
+    # lxml 을 실제로 import 하지 않고 설치 여부만 확인
+    return "lxml" if importlib.util.find_spec("lxml") else "html.parser"
+
+
+HTML_PARSER = os.getenv("HTML_PARSER") or _default_parser()
+
+_REC_IDX_RE = re.compile(r"rec_idx=(\d+)")
+_HEAD_END_RE = re.compile(r"</head\s*>", re.I)
+_BODY_START_RE = re.compile(r"<body\b", re.I)
+_BODY_END_RE = re.compile(r"</body\s*>", re.I)
+_IMG_RE = re.compile(r"<img\b[^>]*>", re.I)
+_SRC_RE = re.compile(r"""\ssrc\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s>]+))""", re.I)
+
+# 장식용 이미지 (OCR 대상 아님)
+_SKIP_IMG_KEYWORDS = ("icon", "logo", "blank", "pixel", "watermark")
+
+
+def _list_items(content: bytes):
+    from bs4 import BeautifulSoup, SoupStrainer
+
+    strainer = SoupStrainer("div", class_="common_recruilt_list")
+    soup = BeautifulSoup(content, HTML_PARSER, parse_only=strainer)
+    for recruit in soup.select("div.list_item"):
+        fetch_title = recruit.select_one("div.job_tit a.str_tit span")
+        fetch_company = recruit.select_one("div.company_nm a")
+        if fetch_title and fetch_company:
+            yield recruit, fetch_title.text.strip(), fetch_company.text.strip()
+
+
+def parse_list_page(content: bytes) -> tuple[list[tuple[str, str]], float]:
+    """직종별 공고 목록 페이지 → [(공고 제목, 회사명)]"""
+    start = time.perf_counter()
+    items = [(title, company) for _, title, company in _list_items(content)]
+    return items, time.perf_counter() - start
+
+
+def parse_list_postings(content: bytes) -> tuple[list[tuple[str, str, str]], float]:
+    """직종별 공고 목록 페이지 → [(rec_idx, 공고 제목, 회사명)] (링크에 rec_idx 가 있는 공고만)"""
+    start = time.perf_counter()
+    items = []
+    for recruit, title, company in _list_items(content):
+        link = recruit.select_one("div.job_tit a.str_tit")
+        m = _REC_IDX_RE.search(link.get("href", "")) if link else None
+        if m:
+            items.append((m.group(1), title, company))
+    return items, time.perf_counter() - start
+
+
+def head_section(html: str) -> str:
+    """</head> 이전 구간 (없으면 전체)"""
+    m = _HEAD_END_RE.search(html)
+    return html[:m.start()] if m else html
+
+
+def _body_section(html: str) -> str | None:
+    start = _BODY_START_RE.search(html)
+    if not start:
+        return None
+    end = None
+    for end in _BODY_END_RE.finditer(html, start.start()):
+        pass
+    return html[start.start():end.end() if end else len(html)]
+
+
+def format_url(src: str) -> str:
+    if src.startswith("//"):
+        return "https:" + src
+    if src.startswith("/"):
+        return "https://www.saramin.co.kr" + src
+    return src
+
+
+def _img_src(tag: str) -> str | None:
+    m = _SRC_RE.search(tag)
+    if not m:
+        return None
+    return next(g for g in m.groups() if g is not None).strip() or None
+
+
+def detail_images(html: str, limit: int = 10) -> list[str]:
+    """상세 페이지 <body> 의 OCR 대상 이미지 URL (중복 제거, 등장 순서, 최대 limit 개)"""
+    body = _body_section(html) or ""
+    urls = []
+    for tag in _IMG_RE.findall(body):
+        src = _img_src(tag)
+        if not src or src.startswith("data:") or any(k in src.lower() for k in _SKIP_IMG_KEYWORDS):
+            continue
+        url = format_url(src)
+        if url not in urls:
+            urls.append(url)
+            if len(urls) >= limit:
+                break
+    return urls
+
+
+def detail_to_markdown(html: str, ocr_texts: dict[str, str] | None = None) -> tuple[str, float]:
+    """
+    상세 페이지 <body> → 마크다운
+    ocr_texts({이미지 URL: 추출 텍스트}) 가 있으면 해당 <img> 자리에 OCR 결과를 넣는다
+    (html2text 가 줄바꿈/표를 뭉개지 않도록 자리표시자로 변환한 뒤 마지막에 치환)
+    """
+    start = time.perf_counter()
+    body = _body_section(html)
+    if body is None:
+        return "", time.perf_counter() - start
+
+    placeholders: dict[str, str] = {}
+    if ocr_texts:
+        def _replace(m):
+            src = _img_src(m.group(0))
+            text = ocr_texts.get(format_url(src)) if src else None
+            if not text:
+                return m.group(0)
+            token = f"OCRIMG{len(placeholders)}X"
+            placeholders[token] = text
+            return f"<p>{token}</p>"
+
+        body = _IMG_RE.sub(_replace, body)
+
+    import html2text
+
+    h = html2text.HTML2Text()
+    h.ignore_links = False
+    h.bypass_tables = False
+    h.body_width = 0
+
+    markdown_content = h.handle(body)
+    for token, text in placeholders.items():
+        markdown_content = markdown_content.replace(token, text, 1)
+    markdown_result = re.sub(r"\n{3,}", "\n\n", markdown_content)
+    return markdown_result, time.perf_counter() - start
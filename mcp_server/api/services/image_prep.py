@@ -0,0 +1,39 @@
+# api/services/image_prep.py
+"""
+OCR 전 이미지 전처리 (워커 프로세스에서 실행되는 순수 함수)
+
+디코딩 → 작은 아이콘/구분선 제외 → RGB 변환 → 긴 변 기준 축소 → PNG base64
+spawn 된 워커에서 import 되므로 PIL 외의 앱 모듈은 import 하지 않는다.
+PIL 은 함수 안에서 import (메인 프로세스는 함수 참조만 필요, 워커는 warm_process_pool 에서 미리 로드)
+"""
+from __future__ import annotations
+
+import base64
+from io import BytesIO
+
+# 워커에서 미리 import 할 라이브러리
+IMAGE_MODULES = ("PIL.Image",)
+
+
+def prepare_image(content: bytes, max_side: int = 1600, min_side: int = 40) -> str | None:
+    """OCR 할 가치가 없는 이미지(너무 작음 / 디코딩 실패)는 None"""
+    from PIL import Image
+
+    try:
+        img = Image.open(BytesIO(content))
+        # gif 등 애니메이션은 첫 프레임만
+        img.seek(0)
+        width, height = img.size
+        if min(width, height) < min_side:
+            return None
+
+        if img.mode != "RGB":
+            img = img.convert("RGB")
+        if max(width, height) > max_side:
+            img.thumbnail((max_side, max_side), Image.LANCZOS)
+
+        buffer = BytesIO()
+        img.save(buffer, format="PNG", optimize=False)
+        return base64.b64encode(buffer.getvalue()).decode("utf-8")
+    except Exception:
+        return None
@@ -0,0 +1,326 @@
+# api/services/job_index.py
+"""
+job_trend 공고 매칭용 in-process 역색인
+
+- job_cat 별로 기술(job_tech) / 키워드(job_keyword) 토큰 → 공고 id 집합
+- job_tech 는 색인 시점에 한 번만 파싱해서 보관 (요청마다 json.loads 하지 않음)
+- 여러 검색어를 idf 가중치로 점수화 → top-k + 페이지네이션
+- id 워터마크 기준 증분 갱신
+  (수정 / 삭제된 공고는 증분 갱신으로 알 수 없음 → JOB_INDEX_FULL_REBUILD_INTERVAL 초마다 전체 재색인,
+   그 사이에는 수정 전 토큰 / 삭제된 공고가 검색될 수 있음)
+"""
+from __future__ import annotations
+
+import asyncio
+import math
+import os
+import re
+import time
+
+from starlette.concurrency import run_in_threadpool
+
+from api.metrics import stage_timer
+from api.services.job_trend_agg import split_terms
+
+JOB_INDEX_REFRESH_INTERVAL = float(os.getenv("JOB_INDEX_REFRESH_INTERVAL", 60))
+JOB_INDEX_FETCH_BATCH = int(os.getenv("JOB_INDEX_FETCH_BATCH", 5000))
+# 수정 / 삭제 반영용 전체 재색인 주기 (초, 0 이면 증분 실패 시에만)
+JOB_INDEX_FULL_REBUILD_INTERVAL = float(os.getenv("JOB_INDEX_FULL_REBUILD_INTERVAL", 3600))
+
+# 필드 가중치 (기술 스택 일치가 키워드 일치보다 중요)
+TECH_WEIGHT = 1.0
+KEYWORD_WEIGHT = 0.7
+
+_QUERY_SPLIT_RE = re.compile(r"[,/|·\s]+")
+
+
+def _tokens(terms: list[str]) -> set[str]:
+    """용어 전체 + 공백 단위 단어 (예: 'Spring Boot' → spring boot, spring, boot)"""
+    out = set()
+    for term in terms:
+        t = term.casefold()
+        out.add(t)
+        parts = t.split()
+        if len(parts) > 1:
+            out.update(parts)
+    return out
+
+
+def query_tokens(text: str) -> list[str]:
+    return list(dict.fromkeys(t.casefold() for t in _QUERY_SPLIT_RE.split(text or "") if t.strip()))
+
+
+class JobPosting:
+    __slots__ = ("id", "job_cat", "title", "company", "url", "job_tech", "job_keyword", "tech_tokens", "keyword_tokens")
+
+    def __init__(self, id, job_cat, title, company, url, job_tech_raw, job_keyword):
+        self.id = id
+        self.job_cat = job_cat
+        self.title = title
+        self.company = company
+        self.url = url
+        self.job_tech = split_terms(job_tech_raw)
+        self.job_keyword = job_keyword
+        self.tech_tokens = _tokens(self.job_tech)
+        self.keyword_tokens = _tokens(split_terms(job_keyword))
+
+    def signature(self) -> tuple:
+        """전체 재색인 때 바뀐 공고를 찾기 위한 값"""
+        return (self.job_cat, self.title, self.company, self.url, tuple(self.job_tech), self.job_keyword)
+
+    def to_dict(self) -> dict:
+        return {
+            "title": self.title,
+            "company": self.company,
+            "url": self.url,
+            "job_tech": self.job_tech,
+            "keyword": self.job_keyword,
+        }
+
+
+class _CategoryIndex:
+    __slots__ = ("postings", "tech", "keyword")
+
+    def __init__(self):
+        self.postings: dict = {}
+        self.tech: dict[str, set] = {}
+        self.keyword: dict[str, set] = {}
+
+    def add(self, p: JobPosting) -> None:
+        old = self.postings.get(p.id)
+        if old is not None:
+            self._remove_tokens(old)
+        self.postings[p.id] = p
+        for tok in p.tech_tokens:
+            self.tech.setdefault(tok, set()).add(p.id)
+        for tok in p.keyword_tokens:
+            self.keyword.setdefault(tok, set()).add(p.id)
+
+    def _remove_tokens(self, p: JobPosting) -> None:
+        for tok in p.tech_tokens:
+            self.tech.get(tok, set()).discard(p.id)
+        for tok in p.keyword_tokens:
+            self.keyword.get(tok, set()).discard(p.id)
+
+    def _idf(self, df: int) -> float:
+        n = len(self.postings)
+        return math.log(1 + (n - df + 0.5) / (df + 0.5))
+
+    def search(self, tech_terms: list[str], keyword_terms: list[str]) -> list[tuple[float, JobPosting]]:
+        if not tech_terms and not keyword_terms:
+            # 조건이 없으면 최신 공고 순
+            return [(0.0, p) for p in sorted(self.postings.values(), key=lambda p: p.id, reverse=True)]
+
+        scores: dict = {}
+        matched: dict = {}
+        for terms, inverted, weight in (
+            (tech_terms, self.tech, TECH_WEIGHT),
+            (keyword_terms, self.keyword, KEYWORD_WEIGHT),
+        ):
+            for term in terms:
+                ids = inverted.get(term)
+                if not ids:
+                    continue
+                w = weight * self._idf(len(ids))
+                for pid in ids:
+                    scores[pid] = scores.get(pid, 0.0) + w
+                    matched[pid] = matched.get(pid, 0) + 1
+
+        n_terms = len(tech_terms) + len(keyword_terms)
+        ranked = []
+        for pid, score in scores.items():
+            # 더 많은 검색어를 만족할수록 가산 (AND 에 가까운 순위)
+            coverage = matched[pid] / n_terms
+            ranked.append((score * (0.5 + coverage), self.postings[pid]))
+        ranked.sort(key=lambda x: (x[0], x[1].id), reverse=True)
+        return ranked
+
+
+class JobIndex:
+    def __init__(self):
+        self._cats: dict[str, _CategoryIndex] = {}
+        self._last_id = 0
+        self._incremental_ok = True  # 로그를 상태가 바뀔 때만 남기기 위한 값
+        self._last_full: float | None = None  # 마지막으로 테이블 전체를 읽은 시각
+        self._lock = asyncio.Lock()
+        self._task: asyncio.Task | None = None
+        # 전체 재색인으로 공고가 수정 / 삭제됐을 때 증가 (job_vectors 가 보고 벡터를 맞춤)
+        self.generation = 0
+
+    def size(self, job_cat: str | None = None) -> int:
+        if job_cat is not None:
+            idx = self._cats.get(job_cat)
+            return len(idx.postings) if idx else 0
+        return sum(len(idx.postings) for idx in self._cats.values())
+
+    def categories(self) -> list[str]:
+        return list(self._cats)
+
+    def postings(self, job_cat: str) -> list[JobPosting]:
+        idx = self._cats.get(job_cat)
+        return list(idx.postings.values()) if idx else []
+
+    def search(
+        self,
+        job_cat: str,
+        tech_text: str = "",
+        role_text: str = "",
+        *,
+        page: int = 1,
+        page_size: int = 20,
+    ) -> dict:
+        with stage_timer("job_match"):
+            idx = self._cats.get(job_cat)
+            if idx is None:
+                return {"total": 0, "page": page, "page_size": page_size, "jobs": []}
+
+            ranked = idx.search(query_tokens(tech_text), query_tokens(role_text))
+            start = max(0, (page - 1) * page_size)
+            return {
+                "total": len(ranked),
+                "page": page,
+                "page_size": page_size,
+                "jobs": [
+                    {**p.to_dict(), "score": round(score, 4)}
+                    for score, p in ranked[start:start + page_size]
+                ],
+            }
+
+    # -----------------------
+    # 갱신
+    # -----------------------
+    async def refresh(self, pool) -> int:
+        """새로 추가된 공고만 색인 (주기가 되면 전체 재색인), 추가 / 변경된 공고 수 반환"""
+        if pool is None:
+            return 0
+
+        async with self._lock:
+            if self._full_rebuild_due():
+                return await self._rebuild_full(pool)
+            try:
+                added = await self._refresh_incremental(pool)
+                if self._last_full is None:
+                    # 첫 증분 색인은 id 0 부터 전부 읽으므로 전체 재색인과 같음
+                    self._last_full = time.time()
+                if not self._incremental_ok:
+                    print("✅ job_trend 증분 색인 복구", flush=True)
+                    self._incremental_ok = True
+                return added
+            except Exception as e:
+                # 이번 갱신만 전체 재색인 (다음 갱신은 다시 증분)
+                if self._incremental_ok:
+                    print(f"⚠️ job_trend 증분 색인 실패 → 전체 재색인: {e}", flush=True)
+                    self._incremental_ok = False
+            return await self._rebuild_full(pool)
+
+    def _full_rebuild_due(self) -> bool:
+        return (
+            JOB_INDEX_FULL_REBUILD_INTERVAL > 0
+            and self._last_full is not None
+            and time.time() - self._last_full >= JOB_INDEX_FULL_REBUILD_INTERVAL
+        )
+
+    async def _refresh_incremental(self, pool) -> int:
+        added = 0
+        async with pool.acquire() as conn:
+            async with conn.cursor() as cursor:
+                while True:
+                    await cursor.execute(
+                        "SELECT id, job_cat, job_title, job_company, job_url, job_tech, job_keyword"
+                        " FROM job_trend WHERE id > %s ORDER BY id LIMIT %s",
+                        (self._last_id, JOB_INDEX_FETCH_BATCH),
+                    )
+                    rows = await cursor.fetchall()
+                    if not rows:
+                        break
+                    postings = await run_in_threadpool(self._parse_rows, rows)
+                    for p in postings:
+                        self._cats.setdefault(p.job_cat, _CategoryIndex()).add(p)
+                    added += len(postings)
+                    self._last_id = rows[-1][0]
+                    if len(rows) < JOB_INDEX_FETCH_BATCH:
+                        break
+        return added
+
+    async def _rebuild_full(self, pool) -> int:
+        async with pool.acquire() as conn:
+            async with conn.cursor() as cursor:
+                # 공고 키는 증분 색인 / 벡터 색인(job_vectors)과 같은 id 를 사용
+                # id 컬럼이 없는 스키마에서만 job_url 을 키로 사용 (이때는 매번 전체 재색인이라 섞이지 않음)
+                try:
+                    await cursor.execute(
+                        "SELECT id, job_cat, job_title, job_company, job_url, job_tech, job_keyword FROM job_trend ORDER BY id"
+                    )
+                    by_id = True
+                except Exception:
+                    await cursor.execute(
+                        "SELECT job_url, job_cat, job_title, job_company, job_url, job_tech, job_keyword FROM job_trend"
+                    )
+                    by_id = False
+                rows = await cursor.fetchall()
+
+        old = {pid: p.signature() for idx in self._cats.values() for pid, p in idx.postings.items()}
+
+        def _build():
+            cats: dict[str, _CategoryIndex] = {}
+            for p in self._parse_rows(rows):
+                cats.setdefault(p.job_cat, _CategoryIndex()).add(p)
+            return cats
+
+        cats = await run_in_threadpool(_build)
+        new = {pid: p.signature() for idx in cats.values() for pid, p in idx.postings.items()}
+        added = len(new.keys() - old.keys())
+        changed = sum(1 for pid, sig in old.items() if pid in new and new[pid] != sig)
+        removed = len(old.keys() - new.keys())
+
+        self._cats = cats
+        if by_id and rows:
+            self._last_id = max(r[0] for r in rows)
+        if changed or removed:
+            self.generation += 1
+            print(f"♻️ job_trend 전체 재색인: 수정 {changed}건 / 삭제 {removed}건", flush=True)
+        self._last_full = time.time()
+        return added + changed + removed
+
+    @staticmethod
+    def _parse_rows(rows) -> list[JobPosting]:
+        return [
+            JobPosting(id, job_cat, title, company, url, job_tech, job_keyword)
+            for id, job_cat, title, company, url, job_tech, job_keyword in rows
+            if job_cat
+        ]
+
+    # -----------------------
+    # 주기적 갱신 (lifespan)
+    # -----------------------
+    async def start(self, get_pool) -> None:
+        try:
+            added = await self.refresh(await get_pool())
+            print(f"✅ job_trend 색인 완료: {added}건", flush=True)
+        except Exception as e:
+            print(f"⚠️ job_trend 색인 실패: {e}", flush=True)
+
+        if self._task is None and JOB_INDEX_REFRESH_INTERVAL > 0:
+            self._task = asyncio.create_task(self._loop(get_pool))
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _loop(self, get_pool) -> None:
+        while True:
+            await asyncio.sleep(JOB_INDEX_REFRESH_INTERVAL)
+            try:
+                added = await self.refresh(await get_pool())
+                if added:
+                    print(f"♻️ job_trend 색인 갱신: +{added}건", flush=True)
+            except Exception as e:
+                print(f"⚠️ job_trend 색인 갱신 실패: {e}", flush=True)
+
+
+job_index = JobIndex()
@@ -0,0 +1,321 @@
+# api/services/job_trend_agg.py
+"""
+job_trend 키워드/기술 빈도 집계 (materialized, in-process)
+
+- job_cat 별로 job_tech / job_core / job_keyword 용어 빈도를 누적
+- 최근 공고일수록 가중치가 큼 (반감기 JOB_TREND_HALF_LIFE_DAYS)
+- id 워터마크 기준 증분 갱신 → 새로 들어온 행만 읽음
+  (증분 갱신은 수정 / 삭제된 행을 알 수 없음 → JOB_TREND_FULL_REBUILD_INTERVAL 초마다 전체 재집계로 바로잡음,
+   그 사이에는 수정 전 값 / 삭제된 행이 집계에 남아 있음)
+- 프롬프트에는 top-N 만 넣으므로 테이블이 커져도 프롬프트 크기는 일정
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import math
+import os
+import re
+import time
+from datetime import datetime
+
+from starlette.concurrency import run_in_threadpool
+
+from api.metrics import stage_timer
+
+FIELDS = ("job_tech", "job_core", "job_keyword")
+
+JOB_TREND_TOP_N = int(os.getenv("JOB_TREND_TOP_N", 30))
+JOB_TREND_HALF_LIFE_DAYS = float(os.getenv("JOB_TREND_HALF_LIFE_DAYS", 30))
+JOB_TREND_REFRESH_INTERVAL = float(os.getenv("JOB_TREND_REFRESH_INTERVAL", 60))
+JOB_TREND_FETCH_BATCH = int(os.getenv("JOB_TREND_FETCH_BATCH", 5000))
+# 수정 / 삭제 반영용 전체 재집계 주기 (초, 0 이면 증분 실패 시에만)
+JOB_TREND_FULL_REBUILD_INTERVAL = float(os.getenv("JOB_TREND_FULL_REBUILD_INTERVAL", 3600))
+
+# 가중치 기준 시점 (고정) — 2^((t - EPOCH) / half_life) 로 누적하면
+# 시간이 지나도 기존 점수를 다시 계산할 필요 없이 순위가 유지된다
+_WEIGHT_EPOCH = datetime(2024, 1, 1).timestamp()
+# 지수 상한 — 반감기를 짧게 잡거나 오래 돌려도 2^x 가 float 범위를 넘지 않도록
+# (가중치 합산 / 1위 대비 정규화에 쓸 여유를 남겨 둠)
+_MAX_WEIGHT_EXP = 900.0
+
+_SPLIT_RE = re.compile(r"[,/|·\n]+")
+
+
+def split_terms(raw) -> list[str]:
+    """JSON 배열 문자열 / 쉼표 구분 문자열 모두 처리"""
+    if raw is None:
+        return []
+    if isinstance(raw, (bytes, bytearray)):
+        raw = raw.decode("utf-8", errors="ignore")
+    if isinstance(raw, (list, tuple)):
+        items = raw
+    else:
+        raw = str(raw).strip()
+        if not raw:
+            return []
+        items = None
+        if raw.startswith("["):
+            try:
+                parsed = json.loads(raw)
+                if isinstance(parsed, list):
+                    items = parsed
+            except json.JSONDecodeError:
+                pass
+        if items is None:
+            items = _SPLIT_RE.split(raw)
+
+    out = []
+    for item in items:
+        term = str(item).strip().strip("\"'[]").strip()
+        if term and len(term) <= 50:
+            out.append(term)
+    return out
+
+
+def _recency_weight(ts) -> float:
+    if ts is None:
+        return 1.0
+    if isinstance(ts, datetime):
+        ts = ts.timestamp()
+    elif isinstance(ts, str):
+        try:
+            ts = datetime.fromisoformat(ts).timestamp()
+        except ValueError:
+            return 1.0
+    half_life = JOB_TREND_HALF_LIFE_DAYS * 86400
+    exp = (float(ts) - _WEIGHT_EPOCH) / half_life
+    return math.pow(2.0, max(-_MAX_WEIGHT_EXP, min(exp, _MAX_WEIGHT_EXP)))
+
+
+class CategoryAggregate:
+    __slots__ = ("rows", "total_weight", "counts", "weights", "display", "version")
+
+    def __init__(self):
+        self.rows = 0
+        self.total_weight = 0.0
+        self.counts = {f: {} for f in FIELDS}
+        self.weights = {f: {} for f in FIELDS}
+        self.display = {f: {} for f in FIELDS}
+        self.version = 0
+
+    def add(self, field: str, term: str, weight: float) -> None:
+        key = term.casefold()
+        self.counts[field][key] = self.counts[field].get(key, 0) + 1
+        self.weights[field][key] = self.weights[field].get(key, 0.0) + weight
+        self.display[field].setdefault(key, term)
+
+    def top(self, field: str, n: int) -> list[dict]:
+        weights = self.weights[field]
+        keys = sorted(weights, key=weights.get, reverse=True)[:n]
+        if not keys:
+            return []
+        best = weights[keys[0]] or 1.0
+        return [
+            {
+                "term": self.display[field][k],
+                "count": self.counts[field][k],
+                "weight": round(weights[k] / best, 4),   # 1위 대비 상대 가중치
+            }
+            for k in keys
+        ]
+
+
+def _same(a: CategoryAggregate | None, b: CategoryAggregate | None) -> bool:
+    if a is None or b is None:
+        return False
+    return a.rows == b.rows and a.counts == b.counts and a.weights == b.weights
+
+
+class JobTrendAggregator:
+    def __init__(self):
+        self._cats: dict[str, CategoryAggregate] = {}
+        self._last_id = 0
+        self._incremental_ok = True  # 로그를 상태가 바뀔 때만 남기기 위한 값
+        self._last_full: float | None = None  # 마지막으로 테이블 전체를 읽은 시각
+        self._lock = asyncio.Lock()
+        self._task: asyncio.Task | None = None
+        self.last_refresh: float | None = None
+        self.generation = 0  # 어느 job_cat 이든 바뀌면 증가
+
+    # -----------------------
+    # 조회
+    # -----------------------
+    def version(self, job_cat: str) -> int:
+        agg = self._cats.get(job_cat)
+        return agg.version if agg else 0
+
+    def top(self, job_cat: str, field: str, n: int = JOB_TREND_TOP_N) -> list[dict]:
+        agg = self._cats.get(job_cat)
+        return agg.top(field, n) if agg else []
+
+    def rows(self, job_cat: str) -> int:
+        agg = self._cats.get(job_cat)
+        return agg.rows if agg else 0
+
+    def categories(self) -> list[str]:
+        return list(self._cats)
+
+    def aggregate(self, job_cat: str) -> CategoryAggregate | None:
+        return self._cats.get(job_cat)
+
+    # -----------------------
+    # 갱신
+    # -----------------------
+    async def refresh(self, pool) -> set[str]:
+        """새로 추가된 행만 읽어서 집계에 반영 (주기가 되면 전체 재집계), 변경된 job_cat 집합 반환"""
+        if pool is None:
+            return set()
+
+        async with self._lock:
+            with stage_timer("job_trend_agg_refresh"):
+                if self._full_rebuild_due():
+                    changed = await self._rebuild_full(pool)
+                    self._mark_refreshed(changed)
+                    return changed
+                try:
+                    changed = await self._refresh_incremental(pool)
+                    if self._last_full is None:
+                        # 첫 증분 갱신은 id 0 부터 전부 읽으므로 전체 재집계와 같음
+                        self._last_full = time.time()
+                    if not self._incremental_ok:
+                        print("✅ job_trend 증분 집계 복구", flush=True)
+                        self._incremental_ok = True
+                    self._mark_refreshed(changed)
+                    return changed
+                except Exception as e:
+                    # 이번 갱신만 전체 재집계 (일시적인 DB 오류일 수 있으므로 다음 갱신은 다시 증분)
+                    # id / created_at 컬럼이 없는 스키마면 매번 여기로 옴
+                    if self._incremental_ok:
+                        print(f"⚠️ job_trend 증분 집계 실패 → 전체 재집계: {e}", flush=True)
+                        self._incremental_ok = False
+
+                changed = await self._rebuild_full(pool)
+                self._mark_refreshed(changed)
+                return changed
+
+    def _full_rebuild_due(self) -> bool:
+        return (
+            JOB_TREND_FULL_REBUILD_INTERVAL > 0
+            and self._last_full is not None
+            and time.time() - self._last_full >= JOB_TREND_FULL_REBUILD_INTERVAL
+        )
+
+    def _mark_refreshed(self, changed: set[str]) -> None:
+        self.last_refresh = time.time()
+        if changed:
+            self.generation += 1
+
+    async def _refresh_incremental(self, pool) -> set[str]:
+        changed: set[str] = set()
+        async with pool.acquire() as conn:
+            async with conn.cursor() as cursor:
+                while True:
+                    await cursor.execute(
+                        "SELECT id, job_cat, job_tech, job_core, job_keyword, created_at FROM job_trend"
+                        " WHERE id > %s ORDER BY id LIMIT %s",
+                        (self._last_id, JOB_TREND_FETCH_BATCH),
+                    )
+                    rows = await cursor.fetchall()
+                    if not rows:
+                        break
+                    # 파싱은 threadpool, 누적은 이벤트 루프에서 (조회 중인 dict 를 다른 스레드가 건드리지 않도록)
+                    parsed = await run_in_threadpool(self._parse_rows, rows)
+                    changed |= self._apply_parsed(parsed, self._cats)
+                    self._last_id = rows[-1][0]
+                    if len(rows) < JOB_TREND_FETCH_BATCH:
+                        break
+
+        for cat in changed:
+            self._cats[cat].version += 1
+        return changed
+
+    async def _rebuild_full(self, pool) -> set[str]:
+        async with pool.acquire() as conn:
+            async with conn.cursor() as cursor:
+                try:
+                    # 증분 갱신과 같은 가중치 / 기준 id 로 다시 만들어야 이후 증분 결과와 섞여도 맞음
+                    # id 순서로 누적해야 바뀐 행이 없을 때 증분 결과와 가중치 합이 정확히 같음
+                    await cursor.execute(
+                        "SELECT id, job_cat, job_tech, job_core, job_keyword, created_at FROM job_trend ORDER BY id"
+                    )
+                except Exception:
+                    await cursor.execute("SELECT NULL, job_cat, job_tech, job_core, job_keyword, NULL FROM job_trend")
+                rows = await cursor.fetchall()
+
+        # 새 dict 에 만들고 마지막에 교체하므로 전부 threadpool 에서 처리해도 안전
+        cats: dict[str, CategoryAggregate] = {}
+        await run_in_threadpool(lambda: self._apply_parsed(self._parse_rows(rows), cats))
+
+        # 내용이 그대로인 job_cat 은 version 을 유지 (트렌드 프롬프트 캐시가 주기적으로 비워지지 않도록)
+        changed = {cat for cat in set(cats) | set(self._cats) if not _same(cats.get(cat), self._cats.get(cat))}
+        for cat, agg in cats.items():
+            agg.version = self.version(cat) + (1 if cat in changed else 0)
+        self._cats = cats
+        self._last_id = max((r[0] for r in rows if r[0] is not None), default=self._last_id)
+        self._last_full = time.time()
+        return changed
+
+    @staticmethod
+    def _parse_rows(rows) -> list[tuple[str, float, list[tuple[str, list[str]]]]]:
+        parsed = []
+        for _id, job_cat, job_tech, job_core, job_keyword, created_at in rows:
+            if not job_cat:
+                continue
+            fields = [
+                # 한 공고 안에서 같은 용어가 반복돼도 1회로 센다
+                (field, list(dict.fromkeys(split_terms(raw))))
+                for field, raw in (("job_tech", job_tech), ("job_core", job_core), ("job_keyword", job_keyword))
+            ]
+            parsed.append((job_cat, _recency_weight(created_at), fields))
+        return parsed
+
+    @staticmethod
+    def _apply_parsed(parsed, cats: dict[str, CategoryAggregate]) -> set[str]:
+        changed = set()
+        for job_cat, weight, fields in parsed:
+            agg = cats.get(job_cat)
+            if agg is None:
+                agg = cats[job_cat] = CategoryAggregate()
+            agg.rows += 1
+            agg.total_weight += weight
+            for field, terms in fields:
+                for term in terms:
+                    agg.add(field, term, weight)
+            changed.add(job_cat)
+        return changed
+
+    # -----------------------
+    # 주기적 갱신 (lifespan)
+    # -----------------------
+    async def start(self, get_pool) -> None:
+        try:
+            await self.refresh(await get_pool())
+            print(f"✅ job_trend 집계 완료: {len(self._cats)}개 직무", flush=True)
+        except Exception as e:
+            print(f"⚠️ job_trend 집계 실패: {e}", flush=True)
+
+        if self._task is None and JOB_TREND_REFRESH_INTERVAL > 0:
+            self._task = asyncio.create_task(self._loop(get_pool))
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _loop(self, get_pool) -> None:
+        while True:
+            await asyncio.sleep(JOB_TREND_REFRESH_INTERVAL)
+            try:
+                changed = await self.refresh(await get_pool())
+                if changed:
+                    print(f"♻️ job_trend 집계 갱신: {sorted(changed)}", flush=True)
+            except Exception as e:
+                print(f"⚠️ job_trend 집계 갱신 실패: {e}", flush=True)
+
+
+job_trend_agg = JobTrendAggregator()
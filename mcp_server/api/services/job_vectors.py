@@ -0,0 +1,222 @@
+# api/services/job_vectors.py
+"""
+job_trend 공고 벡터 색인 (이력서 ↔ 공고 매칭용)
+
+- 공고(제목 + 기술 + 키워드)를 전용 Chroma 컬렉션에 임베딩해서 저장
+- job_index 에 새로 들어온 공고만 배치로 임베딩 (증분 동기화, 재시작 시 기존 id 재사용)
+- 기동 직후 / job_index 전체 재색인으로 공고가 수정·삭제된 뒤에는 컬렉션 전체를 job_index 와 대조
+  (삭제된 공고 벡터는 지우고, 문서 / 메타데이터가 달라진 공고는 다시 임베딩)
+- 검색: 이력서 요약 임베딩 → job_cat 메타데이터 필터 + ANN top-k
+- 멀티 워커: 리더 락을 잡은 워커만 임베딩, 나머지는 컬렉션의 id 목록만 다시 읽음
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+
+from starlette.concurrency import run_in_threadpool
+
+from ollama import ollama_embed, ollama_embed_batch
+from api.rag.rag import get_chroma
+from api.db.distributed import LeaderLock
+from api.llm.scheduler import BACKGROUND, INTERACTIVE
+from api.metrics import track_call, stage_timer
+from api.services.job_index import job_index, JobIndex, JobPosting
+
+JOB_VECTOR_COLLECTION = os.getenv("JOB_VECTOR_COLLECTION", "job_postings")
+JOB_VECTOR_SYNC_INTERVAL = float(os.getenv("JOB_VECTOR_SYNC_INTERVAL", 60))
+JOB_VECTOR_BATCH = int(os.getenv("JOB_VECTOR_BATCH", 64))
+
+
+def posting_document(p: JobPosting) -> str:
+    parts = [p.title or ""]
+    if p.job_tech:
+        parts.append("기술: " + ", ".join(p.job_tech))
+    if p.job_keyword:
+        parts.append(f"키워드: {p.job_keyword}")
+    return "\n".join(parts)
+
+
+def posting_metadata(p: JobPosting) -> dict:
+    return {"job_cat": p.job_cat, "title": p.title or "", "company": p.company or "", "url": p.url or ""}
+
+
+class JobVectorIndex:
+    def __init__(self, index: JobIndex, collection_name: str = JOB_VECTOR_COLLECTION):
+        self._index = index
+        self._collection_name = collection_name
+        self._collection = None
+        self._embedded: set[str] = set()
+        self._reconciled_generation: int | None = None  # 마지막으로 컬렉션을 대조한 job_index.generation
+        self._lock = asyncio.Lock()
+        self._task: asyncio.Task | None = None
+        self._leader = LeaderLock(f"job_vectors:{collection_name}")
+
+    def _get_collection(self):
+        if self._collection is None:
+            self._collection = get_chroma().get_or_create_collection(
+                name=self._collection_name,
+                metadata={"hnsw:space": "cosine"},
+            )
+            # 이전 실행에서 임베딩한 공고는 다시 임베딩하지 않는다
+            with track_call("chroma", "get"):
+                self._embedded = set(self._collection.get(include=[])["ids"])
+        return self._collection
+
+    def size(self) -> int:
+        return len(self._embedded)
+
+    # -----------------------
+    # 동기화
+    # -----------------------
+    async def sync(self) -> int:
+        """job_index 에는 있지만 아직 임베딩 안 된 공고만 추가, 추가된 개수 반환"""
+        async with self._lock:
+            collection = await run_in_threadpool(self._get_collection)
+            if self._reconciled_generation != self._index.generation:
+                await self._reconcile(collection)
+
+            pending = [
+                p for cat in self._index.categories()
+                for p in self._index.postings(cat)
+                if str(p.id) not in self._embedded
+            ]
+            added = 0
+            for i in range(0, len(pending), JOB_VECTOR_BATCH):
+                batch = pending[i:i + JOB_VECTOR_BATCH]
+                docs = [posting_document(p) for p in batch]
+                with stage_timer("job_vector_sync"):
+                    embeddings = await ollama_embed_batch(docs, priority=BACKGROUND)
+                    ids = [str(p.id) for p in batch]
+                    metadatas = [posting_metadata(p) for p in batch]
+
+                    def _upsert():
+                        with track_call("chroma", "upsert"):
+                            collection.upsert(ids=ids, embeddings=embeddings, documents=docs, metadatas=metadatas)
+
+                    await run_in_threadpool(_upsert)
+                self._embedded.update(ids)
+                added += len(batch)
+            return added
+
+    async def _reconcile(self, collection) -> None:
+        """컬렉션을 job_index 와 대조: 삭제된 공고는 지우고, 바뀐 공고는 다음 임베딩 대상으로"""
+        current = {
+            str(p.id): (posting_document(p), posting_metadata(p))
+            for cat in self._index.categories()
+            for p in self._index.postings(cat)
+        }
+        if not current:
+            # 색인이 비어 있으면 (MySQL 장애 등) 벡터를 전부 지우지 않도록 대조를 미룸
+            return
+        generation = self._index.generation
+
+        def _diff() -> tuple[list[str], list[str], set[str]]:
+            with track_call("chroma", "get"):
+                stored = collection.get(include=["documents", "metadatas"])
+            removed, changed = [], []
+            for pid, doc, meta in zip(stored["ids"], stored["documents"], stored["metadatas"]):
+                if pid not in current:
+                    removed.append(pid)
+                elif current[pid] != (doc, meta):
+                    changed.append(pid)
+            if removed:
+                with track_call("chroma", "delete"):
+                    collection.delete(ids=removed)
+            return removed, changed, set(stored["ids"])
+
+        removed, changed, stored_ids = await run_in_threadpool(_diff)
+        # 바뀐 공고는 _embedded 에서 빼서 sync 가 다시 임베딩 (upsert 로 덮어씀)
+        self._embedded = stored_ids - set(removed) - set(changed)
+        self._reconciled_generation = generation
+        if removed or changed:
+            print(f"♻️ 공고 벡터 대조: 삭제 {len(removed)}건 / 재임베딩 {len(changed)}건", flush=True)
+
+    async def refresh(self) -> int:
+        """다른 워커(리더)가 임베딩한 공고 id 를 다시 읽음"""
+        collection = await run_in_threadpool(self._get_collection)
+
+        def _ids() -> set[str]:
+            with track_call("chroma", "get"):
+                return set(collection.get(include=[])["ids"])
+
+        self._embedded = await run_in_threadpool(_ids)
+        return len(self._embedded)
+
+    # -----------------------
+    # 검색
+    # -----------------------
+    async def search(
+        self,
+        query: str,
+        job_cat: str,
+        k: int = 10,
+        *,
+        priority: str = INTERACTIVE,
+        session_id: str | None = None,
+    ) -> list[dict]:
+        """[{공고 필드..., "similarity"}] 유사도 내림차순"""
+        if not query or not query.strip() or not self._embedded:
+            return []
+
+        with stage_timer("job_vector_search"):
+            embedding = await ollama_embed(query, priority=priority, session_id=session_id)
+            collection = await run_in_threadpool(self._get_collection)
+
+            def _query():
+                with track_call("chroma", "query"):
+                    return collection.query(
+                        query_embeddings=[embedding],
+                        n_results=k,
+                        where={"job_cat": job_cat},
+                        include=["metadatas", "distances"],
+                    )
+
+            res = await run_in_threadpool(_query)
+
+        postings = {str(p.id): p for p in self._index.postings(job_cat)}
+        hits = []
+        for pid, meta, dist in zip(res["ids"][0], res["metadatas"][0], res["distances"][0]):
+            p = postings.get(pid)
+            item = p.to_dict() if p else {
+                "title": meta.get("title"), "company": meta.get("company"),
+                "url": meta.get("url"), "job_tech": [], "keyword": None,
+            }
+            item["similarity"] = round(1.0 - dist, 4)
+            hits.append(item)
+        return hits
+
+    # -----------------------
+    # 주기적 동기화 (lifespan)
+    # -----------------------
+    def start(self) -> None:
+        # 첫 동기화는 공고 수만큼 임베딩이 필요하므로 기동을 막지 않고 백그라운드로
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _loop(self) -> None:
+        while True:
+            try:
+                async with self._leader.try_hold() as leader:
+                    added = await self.sync() if leader else 0
+                if not leader:
+                    await self.refresh()
+                if added:
+                    print(f"♻️ 공고 벡터 색인 갱신: +{added}건 (총 {self.size()}건)", flush=True)
+            except Exception as e:
+                print(f"⚠️ 공고 벡터 색인 실패: {e}", flush=True)
+            if JOB_VECTOR_SYNC_INTERVAL <= 0:
+                break
+            await asyncio.sleep(JOB_VECTOR_SYNC_INTERVAL)
+
+
+job_vectors = JobVectorIndex(job_index)
@@ -0,0 +1,112 @@
+# api/services/keyword_scoring.py
+"""
+job_trend 기반 로컬 키워드 점수 엔진 (LLM 불필요)
+
+job_cat 을 하나의 문서 집합으로 보고 TF-IDF 로 점수를 매긴다.
+- tf  : 해당 job_cat 공고 중 용어가 등장한 비율 (최근 공고 가중치 반영)
+- idf : 전체 job_trend 공고 기준 BM25 idf → 모든 직무에 흔한 용어(예: 커뮤니케이션)는 낮은 점수
+점수는 job_cat 안에서 최고점을 10 으로 정규화한다.
+"""
+from __future__ import annotations
+
+import math
+
+from api.services.job_trend_agg import job_trend_agg, JobTrendAggregator
+
+IT_CATEGORY = "IT개발·데이터"
+
+# 직무별로 점수를 매길 필드 (기존 프롬프트와 동일한 구분)
+_FIELDS_BY_CAT = {
+    IT_CATEGORY: ("job_tech", "job_core"),
+}
+_DEFAULT_FIELDS = ("job_keyword",)
+
+# 등장 공고 수가 너무 적은 용어는 제외 (오타/일회성 표현)
+MIN_POSTINGS = 2
+
+
+class KeywordScorer:
+    def __init__(self, aggregator: JobTrendAggregator):
+        self._agg = aggregator
+        self._df_generation = -1
+        self._df: dict[str, dict[str, int]] = {}
+        self._total_rows = 0
+        self._cache: dict[tuple, list[dict]] = {}
+
+    def score(self, job_cat: str, top_n: int = 10) -> list[dict]:
+        """[{"keyword", "score"(0~10), "count"}] 점수 내림차순"""
+        self._ensure_df()
+
+        key = (job_cat, top_n, self._df_generation)
+        cached = self._cache.get(key)
+        if cached is not None:
+            return cached
+
+        agg = self._agg.aggregate(job_cat)
+        if agg is None or not agg.rows:
+            return []
+
+        fields = _FIELDS_BY_CAT.get(job_cat, _DEFAULT_FIELDS)
+        total_weight = agg.total_weight or float(agg.rows)
+        n_all = max(self._total_rows, 1)
+
+        scored: dict[str, tuple[float, str, int]] = {}
+        for field in fields:
+            df_all = self._df.get(field, {})
+            for term_key, weight in agg.weights[field].items():
+                count = agg.counts[field][term_key]
+                if count < MIN_POSTINGS:
+                    continue
+                display = agg.display[field][term_key]
+                if display == job_cat:
+                    continue  # 직무명과 동일한 키워드는 제외
+
+                tf = weight / total_weight
+                df = df_all.get(term_key, count)
+                idf = math.log(1 + (n_all - df + 0.5) / (df + 0.5))
+                value = tf * idf
+
+                prev = scored.get(term_key)
+                if prev is None or value > prev[0]:
+                    scored[term_key] = (value, display, count)
+
+        ranked = sorted(scored.values(), key=lambda x: x[0], reverse=True)[:top_n]
+        if not ranked:
+            return []
+
+        best = ranked[0][0] or 1.0
+        result = [
+            {"keyword": display, "score": round(value / best * 10, 1), "count": count}
+            for value, display, count in ranked
+        ]
+
+        if len(self._cache) > 256:
+            self._cache.clear()
+        self._cache[key] = result
+        return result
+
+    def _ensure_df(self) -> None:
+        """전체 job_cat 에 걸친 용어별 등장 공고 수 (집계가 바뀐 경우에만 재계산)"""
+        generation = self._agg.generation
+        if generation == self._df_generation:
+            return
+
+        df: dict[str, dict[str, int]] = {}
+        total = 0
+        for cat in self._agg.categories():
+            agg = self._agg.aggregate(cat)
+            if agg is None:
+                continue
+            total += agg.rows
+            for field, counts in agg.counts.items():
+                bucket = df.setdefault(field, {})
+                for term_key, count in counts.items():
+                    bucket[term_key] = bucket.get(term_key, 0) + count
+
+        self._df = df
+        self._total_rows = total
+        self._df_generation = generation
+        self._cache.clear()
+
+
+keyword_scorer = KeywordScorer(job_trend_agg)
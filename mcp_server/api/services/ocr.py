@@ -0,0 +1,182 @@
+# api/services/ocr.py
+"""
+채용 공고 이미지 OCR (VLM: OLLAMA_CRAWL_MODEL)
+
+- 이미지 원본 bytes 의 sha256 으로 결과 캐시 → 여러 공고에 공통인 회사 배너는 1회만 OCR
+  (같은 이미지를 동시에 요청하면 한 번만 실행하고 나머지는 결과를 기다림)
+- 디코딩 / 축소 / base64 인코딩은 프로세스 풀 (api.services.image_prep)
+- VLM 호출은 전역 세마포어로 제한 (OCR_MAX_CONCURRENCY, 크롤링 모델 전용 예산)
+- 공고 1건당 OCR 시간 상한 (OCR_POSTING_TIMEOUT) → 넘으면 끝난 이미지만 반영
+  (진행 중이던 OCR 은 버리지 않고 끝까지 돌려 캐시에 남김)
+- 이미지 다운로드는 OCR 전용 클라이언트 사용 → 공고 크롤링 클라이언트가 닫힌 뒤에도 남은 OCR 이 계속 진행
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import os
+import time
+
+import httpx
+
+from ollama_client import get_client
+from api.db.distributed import DistributedSemaphore
+from api.llm.models import model_manager
+from api.metrics import track_call, count_error, record_ollama_usage, stage_timer
+from api.services.cache import TTLCache
+from api.services.image_prep import prepare_image
+from api.services.workers import run_in_process
+
+OLLAMA_URL = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
+CRAWL_MODEL = os.getenv("OLLAMA_CRAWL_MODEL", "qwen3-vl:2b")
+
+JD_OCR_ENABLED = os.getenv("JD_OCR_ENABLED", "false").lower() == "true"
+OCR_MAX_CONCURRENCY = int(os.getenv("OCR_MAX_CONCURRENCY", 2))
+OCR_POSTING_TIMEOUT = float(os.getenv("OCR_POSTING_TIMEOUT", 60))
+OCR_MAX_IMAGES = int(os.getenv("OCR_MAX_IMAGES", 10))
+OCR_IMAGE_MAX_SIDE = int(os.getenv("OCR_IMAGE_MAX_SIDE", 1600))
+OCR_IMAGE_MAX_BYTES = int(os.getenv("OCR_IMAGE_MAX_BYTES", 5 * 1024 * 1024))
+
+# sha256 → 추출 텍스트 ("" = 텍스트 없음 / 장식 이미지)
+ocr_cache = TTLCache("ocr", ttl=float(os.getenv("OCR_CACHE_TTL", 7 * 86400)), maxsize=int(os.getenv("OCR_CACHE_SIZE", 2000)))
+# 이미지 URL → sha256 (같은 URL 은 다시 내려받지 않음)
+ocr_url_cache = TTLCache("ocr_url", ttl=float(os.getenv("OCR_CACHE_TTL", 7 * 86400)), maxsize=int(os.getenv("OCR_CACHE_SIZE", 2000)))
+
+# 크롤링 모델(VLM) 동시 호출 수 — 채팅 모델 스케줄러와는 별도 예산 (멀티 워커면 전체 워커 합계)
+_vlm_semaphore = DistributedSemaphore("ocr", OCR_MAX_CONCURRENCY)
+
+_NO_TEXT = "내용이 없습니다"
+
+_IMAGE_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0.0.0 Safari/537.36"
+}
+_image_client: httpx.AsyncClient | None = None
+
+OCR_PROMPT = """
+이 이미지는 어느 특정 회사의 채용 공고의 일부입니다.
+이미지 내의 작성된 모든 내용을 마크다운 형식으로 추출해주세요.
+만약 표가 있다면 반드시 마크다운 표 형식을 유지해주세요.
+만약 이미지 내에 텍스트나 표 등이 없다면 '내용이 없습니다.'로 응답해주세요.
+"""
+
+
+async def _vlm_ocr(img_base64: str) -> str:
+    payload = {
+        "model": CRAWL_MODEL,
+        "messages": [
+            {
+                "role": "user",
+                "content": OCR_PROMPT,
+                "images": [img_base64],  # base64 string (data: 제거된 상태)
+            }
+        ],
+        "stream": False,
+    }
+    model_manager.apply(payload)
+    async with _vlm_semaphore.hold(poll=0.1):
+        with stage_timer("ocr"), track_call("ollama", "ocr"):
+            res = await get_client().post(f"{OLLAMA_URL}/api/chat", json=payload)
+    if res.status_code != 200:
+        count_error("ollama", "ocr")
+        raise RuntimeError(f"OCR 응답 오류 {res.status_code}")
+
+    data = res.json()
+    record_ollama_usage(CRAWL_MODEL, data)
+    model_manager.observe_load(CRAWL_MODEL, data)
+    text = (data.get("message") or {}).get("content", "").strip()
+    return "" if not text or _NO_TEXT in text else text
+
+
+def _get_image_client() -> httpx.AsyncClient:
+    global _image_client
+    if _image_client is None or _image_client.is_closed:
+        _image_client = httpx.AsyncClient(headers=_IMAGE_HEADERS, follow_redirects=True, timeout=5)
+    return _image_client
+
+
+async def close_image_client() -> None:
+    """lifespan 종료 시 호출"""
+    global _image_client
+    if _image_client is not None:
+        await _image_client.aclose()
+        _image_client = None
+
+
+async def _download(img_url: str) -> bytes | None:
+    try:
+        with track_call("saramin", "image"):
+            res = await _get_image_client().get(img_url)
+            res.raise_for_status()
+    except httpx.HTTPError as e:
+        print(f"OCR 이미지 다운로드 실패 ({img_url}): {e}")
+        return None
+    if len(res.content) > OCR_IMAGE_MAX_BYTES:
+        return None
+    return res.content
+
+
+async def ocr_image(img_url: str) -> str:
+    """이미지 1장 → 추출 텍스트 (실패 / 텍스트 없음은 "")"""
+    digest = ocr_url_cache.get(img_url)
+    if digest is None:
+        content = await _download(img_url)
+        if content is None:
+            return ""
+        digest = hashlib.sha256(content).hexdigest()
+        ocr_url_cache.set(img_url, digest)
+    else:
+        content = None
+
+    async def _load() -> str:
+        nonlocal content
+        if content is None:
+            # URL 캐시는 있는데 결과 캐시가 만료된 경우
+            content = await _download(img_url)
+            if content is None:
+                # "" 를 돌려주면 텍스트 없는 이미지로 캐시되므로 예외로 처리 (캐시하지 않음)
+                raise RuntimeError("이미지 다운로드 실패")
+        img_base64 = await run_in_process(prepare_image, content, OCR_IMAGE_MAX_SIDE)
+        if img_base64 is None:
+            return ""
+        return await _vlm_ocr(img_base64)
+
+    try:
+        return await ocr_cache.get_or_load(digest, _load)
+    except Exception as e:
+        print(f"OCR failed ({img_url}): {e}")
+        return ""
+
+
+def _consume(task: asyncio.Task) -> None:
+    if not task.cancelled():
+        task.exception()
+
+
+async def ocr_images(
+    img_urls: list[str],
+    *,
+    timeout: float = OCR_POSTING_TIMEOUT,
+) -> dict[str, str]:
+    """공고 1건의 이미지들 → {URL: 텍스트} (시간 상한 안에 끝난 것만)"""
+    if not img_urls:
+        return {}
+
+    start = time.perf_counter()
+    tasks = {asyncio.create_task(ocr_image(url)): url for url in img_urls}
+    done, pending = await asyncio.wait(tasks, timeout=timeout)
+
+    for task in pending:
+        # 다른 공고와 공유 중인 OCR 일 수 있으므로 취소하지 않고 캐시에 남게 둔다
+        task.add_done_callback(_consume)
+
+    results = {tasks[t]: t.result() for t in done if not t.cancelled() and t.exception() is None}
+    print(
+        f"🖼️ OCR {len(done)}/{len(img_urls)}장 완료 ({time.perf_counter() - start:.1f}s"
+        + (f", 시간 초과 {len(pending)}장" if pending else "")
+        + f", cache hit {ocr_cache.hits}/{ocr_cache.hits + ocr_cache.misses})",
+        flush=True,
+    )
+    return {
+        url: f"\n\n> **[VLM 추출 시작]**\n{text}\n> **[VLM 추출 종료]**\n\n"
+        for url, text in results.items() if text
+    }
@@ -0,0 +1,45 @@
+# api/services/pdf_parse.py
+"""
+PDF 텍스트 추출 (워커 프로세스에서 실행되는 순수 함수)
+
+pdfplumber(pdfminer) 추출은 순수 파이썬 CPU 작업이라 threadpool 에서 돌리면 GIL 때문에
+다른 요청까지 느려진다 → 이력서를 여러 개 한 번에 처리할 때는 run_in_process 로 실행.
+
+이 모듈은 spawn 된 워커에서 import 되므로 앱 모듈(ollama / metrics 등)을 import 하지 않는다.
+pdfplumber 는 함수 안에서 import (워커는 warm_process_pool 에서 미리 import 해 둔다)
+"""
+from __future__ import annotations
+
+import io
+import re
+import time
+
+# 워커에서 미리 import 할 PDF 라이브러리
+PDF_MODULES = ("pdfplumber",)
+
+PDF_MAX_CHARS = 20000
+
+
+def clean_text(text: str) -> str:
+    text = re.sub(r"[ \t]+", " ", text)
+    text = re.sub(r"\n{3,}", "\n\n", text)
+    return text.strip()
+
+
+def pdf_to_text(pdf_bytes: bytes, max_chars: int = PDF_MAX_CHARS) -> tuple[str, int, float]:
+    """PDF bytes → (텍스트, 페이지 수, 소요 시간) / 텍스트가 없으면 빈 문자열"""
+    start = time.perf_counter()
+    import pdfplumber
+
+    out = []
+    with pdfplumber.open(io.BytesIO(pdf_bytes)) as pdf:
+        pages = len(pdf.pages)
+        for page in pdf.pages:
+            t = (page.extract_text() or "").strip()
+            if t:
+                out.append(t)
+
+    text = clean_text("\n\n".join(out))
+    if len(text) > max_chars:
+        text = text[:max_chars] + " ...[truncated]"
+    return text, pages, time.perf_counter() - start
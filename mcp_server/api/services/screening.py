@@ -0,0 +1,351 @@
+# api/services/screening.py
+"""
+이력서 일괄 스크리닝 (채용공고 1개 ↔ 이력서 PDF 여러 개)
+
+/resume/analyze 를 이력서마다 부르면 같은 공고를 매번 크롤링하고 전부 생성까지 돌린다.
+일괄 스크리닝은 비싼 단계를 줄여서 처리:
+1. 공고 크롤링 1번 (PDF 추출과 동시에 진행)
+2. PDF 추출은 프로세스 풀 (같은 파일(sha256)은 1번만)
+3. 공고 + 이력서 임베딩 (SCREEN_EMBED_BATCH 단위로 묶어서) → 코사인 유사도로 순위
+4. LLM 분석은 상위 top_k 만
+
+진행 상황 / 결과를 이벤트(dict)로 하나씩 내보낸다 (라우트가 NDJSON 으로 전달)
+    {"event": "accepted", "total", "unique", "invalid", "top_k"}
+    {"event": "progress", "stage": "extract" | "embed", "done", "total"}
+    {"event": "crawled", "title", "company", "jd_chars"}
+    {"event": "ranked", "ranking": [{"rank", "index", "filename", "score"}]}
+    {"event": "result", "index", "filename", "success", ...}      항목별 분석 결과 / 오류
+    {"event": "error", "stage", "error"}                          더 진행할 수 없는 오류 (크롤링 / 임베딩 실패)
+    {"event": "done", "total", "screened", "analyzed", "failed", "elapsed", "resumes_per_minute", "stages"}
+"""
+from __future__ import annotations
+
+import asyncio
+import math
+import os
+import time
+from typing import Callable
+
+from fastapi import HTTPException
+from starlette.concurrency import run_in_threadpool
+
+from ollama import ollama_chat, ollama_embed_batch
+from api.llm.scheduler import BATCH
+from api.metrics import LLM_ABANDONED, SCREEN_RESUMES, STAGE_LATENCY
+from api.services.deadline import Deadline
+from api.services.get_single_recruit import get_single_recruit
+from api.services.pdf_parse import pdf_to_text
+from api.services.upload import IngestedUpload
+from api.services.workers import CPU_WORKERS, run_in_process
+
+SCREEN_MAX_FILES = int(os.getenv("SCREEN_MAX_FILES", 200))        # 1회 최대 파일 수
+SCREEN_TOP_K = int(os.getenv("SCREEN_TOP_K", 10))                 # 기본 LLM 분석 수
+SCREEN_MAX_TOP_K = int(os.getenv("SCREEN_MAX_TOP_K", 30))
+SCREEN_DEADLINE_SECONDS = float(os.getenv("SCREEN_DEADLINE_SECONDS", 900))
+SCREEN_EMBED_BATCH = int(os.getenv("SCREEN_EMBED_BATCH", 32))      # 임베딩 진행 상황 단위
+SCREEN_EMBED_CHARS = int(os.getenv("SCREEN_EMBED_CHARS", 2000))    # 임베딩에 쓰는 앞부분 길이
+SCREEN_MIN_CHARS = 200                                             # /resume/analyze 와 같은 최소 길이
+
+ROUTE = "resume_screen"
+
+# 업로드 읽기 → 워커 전달 동시 수 (PDF bytes 를 한꺼번에 메모리에 올리지 않도록)
+_EXTRACT_CONCURRENCY = max(2, CPU_WORKERS * 2)
+
+
+def _normalize(vector: list[float]) -> list[float] | None:
+    norm = math.sqrt(sum(v * v for v in vector))
+    if norm == 0:
+        return None
+    return [v / norm for v in vector]
+
+
+def _read_all(ingested: IngestedUpload) -> bytes:
+    return ingested.file.read()
+
+
+class _Resume:
+    """같은 내용(sha256)의 업로드 묶음"""
+
+    __slots__ = ("sha256", "ingested", "indices", "text", "error", "score")
+
+    def __init__(self, sha256: str, ingested: IngestedUpload):
+        self.sha256 = sha256
+        self.ingested = ingested
+        self.indices: list[int] = []
+        self.text = ""
+        self.error: str | None = None
+        self.score: float | None = None
+
+
+class ResumeScreening:
+    """
+    screening = ResumeScreening(url, job_label, build_prompt, top_k=10, batch_id=...)
+    screening.add(index, filename, ingested) / screening.reject(index, filename, error)
+    async for event in screening.events(): ...
+    중간에 멈추면(연결 끊김) cancel() 로 남은 추출 / 생성 중단
+    """
+
+    def __init__(
+        self,
+        url: str,
+        job_label: str,
+        build_prompt: Callable[[str, str, str], str],
+        *,
+        top_k: int = SCREEN_TOP_K,
+        batch_id: str,
+    ):
+        self.url = url
+        self.job_label = job_label
+        self.build_prompt = build_prompt  # (job_label, jd_text, resume_text) → prompt
+        self.top_k = top_k
+        self.batch_id = batch_id
+        self.deadline = Deadline(ROUTE, SCREEN_DEADLINE_SECONDS)
+
+        self._filenames: dict[int, str | None] = {}
+        self._resumes: dict[str, _Resume] = {}
+        self._rejected: list[dict] = []
+        self._tasks: set[asyncio.Task] = set()
+        self._analyzing: set[asyncio.Task] = set()
+        self._stages: dict[str, float] = {}
+
+    # -----------------------
+    # 입력
+    # -----------------------
+    def add(self, index: int, filename: str | None, ingested: IngestedUpload) -> None:
+        self._filenames[index] = filename
+        resume = self._resumes.get(ingested.sha256)
+        if resume is None:
+            resume = self._resumes[ingested.sha256] = _Resume(ingested.sha256, ingested)
+        resume.indices.append(index)
+
+    def reject(self, index: int, filename: str | None, error: str) -> None:
+        self._filenames[index] = filename
+        self._rejected.append(self._item(index, success=False, error=error))
+
+    @property
+    def total(self) -> int:
+        return len(self._filenames)
+
+    def _item(self, index: int, **fields) -> dict:
+        return {"event": "result", "index": index, "filename": self._filenames.get(index), **fields}
+
+    def _failed(self, resume: _Resume, **fields) -> list[dict]:
+        SCREEN_RESUMES.labels("failed").inc(len(resume.indices))
+        return [self._item(i, success=False, error=resume.error, **fields) for i in resume.indices]
+
+    def _spawn(self, coro) -> asyncio.Task:
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    def _stage_done(self, stage: str, started: float) -> None:
+        elapsed = time.perf_counter() - started
+        self._stages[stage] = round(elapsed, 3)
+        STAGE_LATENCY.labels(f"screen_{stage}").observe(elapsed)
+
+    # -----------------------
+    # 단계별 작업
+    # -----------------------
+    async def _crawl(self) -> dict | None:
+        try:
+            return await get_single_recruit(self.url, deadline=self.deadline)
+        except Exception as e:
+            print(f"⚠️ 스크리닝 공고 크롤링 실패: {e}", flush=True)
+            return None
+
+    async def _extract(self, resume: _Resume, limit: asyncio.Semaphore) -> _Resume:
+        try:
+            async with limit:
+                data = await run_in_threadpool(_read_all, resume.ingested)
+                text, _, _ = await run_in_process(pdf_to_text, data)
+        except Exception as e:
+            print(f"⚠️ PDF 추출 실패 ({resume.sha256[:12]}): {e}", flush=True)
+            resume.error = "PDF 텍스트 추출에 실패했습니다."
+            return resume
+
+        if not text:
+            resume.error = "PDF 텍스트 추출에 실패했습니다."
+        elif len(text) < SCREEN_MIN_CHARS:
+            resume.error = f"추출된 텍스트가 너무 짧습니다({SCREEN_MIN_CHARS}자 미만)."
+        else:
+            resume.text = text
+        return resume
+
+    async def _analyze(self, jd_text: str, resume: _Resume) -> tuple[_Resume, str, str, str | None]:
+        """(resume, feedback, model, error)"""
+        prompt = self.build_prompt(self.job_label, jd_text, resume.text)
+        try:
+            result = await ollama_chat(prompt, priority=BATCH, session_id=self.batch_id, deadline=self.deadline)
+        except TimeoutError:
+            return resume, "", "", "LLM 응답이 지연되고 있습니다. 잠시 후 다시 시도해주세요."
+        except HTTPException as e:
+            return resume, "", "", str(e.detail)
+        except Exception as e:
+            print(f"⚠️ 스크리닝 분석 실패: {e}", flush=True)
+            return resume, "", "", "분석 생성에 실패했습니다."
+
+        feedback = (result.get("answer", "") if isinstance(result, dict) else str(result)).strip()
+        model = result.get("model", "") if isinstance(result, dict) else ""
+        if not feedback:
+            return resume, "", model, "빈 분석 결과가 반환되었습니다."
+        return resume, feedback, model, None
+
+    # -----------------------
+    # 전체 흐름
+    # -----------------------
+    async def events(self):
+        start = time.perf_counter()
+        failed = len(self._rejected)
+        SCREEN_RESUMES.labels("failed").inc(failed)
+
+        yield {
+            "event": "accepted",
+            "total": self.total,
+            "unique": len(self._resumes),
+            "invalid": failed,
+            "top_k": self.top_k,
+        }
+        for item in self._rejected:
+            yield item
+        if not self._resumes:
+            yield self._done(start, failed=failed, screened=0, analyzed=0)
+            return
+
+        # 1) 크롤링 + PDF 추출 동시 진행
+        crawl_task = self._spawn(self._crawl())
+        limit = asyncio.Semaphore(_EXTRACT_CONCURRENCY)
+        extract_started = time.perf_counter()
+        pending = {self._spawn(self._extract(r, limit)) for r in self._resumes.values()} | {crawl_task}
+        extracted = 0
+        job = None
+
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            progressed = False
+            for task in done:
+                if task is crawl_task:
+                    self._stage_done("crawl", extract_started)
+                    job = task.result()
+                    if not job or not job.get("content"):
+                        for t in pending:
+                            t.cancel()
+                        for event in self._abort(start, failed, "crawl", "채용공고 크롤링에 실패했습니다."):
+                            yield event
+                        return
+                    yield {
+                        "event": "crawled",
+                        "title": job.get("title"),
+                        "company": job.get("company"),
+                        "jd_chars": len(job["content"]),
+                    }
+                    continue
+
+                resume = task.result()
+                extracted += 1
+                progressed = True
+                if resume.error:
+                    failed += len(resume.indices)
+                    for item in self._failed(resume):
+                        yield item
+            if progressed:
+                yield {"event": "progress", "stage": "extract", "done": extracted, "total": len(self._resumes)}
+        self._stage_done("extract", extract_started)
+
+        jd_text = job["content"].strip()
+        candidates = [r for r in self._resumes.values() if r.text]
+
+        # 2) 임베딩 → 공고와의 코사인 유사도
+        embed_started = time.perf_counter()
+        try:
+            jd_vector = _normalize((await ollama_embed_batch(
+                [jd_text[:SCREEN_EMBED_CHARS]], priority=BATCH, session_id=self.batch_id,
+            ))[0])
+            if jd_vector is None:
+                raise ValueError("빈 공고 임베딩")
+            for i in range(0, len(candidates), SCREEN_EMBED_BATCH):
+                batch = candidates[i:i + SCREEN_EMBED_BATCH]
+                vectors = await ollama_embed_batch(
+                    [r.text[:SCREEN_EMBED_CHARS] for r in batch], priority=BATCH, session_id=self.batch_id,
+                )
+                for resume, vector in zip(batch, vectors):
+                    vector = _normalize(vector)
+                    resume.score = sum(a * b for a, b in zip(jd_vector, vector)) if vector else 0.0
+                yield {"event": "progress", "stage": "embed", "done": i + len(batch), "total": len(candidates)}
+        except Exception as e:
+            detail = e.detail if isinstance(e, HTTPException) else str(e)
+            print(f"⚠️ 스크리닝 임베딩 실패: {detail}", flush=True)
+            for event in self._abort(start, failed, "embed", "이력서 임베딩에 실패했습니다."):
+                yield event
+            return
+        self._stage_done("embed", embed_started)
+
+        candidates.sort(key=lambda r: r.score, reverse=True)
+        ranking = []
+        for rank, resume in enumerate(candidates, start=1):
+            for i in resume.indices:
+                ranking.append({"rank": rank, "index": i, "filename": self._filenames.get(i), "score": round(resume.score, 4)})
+        SCREEN_RESUMES.labels("ranked").inc(len(ranking))
+        yield {"event": "ranked", "ranking": ranking}
+
+        # 3) 상위 top_k 만 LLM 분석 (생성 동시 수는 공유 Ollama 스케줄러가 제한)
+        analyze_started = time.perf_counter()
+        ranks = {r.sha256: n for n, r in enumerate(candidates, start=1)}
+        pending = {self._spawn(self._analyze(jd_text, r)) for r in candidates[:self.top_k]}
+        self._analyzing = set(pending)
+        analyzed = 0
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                resume, feedback, model, error = task.result()
+                fields = {"rank": ranks[resume.sha256], "score": round(resume.score, 4)}
+                if error:
+                    resume.error = error
+                    failed += len(resume.indices)
+                    for item in self._failed(resume, **fields):
+                        yield item
+                    continue
+                analyzed += len(resume.indices)
+                SCREEN_RESUMES.labels("analyzed").inc(len(resume.indices))
+                for i in resume.indices:
+                    yield self._item(i, success=True, **fields, feedback=feedback, model=model)
+        if self._analyzing:
+            self._stage_done("analyze", analyze_started)
+
+        yield self._done(start, failed=failed, screened=len(ranking), analyzed=analyzed)
+
+    def _abort(self, start: float, failed: int, stage: str, error: str) -> list[dict]:
+        """더 진행할 수 없는 오류 → 아직 결과를 못 받은 이력서는 모두 실패로 집계"""
+        SCREEN_RESUMES.labels("failed").inc(self.total - failed)
+        return [
+            {"event": "error", "stage": stage, "error": error},
+            self._done(start, failed=self.total, screened=0, analyzed=0),
+        ]
+
+    def _done(self, start: float, *, failed: int, screened: int, analyzed: int) -> dict:
+        elapsed = time.perf_counter() - start
+        rpm = screened / elapsed * 60 if elapsed > 0 else 0.0
+        print(
+            f"📋 스크리닝 완료: {screened}/{self.total}건 순위, 분석 {analyzed}건, "
+            f"{elapsed:.1f}s ({rpm:.1f} resumes/min)",
+            flush=True,
+        )
+        return {
+            "event": "done",
+            "total": self.total,
+            "screened": screened,
+            "analyzed": analyzed,
+            "failed": failed,
+            "elapsed": round(elapsed, 3),
+            "resumes_per_minute": round(rpm, 1),
+            "stages": self._stages,
+        }
+
+    def cancel(self) -> int:
+        """남은 추출 / 크롤링 / 생성 취소, 중단된 생성 수 반환"""
+        abandoned = sum(1 for t in self._analyzing if not t.done())
+        for task in list(self._tasks):
+            task.cancel()
+        if abandoned:
+            LLM_ABANDONED.labels(ROUTE, "disconnect").inc(abandoned)
+        return abandoned
@@ -0,0 +1,134 @@
+# api/services/semantic_cache.py
+"""
+의미 기반(임베딩) 답변 캐시
+
+- (질문 임베딩, 검색된 문맥 키, 답변) 을 저장
+- 새 질문은 같은 문맥 키를 가진 항목 중 코사인 유사도가 threshold 이상인 것이 있으면 그 답변을 재사용
+  (문맥 키 = 검색된 문서 id 튜플 → 문서가 바뀌어 검색 결과가 달라지면 자연히 miss)
+- TTL + LRU (maxsize 초과 시 가장 오래 안 쓰인 항목부터 제거)
+- 조회 결과는 CACHE_REQUESTS{cache=name} 로 기록 (hit rate = hit / (hit + miss))
+"""
+from __future__ import annotations
+
+import itertools
+import math
+import time
+from collections import OrderedDict
+from typing import Any, Hashable
+
+from api.metrics import CACHE_REQUESTS
+
+
+def _normalize(vector: list[float]) -> list[float] | None:
+    norm = math.sqrt(sum(v * v for v in vector))
+    if norm == 0:
+        return None
+    return [v / norm for v in vector]
+
+
+class _Entry:
+    __slots__ = ("context", "vector", "value", "expires")
+
+    def __init__(self, context: Hashable, vector: list[float], value: Any, expires: float):
+        self.context = context
+        self.vector = vector
+        self.value = value
+        self.expires = expires
+
+
+class SemanticCache:
+    def __init__(self, name: str, ttl: float, maxsize: int = 512, threshold: float = 0.95):
+        self.name = name
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.threshold = threshold
+        self._entries: OrderedDict[int, _Entry] = OrderedDict()
+        self._by_context: dict[Hashable, set[int]] = {}
+        self._ids = itertools.count()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def lookup(self, embedding: list[float], context: Hashable) -> tuple[Any, float] | None:
+        """(답변, 유사도) 또는 None"""
+        vector = _normalize(embedding)
+        best_id, best_sim = self._nearest(vector, context) if vector else (None, -1.0)
+        if best_id is None or best_sim < self.threshold:
+            self._count(False)
+            return None
+
+        self._entries.move_to_end(best_id)
+        self._count(True)
+        return self._entries[best_id].value, best_sim
+
+    def store(self, embedding: list[float], context: Hashable, value: Any) -> None:
+        vector = _normalize(embedding)
+        if vector is None:
+            return
+        expires = time.monotonic() + self.ttl
+
+        # 거의 같은 질문이 이미 있으면 새로 쌓지 않고 갱신
+        best_id, best_sim = self._nearest(vector, context)
+        if best_id is not None and best_sim >= self.threshold:
+            entry = self._entries[best_id]
+            entry.vector, entry.value, entry.expires = vector, value, expires
+            self._entries.move_to_end(best_id)
+            return
+
+        entry_id = next(self._ids)
+        self._entries[entry_id] = _Entry(context, vector, value, expires)
+        self._by_context.setdefault(context, set()).add(entry_id)
+        while len(self._entries) > self.maxsize:
+            old_id, _ = next(iter(self._entries.items()))
+            self._remove(old_id)
+
+    def invalidate(self, context: Hashable | None = None) -> None:
+        """context 가 None 이면 전체 무효화"""
+        if context is None:
+            self._entries.clear()
+            self._by_context.clear()
+            return
+        for entry_id in list(self._by_context.get(context, ())):
+            self._remove(entry_id)
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "contexts": len(self._by_context),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits / total) if total else 0.0,
+        }
+
+    def _nearest(self, vector: list[float], context: Hashable) -> tuple[int | None, float]:
+        now = time.monotonic()
+        best_id, best_sim = None, -1.0
+        for entry_id in list(self._by_context.get(context, ())):
+            entry = self._entries[entry_id]
+            if entry.expires <= now:
+                self._remove(entry_id)
+                continue
+            sim = sum(a * b for a, b in zip(vector, entry.vector))
+            if sim > best_sim:
+                best_id, best_sim = entry_id, sim
+        return best_id, best_sim
+
+    def _remove(self, entry_id: int) -> None:
+        entry = self._entries.pop(entry_id, None)
+        if entry is None:
+            return
+        ids = self._by_context.get(entry.context)
+        if ids is not None:
+            ids.discard(entry_id)
+            if not ids:
+                del self._by_context[entry.context]
+
+    def _count(self, hit: bool) -> None:
+        if hit:
+            self.hits += 1
+        else:
+            self.misses += 1
+        CACHE_REQUESTS.labels(self.name, "hit" if hit else "miss").inc()
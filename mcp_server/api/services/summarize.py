@@ -6,6 +6,26 @@ import re
 from typing import Any, Dict, List, Literal
 
 from ollama import ollama_chat
+from api.llm.scheduler import BATCH, scheduler
+from api.services.deadline import Deadline
+from api.services.extractive import extractive_summary
+from api.services.workers import run_in_process
+from api.metrics import SUMMARIES, stage_timer
+
+# 청크 1개 요약에 최소 이만큼 남아 있어야 요약 (아니면 요약된 부분까지만 사용)
+SUMMARY_MIN_SECONDS = float(os.getenv("SUMMARY_MIN_SECONDS", 15))
+
+# 요약 엔진: auto | llm | extractive (호출마다 engine= 으로 지정 가능)
+# auto: 텍스트가 짧거나 Ollama 대기열이 밀려 있으면 추출 요약(CPU, 수 ms), 아니면 LLM 요약
+SUMMARY_ENGINE = os.getenv("SUMMARY_ENGINE", "auto")
+SUMMARY_EXTRACTIVE_BELOW = int(os.getenv("SUMMARY_EXTRACTIVE_BELOW", 3000))   # 이 글자 수 미만이면 추출 요약
+SUMMARY_QUEUE_SATURATED = int(os.getenv("SUMMARY_QUEUE_SATURATED", 4))        # 앞에 이만큼 대기 중이면 추출 요약
+SUMMARY_EXTRACTIVE_CHARS = int(os.getenv("SUMMARY_EXTRACTIVE_CHARS", 1200))   # 추출 요약 최대 길이
+# 이보다 긴 텍스트의 추출 요약은 워커 프로세스에서 (이벤트 루프를 수십 ms 이상 막지 않도록)
+_EXTRACTIVE_INLINE_CHARS = 6000
+_EXTRACTIVE_MIN_CHARS = 300
+
+Engine = Literal["auto", "llm", "extractive"]
 
 
 def _chunk_text(text: str, max_chars: int = 6000) -> List[str]:
@@ -49,11 +69,77 @@ async def summarize_text(
     language: str = "korean",
     style: Literal["bullet", "structured"] = "structured",
     max_chunk_chars: int = 6000,
+    priority: str = BATCH,
+    session_id: str | None = None,
+    deadline: Deadline | None = None,
+    engine: Engine | None = None,
 ) -> str:
     """
     긴 텍스트도 안정적으로 요약:
     - chunk 요약 -> 최종 통합 요약
+    - deadline 이 모자라면 남은 청크 / 통합 단계를 건너뛰고 요약된 부분까지만 반환
+    - engine: "llm" / "extractive" / "auto" (기본 SUMMARY_ENGINE)
+      extractive 는 LLM 호출 없이 중요 문장만 골라 원문 그대로 반환 (language 무시)
     """
+    engine, reason = _choose_engine(text, engine or SUMMARY_ENGINE, priority)
+    if engine == "extractive":
+        SUMMARIES.labels("extractive", reason).inc()
+        return await summarize_extractive(text, style=style)
+
+    with stage_timer("summarize"):
+        summary = await _summarize_text(
+            text,
+            language=language,
+            style=style,
+            max_chunk_chars=max_chunk_chars,
+            priority=priority,
+            session_id=session_id,
+            deadline=deadline,
+        )
+    if summary is None:
+        # 예산이 모자라 한 청크도 요약하지 못함 → 추출 요약
+        SUMMARIES.labels("extractive", "deadline").inc()
+        return await summarize_extractive(text, style=style)
+    SUMMARIES.labels("llm", reason).inc()
+    return summary
+
+
+def _choose_engine(text: str, engine: str, priority: str) -> tuple[str, str]:
+    """(engine, reason)"""
+    if engine in ("llm", "extractive"):
+        return engine, "requested"
+    if len((text or "").strip()) < SUMMARY_EXTRACTIVE_BELOW:
+        return "extractive", "short"
+    queued = scheduler.queued_ahead(priority)
+    if queued >= SUMMARY_QUEUE_SATURATED:
+        print(f"🧾 LLM 대기열 {queued}건 → 추출 요약 사용", flush=True)
+        return "extractive", "saturated"
+    return "llm", "auto"
+
+
+async def summarize_extractive(text: str, *, style: str = "structured", max_chars: int = SUMMARY_EXTRACTIVE_CHARS) -> str:
+    """CPU 추출 요약 (TextRank) / 원문의 1/3 정도 (최대 max_chars) / 긴 텍스트는 워커 프로세스에서"""
+    text = (text or "").strip()
+    if not text:
+        return ""
+    max_chars = min(max_chars, max(_EXTRACTIVE_MIN_CHARS, len(text) // 3))
+    with stage_timer("summarize_extractive"):
+        if len(text) <= _EXTRACTIVE_INLINE_CHARS:
+            return extractive_summary(text, max_chars=max_chars, style=style)
+        return await run_in_process(extractive_summary, text, max_chars=max_chars, style=style)
+
+
+async def _summarize_text(
+    text: str,
+    *,
+    language: str,
+    style: str,
+    max_chunk_chars: int,
+    priority: str,
+    session_id: str | None,
+    deadline: Deadline | None,
+) -> str | None:
+    """None: 한 청크도 요약하지 못함"""
     text = (text or "").strip()
     if not text:
         return ""
@@ -64,6 +150,9 @@ async def summarize_text(
 
     chunk_summaries: List[str] = []
     for i, ch in enumerate(chunks, start=1):
+        if deadline is not None and deadline.remaining() < SUMMARY_MIN_SECONDS:
+            deadline.degrade("summarize", "truncate_summary")
+            break
         prompt = f"""
 너는 유능한 어시스턴트이다.
 다음 문서 텍스트를 {language}로 요약해 주세요.
@@ -77,7 +166,16 @@ async def summarize_text(
 Text (part {i}/{len(chunks)}):
 {ch}
 """.strip()
-        chunk_summaries.append((await ollama_chat(prompt))["answer"])
+        try:
+            res = await ollama_chat(
+                prompt, priority=priority, session_id=session_id, profile="summary", deadline=deadline
+            )
+        except TimeoutError:
+            break
+        chunk_summaries.append(res["answer"])
+
+    if not chunk_summaries:
+        return None
 
     if len(chunk_summaries) == 1:
         return chunk_summaries[0].strip()
@@ -85,6 +183,9 @@ Text (part {i}/{len(chunks)}):
     combined = "\n\n".join(
         f"[Part {i} Summary]\n{s}" for i, s in enumerate(chunk_summaries, start=1)
     )
+    if deadline is not None and deadline.remaining() < SUMMARY_MIN_SECONDS:
+        deadline.degrade("summarize", "skip_merge")
+        return combined
 
     final_prompt = f"""
 너는 유능한 어시스턴트이다.
@@ -100,5 +201,10 @@ Partial summaries:
 {combined}
 """.strip()
 
-    final_response = await ollama_chat(final_prompt)
+    try:
+        final_response = await ollama_chat(
+            final_prompt, priority=priority, session_id=session_id, profile="summary", deadline=deadline
+        )
+    except TimeoutError:
+        return combined
     return final_response["answer"].strip() if final_response else ""
\ No newline at end of file
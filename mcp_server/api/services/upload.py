@@ -0,0 +1,219 @@
+# api/services/upload.py
+"""
+PDF 업로드 공통 처리
+
+- multipart 본문은 Starlette 가 SpooledTemporaryFile 로 스트리밍 저장 (작으면 메모리, 크면 디스크)
+  → UploadLimitMiddleware 가 본문을 받는 도중 크기를 세서 한도를 넘으면 바로 413
+- ingest_pdf(): 스풀 파일을 청크 단위로 읽으며 sha256 / 크기 계산 (bytes 로 한 번에 읽지 않음)
+- 추출(pdfplumber) 에는 스풀 파일 객체를 그대로 넘긴다 (추가 복사 없음)
+- save_upload(): uploads/ 저장은 threadpool, 오래된 파일은 sweeper 가 주기적으로 삭제
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import os
+import shutil
+import time
+from pathlib import Path
+
+from fastapi import HTTPException, UploadFile
+from fastapi.responses import JSONResponse
+from starlette.concurrency import run_in_threadpool
+
+UPLOAD_MAX_BYTES = int(os.getenv("UPLOAD_MAX_BYTES", 10 * 1024 * 1024))
+# 여러 파일을 한 번에 받는 경로(/resume/screen)의 요청 본문 전체 한도 (파일 1개 한도는 UPLOAD_MAX_BYTES)
+UPLOAD_BULK_MAX_BYTES = int(os.getenv("UPLOAD_BULK_MAX_BYTES", 200 * 1024 * 1024))
+UPLOAD_DIR = Path(os.getenv("UPLOAD_DIR", "uploads"))
+UPLOAD_RETENTION_HOURS = float(os.getenv("UPLOAD_RETENTION_HOURS", 24))
+UPLOAD_SWEEP_INTERVAL = float(os.getenv("UPLOAD_SWEEP_INTERVAL", 600))
+
+_CHUNK = 64 * 1024
+# multipart 경계 / 다른 폼 필드 몫
+_MULTIPART_OVERHEAD = 64 * 1024
+
+_sweep_task: asyncio.Task | None = None
+
+
+def _too_large_detail(max_bytes: int) -> str:
+    if max_bytes >= 1024 * 1024:
+        return f"업로드 파일이 너무 큽니다. (최대 {max_bytes / (1024 * 1024):g}MB)"
+    return f"업로드 파일이 너무 큽니다. (최대 {max_bytes // 1024}KB)"
+
+
+class UploadLimitMiddleware:
+    """
+    multipart 요청 본문 크기 제한 (ASGI)
+    - Content-Length 가 한도를 넘으면 본문을 읽기 전에 413
+    - chunked 등 길이를 모르는 경우 받는 도중 한도를 넘으면 413
+    - path_limits: 경로별 한도 (여러 파일 업로드 경로)
+    """
+
+    def __init__(self, app, max_bytes: int = UPLOAD_MAX_BYTES, path_limits: dict[str, int] | None = None):
+        self.app = app
+        self.max_bytes = max_bytes
+        self.path_limits = path_limits or {}
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        headers = dict(scope.get("headers") or [])
+        if not headers.get(b"content-type", b"").startswith(b"multipart/form-data"):
+            return await self.app(scope, receive, send)
+
+        max_bytes = self.path_limits.get(scope.get("path", ""), self.max_bytes)
+        max_body = max_bytes + _MULTIPART_OVERHEAD
+
+        content_length = headers.get(b"content-length")
+        if content_length is not None and content_length.isdigit() and int(content_length) > max_body:
+            response = JSONResponse({"detail": _too_large_detail(max_bytes)}, status_code=413)
+            return await response(scope, receive, send)
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > max_body:
+                    raise HTTPException(status_code=413, detail=_too_large_detail(max_bytes))
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+
+class IngestedUpload:
+    """검증 + 해시까지 끝난 업로드 (파일 객체는 Starlette 스풀 파일을 그대로 사용)"""
+
+    __slots__ = ("upload", "size", "sha256")
+
+    def __init__(self, upload: UploadFile, size: int, sha256: str):
+        self.upload = upload
+        self.size = size
+        self.sha256 = sha256
+
+    @property
+    def file(self):
+        self.upload.file.seek(0)
+        return self.upload.file
+
+    @property
+    def filename(self) -> str | None:
+        return self.upload.filename
+
+
+def _hash_spooled(fileobj, max_bytes: int) -> tuple[int, str, bytes]:
+    fileobj.seek(0)
+    digest = hashlib.sha256()
+    size = 0
+    head = b""
+    while True:
+        chunk = fileobj.read(_CHUNK)
+        if not chunk:
+            break
+        if not head:
+            head = chunk[:8]
+        size += len(chunk)
+        if size > max_bytes:
+            break
+        digest.update(chunk)
+    fileobj.seek(0)
+    return size, digest.hexdigest(), head
+
+
+async def ingest_pdf(
+    upload: UploadFile,
+    *,
+    max_bytes: int = UPLOAD_MAX_BYTES,
+    empty_detail: str = "업로드된 PDF가 비어 있습니다.",
+) -> IngestedUpload:
+    """PDF 업로드 검증 (타입 / 크기 / 시그니처) + sha256"""
+    if upload.content_type != "application/pdf":
+        raise HTTPException(status_code=400, detail="PDF 파일만 업로드할 수 있습니다.")
+
+    # multipart 파서가 이미 크기를 알고 있으면 파일을 읽기 전에 거절
+    if upload.size is not None and upload.size > max_bytes:
+        raise HTTPException(status_code=413, detail=_too_large_detail(max_bytes))
+
+    size, sha256, head = await run_in_threadpool(_hash_spooled, upload.file, max_bytes)
+    if size == 0:
+        raise HTTPException(status_code=400, detail=empty_detail)
+    if size > max_bytes:
+        raise HTTPException(status_code=413, detail=_too_large_detail(max_bytes))
+    if not head.startswith(b"%PDF-"):
+        raise HTTPException(status_code=400, detail="올바른 PDF 파일이 아닙니다.")
+
+    return IngestedUpload(upload, size, sha256)
+
+
+# -----------------------
+# 디스크 저장 + 보존 기간 정리
+# -----------------------
+def _save_sync(fileobj, path: Path) -> None:
+    if path.exists():
+        os.utime(path)  # 같은 내용(sha256)이면 다시 쓰지 않고 보존 기간만 연장
+        return
+    tmp = path.with_name(path.name + ".part")
+    fileobj.seek(0)
+    with open(tmp, "wb") as f:
+        shutil.copyfileobj(fileobj, f, _CHUNK)
+    os.replace(tmp, path)
+    fileobj.seek(0)
+
+
+async def save_upload(ingested: IngestedUpload) -> Path:
+    """uploads/<sha256 앞 32자><확장자> 로 저장 (threadpool)"""
+    suffix = Path(ingested.filename or "").suffix or ".pdf"
+    path = UPLOAD_DIR / f"{ingested.sha256[:32]}{suffix}"
+    await run_in_threadpool(UPLOAD_DIR.mkdir, parents=True, exist_ok=True)
+    await run_in_threadpool(_save_sync, ingested.upload.file, path)
+    return path
+
+
+def sweep_uploads(retention_seconds: float | None = None) -> int:
+    """보존 기간이 지난 업로드 파일 삭제, 삭제 개수 반환"""
+    if retention_seconds is None:
+        retention_seconds = UPLOAD_RETENTION_HOURS * 3600
+    if not UPLOAD_DIR.is_dir():
+        return 0
+
+    cutoff = time.time() - retention_seconds
+    removed = 0
+    for path in UPLOAD_DIR.iterdir():
+        try:
+            if path.is_file() and path.stat().st_mtime < cutoff:
+                path.unlink()
+                removed += 1
+        except FileNotFoundError:
+            pass
+    return removed
+
+
+async def _sweep_loop() -> None:
+    while True:
+        try:
+            removed = await run_in_threadpool(sweep_uploads)
+            if removed:
+                print(f"🧹 uploads 정리: {removed}개 삭제", flush=True)
+        except Exception as e:
+            print(f"⚠️ uploads 정리 실패: {e}", flush=True)
+        await asyncio.sleep(UPLOAD_SWEEP_INTERVAL)
+
+
+def start_upload_sweeper() -> None:
+    global _sweep_task
+    if _sweep_task is None and UPLOAD_SWEEP_INTERVAL > 0:
+        _sweep_task = asyncio.create_task(_sweep_loop())
+
+
+async def stop_upload_sweeper() -> None:
+    global _sweep_task
+    if _sweep_task is not None:
+        _sweep_task.cancel()
+        try:
+            await _sweep_task
+        except asyncio.CancelledError:
+            pass
+        _sweep_task = None
@@ -0,0 +1,82 @@
+# api/services/workers.py
+"""
+CPU 작업용 공용 프로세스 풀
+
+BeautifulSoup / html2text / PIL 같은 순수 파이썬 CPU 작업은 threadpool 에서 돌려도
+GIL 때문에 이벤트 루프가 같이 멈춘다 → 별도 프로세스에서 실행.
+- CPU_WORKERS=0 이면 프로세스 풀 없이 threadpool 사용 (디버깅 / 메모리 제약 환경)
+- 워커에서 실행할 함수는 모듈 최상위 함수여야 한다 (pickle)
+"""
+from __future__ import annotations
+
+import asyncio
+import importlib
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+
+from starlette.concurrency import run_in_threadpool
+
+CPU_WORKERS = int(os.getenv("CPU_WORKERS", min(4, os.cpu_count() or 1)))
+# 이벤트 루프 / httpx / chroma 스레드가 떠 있는 상태에서 fork 하지 않도록 spawn 사용
+CPU_WORKERS_START_METHOD = os.getenv("CPU_WORKERS_START_METHOD", "spawn")
+
+_pool: ProcessPoolExecutor | None = None
+
+
+def get_process_pool() -> ProcessPoolExecutor | None:
+    global _pool
+    if CPU_WORKERS <= 0:
+        return None
+    if _pool is None:
+        _pool = ProcessPoolExecutor(
+            max_workers=CPU_WORKERS,
+            mp_context=multiprocessing.get_context(CPU_WORKERS_START_METHOD),
+        )
+    return _pool
+
+
+async def run_in_process(func, *args, **kwargs):
+    """func(*args, **kwargs) 를 워커 프로세스에서 실행"""
+    global _pool
+    pool = get_process_pool()
+    call = partial(func, *args, **kwargs)
+    if pool is None:
+        return await run_in_threadpool(call)
+
+    loop = asyncio.get_running_loop()
+    try:
+        return await loop.run_in_executor(pool, call)
+    except BrokenProcessPool:
+        # 워커가 죽었으면 (OOM 등) 풀을 새로 만들고 한 번만 재시도
+        # 동시에 실패한 다른 호출이 이미 새 풀을 만들었으면 그 풀을 사용
+        if _pool is pool:
+            print("⚠️ 프로세스 풀 손상 → 재생성", flush=True)
+            _pool = None
+            # 남은 워커 / 관리 스레드 정리 (기다리지 않음)
+            pool.shutdown(wait=False, cancel_futures=True)
+        return await loop.run_in_executor(get_process_pool(), call)
+
+
+def _warm_worker(modules: tuple[str, ...]) -> None:
+    for name in modules:
+        importlib.import_module(name)
+    # 잠깐 붙잡고 있어야 다른 warm 작업이 새 워커를 띄운다 (풀은 idle 워커가 없을 때만 spawn)
+    time.sleep(0.2)
+
+
+async def warm_process_pool(*modules: str) -> None:
+    """워커 프로세스를 전부 미리 띄우고 모듈을 import 해 둔다 (첫 요청의 spawn 지연 제거)"""
+    if get_process_pool() is None:
+        return
+    await asyncio.gather(*(run_in_process(_warm_worker, modules) for _ in range(CPU_WORKERS)))
+
+
+def shutdown_process_pool() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
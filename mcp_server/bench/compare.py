@@ -0,0 +1,48 @@
+# bench/compare.py
+"""
+두 벤치마크 결과 비교
+
+    python -m bench.compare bench/results/<base>.json bench/results/<head>.json
+"""
+from __future__ import annotations
+
+import json
+import sys
+
+METRICS = ("p50_ms", "p95_ms", "p99_ms", "throughput_rps")
+
+
+def _delta(base: float, head: float) -> str:
+    if not base:
+        return "   n/a"
+    return f"{(head - base) / base * 100:+6.1f}%"
+
+
+def compare(base: dict, head: dict) -> None:
+    print(f"base {base['revision']}  →  head {head['revision']}")
+    if base.get("config") != head.get("config"):
+        print("⚠️ 설정이 다릅니다. 같은 옵션으로 실행한 결과끼리 비교하세요.")
+
+    for name in head["results"]:
+        if name not in base["results"]:
+            continue
+        b, h = base["results"][name], head["results"][name]
+        print(f"\n[{name}]  errors {b['errors']} → {h['errors']}")
+        for m in METRICS:
+            print(f"  {m:<15}{b[m]:>10.1f} → {h[m]:>10.1f}  {_delta(b[m], h[m])}")
+
+
+def main(argv=None):
+    argv = argv if argv is not None else sys.argv[1:]
+    if len(argv) != 2:
+        print("usage: python -m bench.compare <base.json> <head.json>")
+        sys.exit(2)
+    with open(argv[0], encoding="utf-8") as f:
+        base = json.load(f)
+    with open(argv[1], encoding="utf-8") as f:
+        head = json.load(f)
+    compare(base, head)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,508 @@
+# bench/fakes.py
+"""
+벤치마크용 로컬 대역(stand-in) 서비스
+
+- Ollama: /api/generate, /api/embeddings, /api/embed, /api/tags, /api/ps (토큰당 지연 설정 가능)
+- Chroma: in-process EphemeralClient / 임시 디렉터리 PersistentClient
+- Redis: fakeredis
+- MySQL: SQLite 기반 job_trend
+- Saramin: 저장된 HTML fixture 를 돌려주는 httpx transport
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import math
+import random
+import re
+import sqlite3
+import time
+import types
+from pathlib import Path
+
+import httpx
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+FIXTURES = Path(__file__).parent / "fixtures"
+SARAMIN_FIXTURES = FIXTURES / "saramin"
+
+EMBED_DIM = 64
+
+
+class OllamaStubConfig:
+    def __init__(
+        self,
+        *,
+        token_latency: float = 0.01,        # 출력 토큰 1개당 (초)
+        prompt_token_latency: float = 0.0002,  # 입력 토큰 1개당 (초)
+        embed_latency: float = 0.01,        # 임베딩 1건당 (초)
+        output_tokens: int = 120,           # num_predict 가 없을 때 생성 토큰 수
+        parallel: int = 2,                  # OLLAMA_NUM_PARALLEL 대응
+        load_latency: float = 0.0,          # 모델별 첫 호출 로드 시간 (초)
+    ):
+        self.token_latency = token_latency
+        self.prompt_token_latency = prompt_token_latency
+        self.embed_latency = embed_latency
+        self.output_tokens = output_tokens
+        self.parallel = parallel
+        self.load_latency = load_latency
+
+
+# -----------------------
+# Ollama stub
+# -----------------------
+def _estimate_tokens(text: str) -> int:
+    # 한국어는 대략 1.5자, 영어는 4자 = 1토큰 정도로 거칠게 추정
+    hangul = len(re.findall(r"[가-힣]", text or ""))
+    return max(1, int(hangul / 1.5 + (len(text or "") - hangul) / 4))
+
+
+def _fake_vector(text: str) -> list[float]:
+    digest = hashlib.sha256((text or "").encode("utf-8")).digest()
+    rnd = random.Random(digest)
+    vec = [rnd.uniform(-1, 1) for _ in range(EMBED_DIM)]
+    norm = math.sqrt(sum(v * v for v in vec)) or 1.0
+    return [v / norm for v in vec]
+
+
+def _fake_answer(prompt: str) -> str:
+    if '"keywords"' in prompt:
+        return json.dumps({"keywords": [
+            {"keyword": "Java", "score": 9},
+            {"keyword": "Spring", "score": 8},
+            {"keyword": "MySQL", "score": 7},
+            {"keyword": "Docker", "score": 6},
+            {"keyword": "AWS", "score": 5},
+            {"keyword": "Redis", "score": 4},
+        ]}, ensure_ascii=False)
+    if "matched_jobs" in prompt:
+        return json.dumps({"matched_jobs": []}, ensure_ascii=False)
+    if "요약해 주세요" in prompt or "최종 요약으로 통합" in prompt:
+        # 요약: 입력 텍스트 앞부분 1/3 정도 (최대 1000자)
+        body = prompt.split("):\n", 1)[-1].split("summaries:\n", 1)[-1]
+        return body[:min(1000, max(200, len(body) // 3))]
+    if "면접 예상 질문" in prompt:
+        return "\n".join(f"{i}. 프로젝트에서 맡았던 역할 {i}번을 설명해 주실 수 있나요?" for i in range(1, 16))
+    return "좋습니다.\n그 경험에서 가장 어려웠던 점은 무엇이었나요?"
+
+
+def create_ollama_app(config: OllamaStubConfig) -> FastAPI:
+    app = FastAPI(title="Ollama stub")
+    gate = asyncio.Semaphore(config.parallel)
+    loaded: set[str] = set()
+    stats = {"generate": 0, "embeddings": 0, "embed_inputs": 0, "max_in_flight": 0, "aborted": 0}
+    app.state.stats = stats
+    in_flight = 0
+
+    def _enter() -> None:
+        # 서버 전체(멀티 워커면 모든 워커 합계)의 동시 요청 수 확인용
+        nonlocal in_flight
+        in_flight += 1
+        stats["max_in_flight"] = max(stats["max_in_flight"], in_flight)
+
+    def _exit() -> None:
+        nonlocal in_flight
+        in_flight -= 1
+
+    async def _load(model: str) -> int:
+        if model in loaded or config.load_latency <= 0:
+            loaded.add(model)
+            return 0
+        loaded.add(model)
+        await asyncio.sleep(config.load_latency)
+        return int(config.load_latency * 1e9)
+
+    @app.post("/api/generate")
+    async def generate(request: Request):
+        body = await request.json()
+        model = body.get("model", "stub")
+        prompt = body.get("prompt", "")
+        options = body.get("options") or {}
+        num_predict = options.get("num_predict") or config.output_tokens
+        if num_predict < 0:
+            num_predict = config.output_tokens
+        eval_count = min(num_predict, config.output_tokens)
+        prompt_count = _estimate_tokens(prompt)
+        answer = _fake_answer(prompt)
+        stats["generate"] += 1
+
+        if not body.get("stream", True):
+            _enter()
+            try:
+                async with gate:
+                    started = time.perf_counter()
+                    load_ns = await _load(model)
+                    prompt_s = prompt_count * config.prompt_token_latency
+                    eval_s = eval_count * config.token_latency
+                    await asyncio.sleep(prompt_s + eval_s)
+                    total_ns = int((time.perf_counter() - started) * 1e9)
+            finally:
+                _exit()
+            return JSONResponse({
+                "model": model,
+                "response": answer,
+                "done": True,
+                "done_reason": "stop",
+                "total_duration": total_ns,
+                "load_duration": load_ns,
+                "prompt_eval_count": prompt_count,
+                "prompt_eval_duration": int(prompt_s * 1e9),
+                "eval_count": eval_count,
+                "eval_duration": int(eval_s * 1e9),
+            })
+
+        async def _stream():
+            try:
+                async with gate:
+                    async for line in _stream_body():
+                        yield line
+            finally:
+                _exit()
+
+        async def _stream_body():
+            started = time.perf_counter()
+            load_ns = await _load(model)
+            await asyncio.sleep(prompt_count * config.prompt_token_latency)
+            # 답변 전체를 eval_count 개 청크로 나눠 토큰 속도에 맞춰 전송
+            n = max(1, min(eval_count, len(answer)))
+            size = -(-len(answer) // n) or 1
+            pieces = [answer[i:i + size] for i in range(0, len(answer), size)] or [""]
+            per_piece = eval_count / len(pieces)
+            sent = 0
+            try:
+                for piece in pieces:
+                    await asyncio.sleep(per_piece * config.token_latency)
+                    sent += per_piece
+                    yield json.dumps({"model": model, "response": piece, "done": False}, ensure_ascii=False) + "\n"
+            except (asyncio.CancelledError, GeneratorExit):
+                # 클라이언트가 스트림을 닫음 → 생성 중단
+                stats["aborted"] += 1
+                raise
+            sent = round(sent)
+            total_ns = int((time.perf_counter() - started) * 1e9)
+            yield json.dumps({
+                "model": model,
+                "response": "",
+                "done": True,
+                "done_reason": "stop",
+                "total_duration": total_ns,
+                "load_duration": load_ns,
+                "prompt_eval_count": prompt_count,
+                "prompt_eval_duration": int(prompt_count * config.prompt_token_latency * 1e9),
+                "eval_count": min(sent, eval_count),
+                "eval_duration": int(min(sent, eval_count) * config.token_latency * 1e9),
+            }) + "\n"
+
+        _enter()
+        return StreamingResponse(_stream(), media_type="application/x-ndjson")
+
+    @app.post("/api/embeddings")
+    async def embeddings(request: Request):
+        body = await request.json()
+        stats["embeddings"] += 1
+        _enter()
+        try:
+            async with gate:
+                await _load(body.get("model", "stub"))
+                await asyncio.sleep(config.embed_latency)
+        finally:
+            _exit()
+        return {"embedding": _fake_vector(body.get("prompt", ""))}
+
+    @app.post("/api/embed")
+    async def embed(request: Request):
+        body = await request.json()
+        inputs = body.get("input") or []
+        if isinstance(inputs, str):
+            inputs = [inputs]
+        stats["embeddings"] += 1
+        stats["embed_inputs"] += len(inputs)
+        _enter()
+        try:
+            async with gate:
+                await _load(body.get("model", "stub"))
+                # 배치는 고정 비용 + 입력당 소량의 추가 비용
+                await asyncio.sleep(config.embed_latency * (1 + 0.1 * max(0, len(inputs) - 1)))
+        finally:
+            _exit()
+        return {"model": body.get("model"), "embeddings": [_fake_vector(t) for t in inputs]}
+
+    @app.get("/api/tags")
+    async def tags():
+        return {"models": [{"name": m} for m in sorted(loaded)]}
+
+    @app.get("/api/ps")
+    async def ps():
+        return {"models": [{"name": m, "model": m} for m in sorted(loaded)]}
+
+    @app.get("/bench/stats")
+    async def bench_stats():
+        # 별도 프로세스로 띄운 stub 의 호출 통계 (bench.workers)
+        return stats
+
+    return app
+
+
+# -----------------------
+# Saramin fixtures
+# -----------------------
+def saramin_transport(latency: float = 0.05) -> httpx.MockTransport:
+    pages = {
+        "view": (SARAMIN_FIXTURES / "view.html").read_text(encoding="utf-8"),
+        "detail": (SARAMIN_FIXTURES / "detail.html").read_text(encoding="utf-8"),
+        "list": (SARAMIN_FIXTURES / "list.html").read_text(encoding="utf-8"),
+    }
+    stats = {"requests": 0}
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        stats["requests"] += 1
+        await asyncio.sleep(latency)
+        path = request.url.path
+        if path.endswith("/relay/view-detail"):
+            body = pages["detail"]
+        elif path.endswith("/relay/view"):
+            body = pages["view"]
+        elif path.endswith("/jobs/list/job-category"):
+            body = pages["list"]
+        else:
+            # 이미지 등은 빈 응답
+            return httpx.Response(404, request=request)
+        return httpx.Response(200, content=body.encode("utf-8"), request=request,
+                              headers={"content-type": "text/html; charset=utf-8"})
+
+    transport = httpx.MockTransport(handler)
+    transport.stats = stats
+    return transport
+
+
+def record_saramin_fixture(url: str, name: str) -> Path:
+    """실제 사람인 페이지를 fixture 로 저장 (네트워크 필요)"""
+    from api.services.get_recruit_util_py import HEADERS
+
+    res = httpx.get(url, headers=HEADERS, follow_redirects=True, timeout=10)
+    res.raise_for_status()
+    path = SARAMIN_FIXTURES / f"{name}.html"
+    path.write_text(res.text, encoding="utf-8")
+    return path
+
+
+# -----------------------
+# MySQL (SQLite job_trend)
+# -----------------------
+_TECHS = {
+    "IT개발·데이터": ["Java", "Spring", "Python", "Django", "FastAPI", "React", "TypeScript", "Node.js",
+                  "MySQL", "Redis", "Docker", "Kubernetes", "AWS", "Kafka", "Git", "Linux"],
+    "마케팅·홍보·조사": ["GA4", "SQL", "Excel", "Figma", "Notion", "Tableau"],
+    "디자인": ["Figma", "Photoshop", "Illustrator", "After Effects", "Sketch"],
+}
+_KEYWORDS = ["커뮤니케이션", "문제해결", "협업", "데이터 분석", "책임감", "자기주도", "대용량 트래픽",
+             "클라우드", "CI/CD", "테스트 코드", "브랜딩", "캠페인", "UX", "고객 경험"]
+_CORES = ["API 설계", "성능 최적화", "장애 대응", "데이터 모델링", "코드 리뷰", "서비스 기획"]
+
+
+def create_job_trend_db(rows_per_cat: int = 300, seed: int = 42) -> sqlite3.Connection:
+    conn = sqlite3.connect(":memory:", check_same_thread=False)
+    conn.execute("""
+        CREATE TABLE job_trend (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            rec_idx TEXT,
+            job_cat TEXT,
+            job_title TEXT,
+            job_company TEXT,
+            job_url TEXT,
+            job_tech TEXT,
+            job_core TEXT,
+            job_keyword TEXT,
+            created_at TEXT DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    conn.execute("CREATE INDEX idx_job_trend_cat ON job_trend(job_cat)")
+
+    rnd = random.Random(seed)
+    rec = 52000000
+    for cat, techs in _TECHS.items():
+        for i in range(rows_per_cat):
+            rec += 1
+            conn.execute(
+                "INSERT INTO job_trend (rec_idx, job_cat, job_title, job_company, job_url, job_tech, job_core, job_keyword)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    str(rec),
+                    cat,
+                    f"{cat} 담당자 채용 {i}",
+                    f"회사{i % 97}",
+                    f"https://www.saramin.co.kr/zf_user/jobs/relay/view?rec_idx={rec}",
+                    json.dumps(rnd.sample(techs, k=min(4, len(techs))), ensure_ascii=False),
+                    ", ".join(rnd.sample(_CORES, k=2)),
+                    ", ".join(rnd.sample(_KEYWORDS, k=3)),
+                ),
+            )
+    conn.commit()
+    return conn
+
+
+class _FakeCursor:
+    def __init__(self, conn: sqlite3.Connection, latency: float):
+        self._conn = conn
+        self._latency = latency
+        self._rows: list = []
+        self.rowcount = 0
+        self.lastrowid = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    @staticmethod
+    def _sql(query: str) -> str:
+        return query.replace("%s", "?").replace("INSERT IGNORE", "INSERT OR IGNORE")
+
+    async def execute(self, query, args=None):
+        await asyncio.sleep(self._latency)
+        cur = self._conn.execute(self._sql(query), tuple(args or ()))
+        self._rows = cur.fetchall()
+        self.rowcount = cur.rowcount
+        self.lastrowid = cur.lastrowid
+        return self.rowcount
+
+    async def executemany(self, query, seq):
+        await asyncio.sleep(self._latency)
+        cur = self._conn.executemany(self._sql(query), [tuple(a) for a in seq])
+        self.rowcount = cur.rowcount
+        return self.rowcount
+
+    async def fetchall(self):
+        return tuple(self._rows)
+
+    async def fetchone(self):
+        return self._rows[0] if self._rows else None
+
+
+class _FakeConn:
+    def __init__(self, conn: sqlite3.Connection, latency: float):
+        self._conn = conn
+        self._latency = latency
+
+    def cursor(self, *args):
+        return _FakeCursor(self._conn, self._latency)
+
+    async def ping(self, reconnect: bool = False):
+        return None
+
+    async def commit(self):
+        self._conn.commit()
+
+
+class _Acquire:
+    def __init__(self, conn: _FakeConn):
+        self._conn = conn
+
+    async def __aenter__(self):
+        return self._conn
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class FakeMySQLPool:
+    """aiomysql Pool 과 같은 모양 (acquire / close / wait_closed)"""
+
+    def __init__(self, conn: sqlite3.Connection, latency: float = 0.002):
+        self._conn = _FakeConn(conn, latency)
+        self.size = 1
+        self.freesize = 1
+        self.minsize = 1
+        self.maxsize = 1
+
+    def acquire(self):
+        return _Acquire(self._conn)
+
+    def close(self):
+        pass
+
+    async def wait_closed(self):
+        pass
+
+
+# -----------------------
+# 앱 부팅
+# -----------------------
+def install_fakes(
+    *,
+    ollama: OllamaStubConfig | None,
+    saramin_latency: float = 0.05,
+    trend_rows_per_cat: int = 300,
+    chroma_dir: str | None,
+    redis: bool = True,
+):
+    """
+    main.app 을 import 하기 전에 호출.
+    외부 의존성을 전부 로컬 대역으로 바꾸고 (app, ollama_stub_app, upstream 통계) 를 돌려준다.
+    Ollama client 도 lifespan 전에 stub 으로 바꿔 두므로 모델 warm-up 까지 stub 에서 처리된다.
+
+    멀티 워커 부하 테스트(bench.workers)는 워커끼리 공유해야 하는 것을 별도 프로세스로 띄우고
+    ollama=None (OLLAMA_BASE_URL), chroma_dir=None (Chroma 서버), redis=False (REDIS_URL) 로 호출한다.
+    """
+    import os
+
+    os.environ.setdefault("OLLAMA_BASE_URL", "http://ollama.bench")
+    os.environ["INGEST_ON_STARTUP"] = "false"
+
+    if chroma_dir is not None:
+        os.environ["CHROMA_DB_PATH"] = chroma_dir
+
+        # Chroma: HttpClient -> in-process (chromadb import 는 lifespan 의 연결 시점까지 미룸)
+        import chroma_db
+
+        def _ephemeral_client():
+            import chromadb
+            return chromadb.EphemeralClient()
+
+        chroma_db._new_client = _ephemeral_client
+
+    if redis:
+        # Redis: fakeredis
+        import fakeredis
+        import api.db.redis as redis_mod
+        redis_mod._redis_client = fakeredis.aioredis.FakeRedis(decode_responses=True)
+
+    # MySQL: SQLite job_trend
+    import api.db.mysql as mysql_mod
+    fake_pool = FakeMySQLPool(create_job_trend_db(trend_rows_per_cat))
+
+    mysql_mod._pool = fake_pool
+
+    # Saramin: fixture transport
+    transport = saramin_transport(saramin_latency)
+    import api.services.get_single_recruit as gsr
+
+    class _SaraminClient(httpx.AsyncClient):
+        def __init__(self, *args, **kwargs):
+            kwargs["transport"] = transport
+            super().__init__(*args, **kwargs)
+
+    gsr.httpx = types.SimpleNamespace(AsyncClient=_SaraminClient)
+
+    # Ollama: lifespan 의 create_client() 가 stub 에 붙은 client 를 만들도록 교체
+    stub_app = None
+    if ollama is not None:
+        import ollama_client
+        stub_app = create_ollama_app(ollama)
+
+        async def _create_stub_client():
+            ollama_client.ollama_http_client = httpx.AsyncClient(
+                transport=httpx.ASGITransport(app=stub_app), timeout=300.0
+            )
+
+        ollama_client.create_client = _create_stub_client
+
+    from main import app
+
+    upstream = {"saramin": transport.stats}
+    if stub_app is not None:
+        upstream["ollama"] = stub_app.state.stats
+    return app, stub_app, upstream
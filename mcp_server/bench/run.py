@@ -0,0 +1,237 @@
+# bench/run.py
+"""
+오프라인 벤치마크
+
+GPU / 사람인 / 외부 DB 없이 FastAPI 앱을 로컬 대역 서비스에 붙여서
+주요 엔드포인트의 p50/p95/p99 지연과 처리량을 측정한다.
+
+    cd mcp_server
+    pip install -r bench/requirements.txt
+    python -m bench.run --requests 40 --concurrency 8
+    python -m bench.compare bench/results/<old>.json bench/results/<new>.json
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import math
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+
+from bench.fakes import OllamaStubConfig, install_fakes
+from bench.pdf import make_resume_pdf
+
+RESULTS_DIR = Path(__file__).parent / "results"
+JOB_URL = "https://www.saramin.co.kr/zf_user/jobs/relay/view?view_type=list&rec_idx=52800514"
+
+SCENARIOS = ("chat_start", "chat_message", "interview_questions", "trend_jobfit", "custom_match")
+
+
+def percentile(values: list[float], p: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    # nearest-rank
+    k = max(0, min(len(ordered) - 1, math.ceil(p / 100 * len(ordered)) - 1))
+    return ordered[k]
+
+
+def summarize(latencies: list[float], errors: int, wall: float) -> dict:
+    n = len(latencies)
+    return {
+        "requests": n,
+        "errors": errors,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "mean_ms": (sum(latencies) / n * 1000) if n else 0.0,
+        "throughput_rps": (n / wall) if wall > 0 else 0.0,
+    }
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], text=True, stderr=subprocess.DEVNULL
+        ).strip()
+    except Exception:
+        return "unknown"
+
+
+async def _drive(n: int, concurrency: int, make_call) -> dict:
+    """make_call(i) -> coroutine returning httpx.Response"""
+    latencies: list[float] = []
+    errors = 0
+    gate = asyncio.Semaphore(concurrency)
+
+    async def one(i: int):
+        nonlocal errors
+        async with gate:
+            start = time.perf_counter()
+            try:
+                res = await make_call(i)
+                if res.status_code >= 400:
+                    errors += 1
+            except Exception as e:
+                errors += 1
+                print(f"  request {i} failed: {e}", file=sys.stderr)
+            latencies.append(time.perf_counter() - start)
+
+    wall_start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(n)))
+    return summarize(latencies, errors, time.perf_counter() - wall_start)
+
+
+async def run_benchmark(args) -> dict:
+    chroma_dir = tempfile.mkdtemp(prefix="bench_chroma_")
+    config = OllamaStubConfig(
+        token_latency=args.token_latency,
+        prompt_token_latency=args.prompt_token_latency,
+        embed_latency=args.embed_latency,
+        output_tokens=args.output_tokens,
+        parallel=args.ollama_parallel,
+    )
+    app, _, upstream = install_fakes(
+        ollama=config,
+        saramin_latency=args.saramin_latency,
+        trend_rows_per_cat=args.trend_rows,
+        chroma_dir=chroma_dir,
+    )
+    pdf_bytes = make_resume_pdf()
+    results: dict = {}
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=600) as client:
+
+            async def chat_start(i: int, sid: str | None = None):
+                data = {"url": JOB_URL}
+                if sid:
+                    data["session_id"] = sid
+                return await client.post(
+                    "/chat/start",
+                    data=data,
+                    files={"file": ("resume.pdf", pdf_bytes, "application/pdf")},
+                )
+
+            async def interview_questions(i: int):
+                return await client.post(
+                    "/interview/questions",
+                    data={"jc_code": "2", "job_name": "백엔드 개발자", "url": JOB_URL, "n_questions": "5"},
+                    files={"file": ("resume.pdf", pdf_bytes, "application/pdf")},
+                )
+
+            async def trend_jobfit(i: int):
+                return await client.post("/trend/jobfit", json={"job_cat": "IT개발·데이터"})
+
+            async def custom_match(i: int):
+                return await client.post(
+                    "/custom/match",
+                    data={"job_cat": "IT개발·데이터", "tech_text": "Java, Spring", "role_text": "백엔드"},
+                    files={"file": ("resume.pdf", pdf_bytes, "application/pdf")},
+                )
+
+            selected = [s for s in SCENARIOS if s in args.scenarios]
+
+            if "chat_start" in selected:
+                print("▶ chat_start", flush=True)
+                results["chat_start"] = await _drive(args.requests, args.concurrency, chat_start)
+
+            if "chat_message" in selected:
+                print("▶ chat_message (세션 준비)", flush=True)
+                sessions = [f"bench-{i}" for i in range(args.concurrency)]
+                await asyncio.gather(*(chat_start(0, sid) for sid in sessions))
+                await asyncio.gather(*(
+                    client.post("/chat/message", json={"sessionId": sid, "message": "시작하기"})
+                    for sid in sessions
+                ))
+                answer = "저는 이전 프로젝트에서 Redis 캐시를 도입해 API 응답 시간을 절반으로 줄였습니다."
+
+                async def chat_message(i: int):
+                    sid = sessions[i % len(sessions)]
+                    return await client.post("/chat/message", json={"sessionId": sid, "message": answer})
+
+                print("▶ chat_message", flush=True)
+                results["chat_message"] = await _drive(args.requests, args.concurrency, chat_message)
+
+            if "interview_questions" in selected:
+                print("▶ interview_questions", flush=True)
+                results["interview_questions"] = await _drive(args.requests, args.concurrency, interview_questions)
+
+            if "trend_jobfit" in selected:
+                print("▶ trend_jobfit", flush=True)
+                results["trend_jobfit"] = await _drive(args.requests, args.concurrency, trend_jobfit)
+
+            if "custom_match" in selected:
+                from api.services.job_vectors import job_vectors
+
+                print("▶ custom_match (공고 벡터 색인)", flush=True)
+                await job_vectors.sync()
+                print("▶ custom_match", flush=True)
+                results["custom_match"] = await _drive(args.requests, args.concurrency, custom_match)
+
+    return {
+        "revision": git_revision(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "config": {
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "token_latency": args.token_latency,
+            "prompt_token_latency": args.prompt_token_latency,
+            "embed_latency": args.embed_latency,
+            "output_tokens": args.output_tokens,
+            "ollama_parallel": args.ollama_parallel,
+            "saramin_latency": args.saramin_latency,
+            "trend_rows": args.trend_rows,
+        },
+        "upstream": upstream,
+        "results": results,
+    }
+
+
+def print_report(report: dict) -> None:
+    print(f"\n== bench @ {report['revision']} ({report['timestamp']}) ==")
+    print(f"{'scenario':<22}{'n':>5}{'err':>5}{'p50ms':>10}{'p95ms':>10}{'p99ms':>10}{'rps':>9}")
+    for name, r in report["results"].items():
+        print(
+            f"{name:<22}{r['requests']:>5}{r['errors']:>5}"
+            f"{r['p50_ms']:>10.1f}{r['p95_ms']:>10.1f}{r['p99_ms']:>10.1f}{r['throughput_rps']:>9.2f}"
+        )
+    print(f"upstream calls: {json.dumps(report['upstream'], ensure_ascii=False)}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="MCP server 오프라인 벤치마크")
+    parser.add_argument("--scenarios", nargs="+", default=list(SCENARIOS), choices=SCENARIOS)
+    parser.add_argument("--requests", type=int, default=40)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--token-latency", type=float, default=0.005)
+    parser.add_argument("--prompt-token-latency", type=float, default=0.0002)
+    parser.add_argument("--embed-latency", type=float, default=0.005)
+    parser.add_argument("--output-tokens", type=int, default=120)
+    parser.add_argument("--ollama-parallel", type=int, default=2)
+    parser.add_argument("--saramin-latency", type=float, default=0.05)
+    parser.add_argument("--trend-rows", type=int, default=300)
+    parser.add_argument("--out", default=None, help="결과 JSON 경로 (기본: bench/results/<rev>.json)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    report = asyncio.run(run_benchmark(args))
+    print_report(report)
+
+    out = Path(args.out) if args.out else RESULTS_DIR / f"{report['revision']}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+    print(f"saved: {out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,233 @@
+# bench/startup.py
+"""
+시작 시간(time-to-ready) 벤치마크
+
+    cd mcp_server
+    python -m bench.startup --repeat 5
+    python -m bench.startup --baseline bench/results/startup-<old>.json   # 기준보다 느려지면 exit 1
+
+측정은 매번 새 프로세스에서 (import 캐시 / 모듈 상태 공유 없음)
+- import: 대역 없이 `import main` (Chroma 주소는 닿지 않는 곳)
+  → import 시간, 패키지별 import 비용, 무거운 라이브러리가 import 시점에 로드됐는지
+- ready: 대역 설치 → `import main` → lifespan startup → 첫 GET /metrics 응답
+  → 프로세스 시작부터 각 단계까지 걸린 시간
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from bench.run import RESULTS_DIR, git_revision
+
+# import main 시점에 로드되면 안 되는 모듈 (첫 사용 / lifespan / 워커에서 로드)
+HEAVY_MODULES = ("chromadb", "pdfplumber", "PIL", "bs4", "html2text", "lxml")
+
+_RESULT_PREFIX = "STARTUP_RESULT "
+_MAIN_DIR = Path(__file__).resolve().parent.parent
+
+
+def _since_spawn() -> float:
+    return (time.time() - float(os.environ["STARTUP_T0"])) * 1000
+
+
+def _emit(result: dict) -> None:
+    print(_RESULT_PREFIX + json.dumps(result), flush=True)
+
+
+# -----------------------
+# 자식 프로세스
+# -----------------------
+def _child_import() -> None:
+    start = time.perf_counter()
+    import main  # noqa: F401
+    import_ms = (time.perf_counter() - start) * 1000
+    _emit({
+        "import_ms": import_ms,
+        "since_spawn_ms": _since_spawn(),
+        "heavy_loaded": [m for m in HEAVY_MODULES if m in sys.modules],
+    })
+
+
+async def _child_ready() -> None:
+    import httpx
+    from bench.fakes import OllamaStubConfig, install_fakes
+
+    start = time.perf_counter()
+    app, _, _ = install_fakes(
+        ollama=OllamaStubConfig(load_latency=0.0),
+        chroma_dir=tempfile.mkdtemp(prefix="bench_chroma_"),
+    )
+    import_ms = (time.perf_counter() - start) * 1000
+
+    lifespan = app.router.lifespan_context(app)
+    start = time.perf_counter()
+    await lifespan.__aenter__()
+    startup_ms = (time.perf_counter() - start) * 1000
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        res = await client.get("/metrics")
+        res.raise_for_status()
+    ready_ms = _since_spawn()
+
+    start = time.perf_counter()
+    await lifespan.__aexit__(None, None, None)
+    shutdown_ms = (time.perf_counter() - start) * 1000
+
+    _emit({
+        "import_ms": import_ms,
+        "startup_ms": startup_ms,
+        "ready_ms": ready_ms,
+        "shutdown_ms": shutdown_ms,
+    })
+
+
+# -----------------------
+# 부모 프로세스
+# -----------------------
+def _import_costs(stderr: str, top: int = 10) -> dict[str, float]:
+    """-X importtime 출력 → 최상위 패키지별 self 시간 합 (ms)"""
+    costs: dict[str, float] = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        parts = line[len("import time:"):].split("|")
+        try:
+            self_us = int(parts[0])
+        except ValueError:
+            continue  # 헤더 줄
+        package = parts[2].strip().split(".")[0]
+        costs[package] = costs.get(package, 0.0) + self_us / 1000
+    return dict(sorted(costs.items(), key=lambda kv: -kv[1])[:top])
+
+
+def _spawn(mode: str) -> tuple[dict, str]:
+    env = dict(os.environ)
+    env["STARTUP_T0"] = repr(time.time())
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(_MAIN_DIR), env.get("PYTHONPATH")]))
+    args = [sys.executable]
+    if mode == "import":
+        args += ["-X", "importtime"]
+        # Chroma 가 없어도 import 는 성공해야 함
+        env.update(CHROMA_HOST="127.0.0.1", CHROMA_PORT="9", CHROMA_DB_PATH=tempfile.mkdtemp(prefix="bench_chroma_"))
+    args += ["-m", "bench.startup", "--child", mode]
+
+    proc = subprocess.run(args, cwd=_MAIN_DIR, env=env, capture_output=True, text=True, timeout=600)
+    for line in proc.stdout.splitlines():
+        if line.startswith(_RESULT_PREFIX):
+            return json.loads(line[len(_RESULT_PREFIX):]), proc.stderr
+    raise RuntimeError(f"{mode} 측정 실패 (exit {proc.returncode})\n{proc.stderr[-3000:]}")
+
+
+def run_startup(repeat: int) -> dict:
+    runs: dict[str, list[dict]] = {"import": [], "ready": []}
+    import_costs: dict[str, float] = {}
+    heavy: set[str] = set()
+
+    for i in range(repeat):
+        print(f"▶ startup {i + 1}/{repeat}", flush=True)
+        result, stderr = _spawn("import")
+        runs["import"].append(result)
+        heavy.update(result["heavy_loaded"])
+        if not import_costs:
+            import_costs = _import_costs(stderr)
+        runs["ready"].append(_spawn("ready")[0])
+
+    def median(mode: str, key: str) -> float:
+        return statistics.median(r[key] for r in runs[mode])
+
+    return {
+        "revision": git_revision(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "config": {"repeat": repeat, "python": sys.version.split()[0]},
+        "results": {
+            "import": {
+                "import_ms": median("import", "import_ms"),
+                "since_spawn_ms": median("import", "since_spawn_ms"),
+                "heavy_loaded": sorted(heavy),
+                "top_packages_ms": import_costs,
+            },
+            "ready": {key: median("ready", key) for key in ("import_ms", "startup_ms", "ready_ms", "shutdown_ms")},
+        },
+    }
+
+
+def print_report(report: dict) -> None:
+    imp, ready = report["results"]["import"], report["results"]["ready"]
+    print(f"\n== startup @ {report['revision']} ({report['timestamp']}, median of {report['config']['repeat']}) ==")
+    print(f"import main        {imp['import_ms']:>9.1f} ms  (프로세스 시작부터 {imp['since_spawn_ms']:.1f} ms)")
+    print(f"  heavy at import  {', '.join(imp['heavy_loaded']) or '-'}")
+    print("  top packages     " + ", ".join(f"{k} {v:.0f}" for k, v in imp["top_packages_ms"].items()))
+    print(f"ready (대역 포함)  import {ready['import_ms']:.1f} / lifespan {ready['startup_ms']:.1f} ms")
+    print(f"time-to-ready      {ready['ready_ms']:>9.1f} ms")
+    print(f"shutdown           {ready['shutdown_ms']:>9.1f} ms")
+
+
+def check(report: dict, args) -> list[str]:
+    """회귀 판정: 실패 사유 목록 (없으면 통과)"""
+    imp, ready = report["results"]["import"], report["results"]["ready"]
+    failures = []
+    if imp["heavy_loaded"]:
+        failures.append(f"import 시점에 무거운 모듈 로드: {', '.join(imp['heavy_loaded'])}")
+    if args.max_import_ms and imp["import_ms"] > args.max_import_ms:
+        failures.append(f"import {imp['import_ms']:.0f}ms > {args.max_import_ms:.0f}ms")
+    if args.max_ready_ms and ready["ready_ms"] > args.max_ready_ms:
+        failures.append(f"time-to-ready {ready['ready_ms']:.0f}ms > {args.max_ready_ms:.0f}ms")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            base = json.load(f)["results"]
+        for mode, key in (("import", "import_ms"), ("ready", "ready_ms")):
+            b, h = base[mode][key], report["results"][mode][key]
+            print(f"  {mode}.{key:<12}{b:>10.1f} → {h:>10.1f}  {(h - b) / b * 100:+6.1f}%")
+            if h > b * (1 + args.tolerance):
+                failures.append(f"{mode}.{key} {b:.0f}ms → {h:.0f}ms (허용 +{args.tolerance:.0%})")
+    return failures
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="MCP server 시작 시간 벤치마크")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--max-import-ms", type=float, default=None)
+    parser.add_argument("--max-ready-ms", type=float, default=None)
+    parser.add_argument("--baseline", default=None, help="비교할 이전 startup 결과 JSON")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="기준 대비 허용 증가율 (기본 20%%)")
+    parser.add_argument("--out", default=None, help="결과 JSON 경로 (기본: bench/results/startup-<rev>.json)")
+    parser.add_argument("--child", choices=("import", "ready"), help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.child == "import":
+        _child_import()
+        return
+    if args.child == "ready":
+        import asyncio
+        asyncio.run(_child_ready())
+        return
+
+    report = run_startup(args.repeat)
+    print_report(report)
+
+    out = Path(args.out) if args.out else RESULTS_DIR / f"startup-{report['revision']}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+    print(f"saved: {out}")
+
+    failures = check(report, args)
+    for reason in failures:
+        print(f"❌ {reason}")
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
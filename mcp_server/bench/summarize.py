@@ -0,0 +1,146 @@
+# bench/summarize.py
+"""
+요약 엔진 비교 벤치마크 (추출 요약 vs LLM 요약)
+
+    cd mcp_server
+    python -m bench.summarize --repeat 5                               # Ollama stub (토큰당 지연으로 생성 시간 흉내)
+    python -m bench.summarize --ollama-url http://localhost:11434      # 실제 Ollama (길이 / 품질 비교는 이쪽이 의미 있음)
+
+입력: 한국어 이력서 fixture, 영문 이력서(bench.pdf), 사람인 공고 fixture, 이력서 + 공고(청크 2개 이상)
+입력마다 엔진별 지연(중앙값 / 최대)과 출력 길이(글자 수, 원문 대비 비율)를 기록
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+from bench.run import RESULTS_DIR, git_revision
+
+FIXTURES = Path(__file__).parent / "fixtures"
+ENGINES = ("extractive", "llm")
+
+
+def load_inputs() -> dict[str, str]:
+    from api.services.html_parse import detail_to_markdown
+    from bench.pdf import RESUME_LINES
+
+    resume_ko = (FIXTURES / "summarize" / "resume_ko.txt").read_text(encoding="utf-8")
+    jd_ko, _ = detail_to_markdown((FIXTURES / "saramin" / "detail.html").read_text(encoding="utf-8"))
+    return {
+        "resume_ko": resume_ko,
+        "resume_en": "\n".join(RESUME_LINES),
+        "jd_ko": jd_ko,
+        # 청크 분할(6000자) + 통합 요약까지 타는 긴 입력
+        "resume_jd_long": "\n\n".join([resume_ko, jd_ko] * 3),
+    }
+
+
+async def _setup_ollama(args) -> None:
+    import httpx
+    import ollama_client
+
+    if args.ollama_url:
+        await ollama_client.create_client()
+        return
+
+    from bench.fakes import OllamaStubConfig, create_ollama_app
+
+    stub = create_ollama_app(OllamaStubConfig(
+        token_latency=args.token_latency,
+        output_tokens=args.output_tokens,
+        load_latency=0.0,
+    ))
+    ollama_client.ollama_http_client = httpx.AsyncClient(transport=httpx.ASGITransport(app=stub), timeout=300.0)
+
+
+async def run_bench(args) -> dict:
+    if args.ollama_url:
+        # ollama.py 가 import 시점에 주소를 읽음
+        os.environ["OLLAMA_BASE_URL"] = args.ollama_url
+    import ollama_client
+    from api.services.summarize import summarize_text
+    from api.services.workers import shutdown_process_pool, warm_process_pool
+
+    await _setup_ollama(args)
+    # 앱 lifespan 처럼 워커 프로세스를 미리 띄워 둠 (긴 텍스트의 추출 요약은 워커에서 실행)
+    await warm_process_pool("api.services.extractive")
+    inputs = load_inputs()
+    results: dict[str, dict] = {}
+    try:
+        for name, text in inputs.items():
+            results[name] = {"input_chars": len(text)}
+            for engine in ENGINES:
+                latencies, output = [], ""
+                for i in range(args.repeat):
+                    print(f"▶ {name} / {engine} {i + 1}/{args.repeat}", flush=True)
+                    start = time.perf_counter()
+                    output = await summarize_text(text, language="ko", style="structured", engine=engine)
+                    latencies.append((time.perf_counter() - start) * 1000)
+                results[name][engine] = {
+                    "p50_ms": statistics.median(latencies),
+                    "max_ms": max(latencies),
+                    "output_chars": len(output),
+                    "ratio": len(output) / len(text) if text else 0.0,
+                    "sample": output[:300],
+                }
+    finally:
+        await ollama_client.close_client()
+        shutdown_process_pool()
+
+    return {
+        "revision": git_revision(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "config": {
+            "repeat": args.repeat,
+            "ollama": args.ollama_url or "stub",
+            "token_latency": None if args.ollama_url else args.token_latency,
+            "python": sys.version.split()[0],
+        },
+        "results": results,
+    }
+
+
+def print_report(report: dict) -> None:
+    print(f"\n== summarize @ {report['revision']} ({report['timestamp']}, Ollama {report['config']['ollama']}) ==")
+    print(f"{'input':<16}{'chars':>7}  {'engine':<11}{'p50 ms':>10}{'max ms':>10}{'out chars':>11}{'ratio':>7}")
+    for name, r in report["results"].items():
+        for engine in ENGINES:
+            e = r[engine]
+            print(
+                f"{name:<16}{r['input_chars']:>7}  {engine:<11}{e['p50_ms']:>10.1f}{e['max_ms']:>10.1f}"
+                f"{e['output_chars']:>11}{e['ratio']:>7.2f}"
+            )
+        ext, llm = r["extractive"]["p50_ms"], r["llm"]["p50_ms"]
+        if ext > 0:
+            print(f"{'':<25}→ extractive {llm / ext:,.0f}x faster")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="요약 엔진(추출 / LLM) 지연 · 길이 비교")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--ollama-url", default=None, help="실제 Ollama 주소 (없으면 stub)")
+    parser.add_argument("--token-latency", type=float, default=0.02, help="stub 출력 토큰 1개당 지연 (초)")
+    parser.add_argument("--output-tokens", type=int, default=400, help="stub 생성 토큰 수")
+    parser.add_argument("--out", default=None, help="결과 JSON 경로 (기본: bench/results/summarize-<rev>.json)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    report = asyncio.run(run_bench(args))
+    print_report(report)
+
+    out = Path(args.out) if args.out else RESULTS_DIR / f"summarize-{report['revision']}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+    print(f"saved: {out}")
+
+
+if __name__ == "__main__":
+    main()
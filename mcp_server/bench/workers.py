@@ -0,0 +1,330 @@
+# bench/workers.py
+"""
+멀티 워커 부하 테스트 (워커 수별 처리량)
+
+    cd mcp_server
+    pip install -r bench/requirements.txt
+    python -m bench.workers --workers 1 2 4 --requests 60 --concurrency 12
+
+워커끼리 공유해야 하는 서비스는 별도 프로세스로 띄운다
+- Ollama stub: uvicorn 프로세스 (워커 합계 동시 호출 수 max_in_flight 기록)
+- Redis: fakeredis TCP 서버 (분산 세마포어 / rate limit / 세션 공유)
+- Chroma: `chroma run` 서버 (CHROMA_CLIENT=http)
+- 앱: uvicorn --workers N (MySQL = SQLite, 사람인 = fixture 는 워커마다 프로세스 안 대역)
+
+워커 수를 늘렸을 때 처리량이 늘어나는지, 그리고 Ollama 동시 호출 수가 워커 수와 무관하게
+OLLAMA_MAX_CONCURRENCY 이하로 유지되는지 확인한다.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+
+from bench.pdf import make_resume_pdf
+from bench.run import JOB_URL, RESULTS_DIR, git_revision, summarize
+
+SCENARIOS = ("chat_start", "interview_questions", "trend_jobfit")
+
+_MAIN_DIR = Path(__file__).resolve().parent.parent
+
+
+# -----------------------
+# 워커 프로세스 (uvicorn --factory)
+# -----------------------
+def create_app():
+    """uvicorn bench.workers:create_app --factory --workers N"""
+    from bench.fakes import install_fakes
+
+    app, _, _ = install_fakes(
+        ollama=None,
+        chroma_dir=None,
+        redis=False,
+        saramin_latency=float(os.environ.get("BENCH_SARAMIN_LATENCY", 0.05)),
+        trend_rows_per_cat=int(os.environ.get("BENCH_TREND_ROWS", 300)),
+    )
+    return app
+
+
+# -----------------------
+# 공유 서비스 (자식 프로세스)
+# -----------------------
+def _serve_ollama(port: int, args) -> None:
+    import uvicorn
+    from bench.fakes import OllamaStubConfig, create_ollama_app
+
+    config = OllamaStubConfig(
+        token_latency=args.token_latency,
+        embed_latency=args.embed_latency,
+        parallel=args.ollama_parallel,
+    )
+    uvicorn.run(create_ollama_app(config), host="127.0.0.1", port=port, log_level="warning")
+
+
+def _serve_redis(port: int) -> None:
+    from fakeredis import TcpFakeServer
+
+    server = TcpFakeServer(("127.0.0.1", port), server_type="redis")
+    server.serve_forever()
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _env() -> dict:
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(_MAIN_DIR), env.get("PYTHONPATH")]))
+    return env
+
+
+def _spawn(args: list[str], env: dict | None = None, log: Path | None = None) -> subprocess.Popen:
+    out = open(log, "w") if log else subprocess.DEVNULL
+    return subprocess.Popen(args, cwd=_MAIN_DIR, env=env or _env(), stdout=out, stderr=subprocess.STDOUT)
+
+
+async def _wait_http(url: str, timeout: float, proc: subprocess.Popen) -> None:
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient(timeout=2) as client:
+        while time.monotonic() < deadline:
+            if proc.poll() is not None:
+                raise RuntimeError(f"프로세스 종료됨 (exit {proc.returncode}): {url}")
+            try:
+                if (await client.get(url)).status_code < 500:
+                    return
+            except httpx.HTTPError:
+                pass
+            await asyncio.sleep(0.3)
+    raise TimeoutError(f"준비되지 않음: {url}")
+
+
+async def _wait_redis(port: int, timeout: float) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            _, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.close()
+            return
+        except OSError:
+            await asyncio.sleep(0.2)
+    raise TimeoutError("fakeredis 서버가 준비되지 않음")
+
+
+def _stop(proc: subprocess.Popen | None) -> None:
+    if proc is None or proc.poll() is not None:
+        return
+    proc.terminate()
+    try:
+        proc.wait(timeout=20)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+
+
+# -----------------------
+# 부하
+# -----------------------
+async def _drive(n: int, concurrency: int, call) -> dict:
+    sem = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+    errors = 0
+
+    async def one(i: int):
+        nonlocal errors
+        async with sem:
+            start = time.perf_counter()
+            try:
+                res = await call(i)
+                if res.status_code >= 400:
+                    errors += 1
+                    return
+            except httpx.HTTPError:
+                errors += 1
+                return
+            latencies.append(time.perf_counter() - start)
+
+    wall_start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(n)))
+    return summarize(latencies, errors, time.perf_counter() - wall_start)
+
+
+async def _run_workers(workers: int, args, shared: dict, tmp: Path) -> dict:
+    ollama_port, app_port = _free_port(), _free_port()
+    ollama = _spawn(
+        [sys.executable, "-m", "bench.workers", "--serve", "ollama", "--port", str(ollama_port),
+         "--token-latency", str(args.token_latency), "--embed-latency", str(args.embed_latency),
+         "--ollama-parallel", str(args.ollama_parallel)],
+    )
+    app = None
+    try:
+        await _wait_http(f"http://127.0.0.1:{ollama_port}/api/tags", 60, ollama)
+
+        metrics_dir = tmp / f"prometheus-{workers}"
+        metrics_dir.mkdir()
+        env = _env()
+        env.update(
+            WEB_CONCURRENCY=str(workers),
+            MULTI_WORKER="true",
+            REDIS_URL=f"redis://127.0.0.1:{shared['redis_port']}/0",
+            OLLAMA_BASE_URL=f"http://127.0.0.1:{ollama_port}",
+            OLLAMA_MAX_CONCURRENCY=str(args.ollama_parallel),
+            CHROMA_CLIENT="http",
+            CHROMA_HOST="127.0.0.1",
+            CHROMA_PORT=str(shared["chroma_port"]),
+            CPU_WORKERS=str(args.cpu_workers),
+            MODEL_WATCH_INTERVAL="0",
+            PROMETHEUS_MULTIPROC_DIR=str(metrics_dir),
+            BENCH_SARAMIN_LATENCY=str(args.saramin_latency),
+        )
+        app = _spawn(
+            [sys.executable, "-m", "uvicorn", "bench.workers:create_app", "--factory",
+             "--host", "127.0.0.1", "--port", str(app_port), "--workers", str(workers), "--log-level", "warning"],
+            env=env,
+            log=tmp / f"app-{workers}.log",
+        )
+        await _wait_http(f"http://127.0.0.1:{app_port}/metrics", 180, app)
+        # 첫 워커가 응답해도 나머지 워커의 lifespan 이 끝날 때까지 잠깐 대기
+        await asyncio.sleep(args.settle)
+
+        pdf_bytes = make_resume_pdf()
+        results: dict = {}
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{app_port}", timeout=600) as client:
+
+            async def chat_start(i: int):
+                return await client.post(
+                    "/chat/start",
+                    data={"url": JOB_URL, "session_id": f"w{workers}-{i}"},
+                    files={"file": ("resume.pdf", pdf_bytes, "application/pdf")},
+                )
+
+            async def interview_questions(i: int):
+                return await client.post(
+                    "/interview/questions",
+                    data={"jc_code": "2", "job_name": "백엔드 개발자", "url": JOB_URL, "n_questions": "5"},
+                    files={"file": ("resume.pdf", pdf_bytes, "application/pdf")},
+                )
+
+            async def trend_jobfit(i: int):
+                return await client.post("/trend/jobfit", json={"job_cat": "IT개발·데이터"})
+
+            calls = {"chat_start": chat_start, "interview_questions": interview_questions, "trend_jobfit": trend_jobfit}
+            for name in args.scenarios:
+                print(f"▶ workers={workers} {name}", flush=True)
+                results[name] = await _drive(args.requests, args.concurrency, calls[name])
+
+            stats = (await client.get(f"http://127.0.0.1:{ollama_port}/bench/stats")).json()
+        return {"results": results, "ollama": stats}
+    finally:
+        _stop(app)
+        _stop(ollama)
+
+
+async def run_workers(args) -> dict:
+    tmp = Path(tempfile.mkdtemp(prefix="bench_workers_"))
+    redis_port, chroma_port = _free_port(), _free_port()
+    redis = _spawn([sys.executable, "-m", "bench.workers", "--serve", "redis", "--port", str(redis_port)])
+    chroma_bin = shutil.which("chroma") or str(Path(sys.executable).parent / "chroma")
+    chroma = _spawn(
+        [chroma_bin, "run", "--path", str(tmp / "chroma"), "--host", "127.0.0.1", "--port", str(chroma_port)],
+        log=tmp / "chroma.log",
+    )
+    runs: dict = {}
+    try:
+        await _wait_redis(redis_port, 30)
+        await _wait_http(f"http://127.0.0.1:{chroma_port}/api/v2/heartbeat", 60, chroma)
+        shared = {"redis_port": redis_port, "chroma_port": chroma_port}
+        for workers in args.workers:
+            runs[str(workers)] = await _run_workers(workers, args, shared, tmp)
+    finally:
+        _stop(chroma)
+        _stop(redis)
+
+    return {
+        "revision": git_revision(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "config": {
+            "workers": args.workers,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "token_latency": args.token_latency,
+            "embed_latency": args.embed_latency,
+            "ollama_parallel": args.ollama_parallel,
+            "cpu_workers": args.cpu_workers,
+            "saramin_latency": args.saramin_latency,
+            "cpus": os.cpu_count(),
+        },
+        "runs": runs,
+        "logs": str(tmp),
+    }
+
+
+def print_report(report: dict) -> None:
+    cfg = report["config"]
+    print(f"\n== workers @ {report['revision']} ({report['timestamp']}, cpus={cfg['cpus']}) ==")
+    print(f"{'scenario':<22}{'workers':>8}{'err':>5}{'p50ms':>10}{'p95ms':>10}{'rps':>9}{'x1':>7}")
+    base = report["runs"].get(str(cfg["workers"][0]), {}).get("results", {})
+    for scenario in next(iter(report["runs"].values()))["results"]:
+        for workers, run in report["runs"].items():
+            r = run["results"][scenario]
+            b = base.get(scenario, {}).get("throughput_rps") or 0
+            speedup = f"{r['throughput_rps'] / b:.2f}" if b else "-"
+            print(
+                f"{scenario:<22}{workers:>8}{r['errors']:>5}{r['p50_ms']:>10.1f}{r['p95_ms']:>10.1f}"
+                f"{r['throughput_rps']:>9.2f}{speedup:>7}"
+            )
+    limit = cfg["ollama_parallel"]
+    for workers, run in report["runs"].items():
+        peak = run["ollama"].get("max_in_flight", 0)
+        mark = "✅" if peak <= limit else "❌"
+        print(f"{mark} workers={workers}: Ollama 동시 호출 최대 {peak} (한도 {limit})")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="MCP server 멀티 워커 부하 테스트")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--scenarios", nargs="+", default=list(SCENARIOS), choices=SCENARIOS)
+    parser.add_argument("--requests", type=int, default=60)
+    parser.add_argument("--concurrency", type=int, default=12)
+    parser.add_argument("--token-latency", type=float, default=0.001)
+    parser.add_argument("--embed-latency", type=float, default=0.002)
+    parser.add_argument("--ollama-parallel", type=int, default=4, help="stub 동시 처리 수 = OLLAMA_MAX_CONCURRENCY")
+    parser.add_argument("--cpu-workers", type=int, default=1, help="앱 워커당 HTML 파싱 프로세스 수")
+    parser.add_argument("--saramin-latency", type=float, default=0.05)
+    parser.add_argument("--settle", type=float, default=3.0, help="앱 기동 후 대기 (초)")
+    parser.add_argument("--out", default=None, help="결과 JSON 경로 (기본: bench/results/workers-<rev>.json)")
+    parser.add_argument("--serve", choices=("ollama", "redis"), help=argparse.SUPPRESS)
+    parser.add_argument("--port", type=int, help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.serve == "ollama":
+        _serve_ollama(args.port, args)
+        return
+    if args.serve == "redis":
+        _serve_redis(args.port)
+        return
+
+    report = asyncio.run(run_workers(args))
+    print_report(report)
+
+    out = Path(args.out) if args.out else RESULTS_DIR / f"workers-{report['revision']}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+    print(f"saved: {out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,19 +1,100 @@
+import asyncio
+import math
 import os
-import chromadb
+import threading
+
+from starlette.concurrency import run_in_threadpool
+
 from ollama import ollama_embed  # async embedding 함수
 from ollama import ollama_embed_batch
+from api.llm.scheduler import BATCH, INTERACTIVE
+from api.metrics import track_call
+
+CHROMA_HOST = os.getenv("CHROMA_HOST", "chroma")
+CHROMA_PORT = int(os.getenv("CHROMA_PORT", 8000))
+CHROMA_COLLECTION = os.getenv("CHROMA_COLLECTION", "rag_docs")
+# lifespan 연결 재시도 (Chroma 컨테이너가 늦게 뜨는 경우)
+CHROMA_CONNECT_RETRIES = int(os.getenv("CHROMA_CONNECT_RETRIES", 5))
+CHROMA_CONNECT_DELAY = float(os.getenv("CHROMA_CONNECT_DELAY", 1.0))
+
+# /api/embed 는 L2 정규화된 벡터를, 예전 /api/embeddings 는 정규화 전 벡터를 돌려줌
+# 기본(L2 거리) collection 에 둘이 섞이면 순위가 틀어지므로 기존 벡터를 한 번 정규화하고 metadata 에 표시
+# (방향은 같으므로 다시 임베딩할 필요 없음)
+EMBED_NORM_KEY = "embed_norm"
+_NORMALIZE_BATCH = 500
 
 # -----------------------
-# ChromaDB client
+# ChromaDB client (첫 사용 시 연결)
+# import 시점에 연결하지 않음 → Chroma 가 아직 안 떠 있어도 앱 import / 워커 재기동 가능
 # -----------------------
-client = chromadb.HttpClient(
-    host=os.getenv("CHROMA_HOST", "chroma"),
-    port=int(os.getenv("CHROMA_PORT", 8000))
-)
-
-collection = client.get_or_create_collection(
-    name=os.getenv("CHROMA_COLLECTION", "rag_docs")
-)
+_client = None
+_collection = None
+_lock = threading.Lock()
+
+
+def _new_client():
+    import chromadb  # import 만 ~0.8s → 실제로 쓸 때 로드
+    return chromadb.HttpClient(host=CHROMA_HOST, port=CHROMA_PORT)
+
+
+def get_collection():
+    global _client, _collection
+    if _collection is None:
+        with _lock:
+            if _collection is None:
+                client = _new_client()
+                _collection = client.get_or_create_collection(name=CHROMA_COLLECTION)
+                _client = client
+    return _collection
+
+
+def normalize_collection(collection) -> int:
+    """저장된 임베딩 중 길이가 1 이 아닌 것을 L2 정규화해서 다시 기록, 고친 개수 반환 (이미 표시돼 있으면 건너뜀)"""
+    meta = collection.metadata or {}
+    if meta.get(EMBED_NORM_KEY) == "l2":
+        return 0
+
+    fixed = 0
+    offset = 0
+    while True:
+        with track_call("chroma", "get"):
+            res = collection.get(include=["embeddings"], limit=_NORMALIZE_BATCH, offset=offset)
+        ids = res["ids"]
+        if not ids:
+            break
+        update_ids, update_vectors = [], []
+        for doc_id, vector in zip(ids, res["embeddings"]):
+            norm = math.sqrt(sum(float(x) * float(x) for x in vector))
+            if norm and abs(norm - 1.0) > 1e-3:
+                update_ids.append(doc_id)
+                update_vectors.append([float(x) / norm for x in vector])
+        if update_ids:
+            with track_call("chroma", "update"):
+                collection.update(ids=update_ids, embeddings=update_vectors)
+            fixed += len(update_ids)
+        offset += len(ids)
+
+    # hnsw 설정이 들어 있는 metadata 는 바꾸지 않음 (거리 함수 변경으로 거부될 수 있음)
+    if not any(k.startswith("hnsw:") for k in meta):
+        collection.modify(metadata={**meta, EMBED_NORM_KEY: "l2"})
+    return fixed
+
+
+async def connect(retries: int = CHROMA_CONNECT_RETRIES, delay: float = CHROMA_CONNECT_DELAY) -> bool:
+    """lifespan 에서 호출: 실패해도 앱은 뜨고, 첫 사용 시 다시 연결을 시도한다"""
+    for attempt in range(1, retries + 1):
+        try:
+            collection = await run_in_threadpool(get_collection)
+            print(f"✅ Chroma 연결: {CHROMA_HOST}:{CHROMA_PORT}/{CHROMA_COLLECTION}", flush=True)
+            fixed = await run_in_threadpool(normalize_collection, collection)
+            if fixed:
+                print(f"♻️ Chroma 임베딩 정규화: {CHROMA_COLLECTION} {fixed}건", flush=True)
+            return True
+        except Exception as e:
+            print(f"⚠️ Chroma 연결 실패 ({attempt}/{retries}): {e}", flush=True)
+            if attempt < retries:
+                await asyncio.sleep(delay * 2 ** (attempt - 1))
+    return False
 
 # -----------------------
 # Add document with embedding (ASYNC)
@@ -21,29 +102,37 @@ collection = client.get_or_create_collection(
 async def add_doc(doc_id: str, text: str):
     vector = await ollama_embed(text)
 
-    collection.add(
-        ids=[doc_id],
-        documents=[text],
-        embeddings=[vector]   # Chroma는 list[list[float]] 필요
-    )
+    with track_call("chroma", "add"):
+        get_collection().add(
+            ids=[doc_id],
+            documents=[text],
+            embeddings=[vector]   # Chroma는 list[list[float]] 필요
+        )
 
 
 # -----------------------
 # Search with embedding (ASYNC)
 # -----------------------
-async def search(query: str, k: int = 3) -> list[str]:
-    vector = await ollama_embed(query)
+async def search(query: str, k: int = 3, *, priority: str = INTERACTIVE) -> list[str]:
+    vector = await ollama_embed(query, priority=priority)
+    _, docs = search_by_vector(vector, k)
+    return docs
 
-    result = collection.query(
-        query_embeddings=[vector],
-        n_results=k
-    )
+
+def search_by_vector(vector: list[float], k: int = 3) -> tuple[list[str], list[str]]:
+    """이미 임베딩한 질문으로 검색 → (문서 id 목록, 문서 목록)"""
+    with track_call("chroma", "query"):
+        result = get_collection().query(
+            query_embeddings=[vector],
+            n_results=k
+        )
 
     docs = result.get("documents")
     if not docs or not docs[0]:
-        return []
+        return [], []
 
-    return docs[0]
+    ids = result.get("ids") or [[]]
+    return ids[0], docs[0]
 
 
 
@@ -58,9 +147,10 @@ def split_text(text: str, chunk_size=500, overlap=50):
 
 
 def get_document_by_doc_id(doc_id: str) -> list[str]:
-    result = collection.get(
-        where={"doc_id": doc_id}
-    )
+    with track_call("chroma", "get"):
+        result = get_collection().get(
+            where={"doc_id": doc_id}
+        )
 
     docs = result.get("documents", [])
     if not docs:
@@ -69,14 +159,17 @@ def get_document_by_doc_id(doc_id: str) -> list[str]:
     return docs
 
 
-async def search_in_document(doc_id: str, query: str, k: int = 3) -> list[str]:
-    vector = await ollama_embed(query)
+async def search_in_document(
+    doc_id: str, query: str, k: int = 3, *, priority: str = INTERACTIVE
+) -> list[str]:
+    vector = await ollama_embed(query, priority=priority)
 
-    result = collection.query(
-        query_embeddings=[vector],
-        n_results=k,
-        where={"doc_id": doc_id}
-    )
+    with track_call("chroma", "query"):
+        result = get_collection().query(
+            query_embeddings=[vector],
+            n_results=k,
+            where={"doc_id": doc_id}
+        )
 
     docs = result.get("documents")
     if not docs or not docs[0]:
@@ -85,22 +178,23 @@ async def search_in_document(doc_id: str, query: str, k: int = 3) -> list[str]:
     return docs[0]
 
 
-async def add_document(doc_id: str, full_text: str):
+async def add_document(doc_id: str, full_text: str, *, priority: str = BATCH):
     chunks = split_text(full_text)
     if not chunks:
         return
 
-    vectors = await ollama_embed_batch(chunks)
+    vectors = await ollama_embed_batch(chunks, priority=priority)
 
     if len(chunks) != len(vectors):
         raise RuntimeError("chunk/vector 개수 불일치")
 
-    collection.add(
-        ids=[f"{doc_id}_{i}" for i in range(len(chunks))],
-        documents=chunks,
-        embeddings=vectors,
-        metadatas=[{"doc_id": doc_id, "chunk_index": i} for i in range(len(chunks))]
-    )
+    with track_call("chroma", "add"):
+        get_collection().add(
+            ids=[f"{doc_id}_{i}" for i in range(len(chunks))],
+            documents=chunks,
+            embeddings=vectors,
+            metadatas=[{"doc_id": doc_id, "chunk_index": i} for i in range(len(chunks))]
+        )
     print(f"✅ added to chroma: {doc_id}", flush=True)
 
 
@@ -25,5 +25,14 @@ pull_if_missing "$OLLAMA_CHAT_MODEL"
 pull_if_missing "$OLLAMA_EMBED_MODEL"
 pull_if_missing "$OLLAMA_CRAWL_MODEL"
 
-echo "▶ Start MCP Server"
-exec uvicorn main:app --host 0.0.0.0 --port 3333
+# 멀티 워커: WEB_CONCURRENCY > 1 이면 워커 간 상태는 Redis / Chroma 서버로 공유
+# /metrics 는 워커별 기록 파일을 합산 (재시작 시 이전 파일 정리)
+WORKERS="${WEB_CONCURRENCY:-1}"
+if [ "$WORKERS" -gt 1 ]; then
+  export PROMETHEUS_MULTIPROC_DIR="${PROMETHEUS_MULTIPROC_DIR:-/tmp/mcp_prometheus}"
+  rm -rf "$PROMETHEUS_MULTIPROC_DIR"
+  mkdir -p "$PROMETHEUS_MULTIPROC_DIR"
+fi
+
+echo "▶ Start MCP Server (workers: $WORKERS)"
+exec uvicorn main:app --host 0.0.0.0 --port 3333 --workers "$WORKERS"
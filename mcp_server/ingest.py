@@ -1,5 +1,6 @@
 import os
 from chroma_db import add_document
+from api.llm.scheduler import BACKGROUND
 
 DOCS_PATH = "/app/data/docs"
 
@@ -40,7 +41,7 @@ async def ingest_docs():
 
             doc_id = filename
 
-            await add_document(doc_id, text)
+            await add_document(doc_id, text, priority=BACKGROUND)
 
         except Exception as e:
             print(f"❌ Failed to ingest {filename}: {e}")
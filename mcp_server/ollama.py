@@ -1,8 +1,21 @@
 # ollama.py
 import os
+import json
+import math
 import asyncio
+from contextlib import nullcontext
 from fastapi import HTTPException
 from ollama_client import get_client
+from api.llm.scheduler import scheduler, BATCH
+from api.llm.batcher import EmbedBatcher
+from api.llm.profiles import GenerationProfile, DEFAULT_PROFILE, get_profile
+from api.llm.prompt import AssembledPrompt
+from api.llm.models import model_manager
+from api.services.deadline import Deadline
+from api.metrics import (
+    track_call, stage_timer, count_error, record_ollama_usage, record_generation,
+    PROMPT_TOKENS, GENERATION_TOKENS_ABANDONED,
+)
 
 OLLAMA_URL = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
 CHAT_MODEL = os.getenv("OLLAMA_CHAT_MODEL", "gemma3:4b")
@@ -19,62 +32,206 @@ def _get_client():
     return client
 
 
-async def ollama_embed(text: str) -> list[float]:
-    if not text or not text.strip():
-        raise HTTPException(status_code=400, detail="embedding text가 비어있음")
+# 여러 요청의 단건 임베딩을 잠깐 모아서 /api/embed 한 번으로 전송
+# (false 면 예전처럼 텍스트마다 /api/embeddings 호출)
+EMBED_BATCH_ENABLED = os.getenv("EMBED_BATCH_ENABLED", "true").lower() == "true"
 
-    payload = {
+
+async def _embed_batch_request(
+    texts: list[str],
+    priority: str,
+    session_id: str | None,
+) -> list[list[float]]:
+    payload = model_manager.apply({
         "model": EMBED_MODEL,
-        "prompt": text.strip()
-    }
+        "input": texts,
+    })
 
     client = _get_client()
-    res = await client.post(f"{OLLAMA_URL}/api/embeddings", json=payload)
+    async with scheduler.slot(priority, session_id):
+        with stage_timer("embed"), track_call("ollama", "embed"):
+            res = await client.post(f"{OLLAMA_URL}/api/embed", json=payload)
 
     if res.status_code != 200:
+        count_error("ollama", "embed")
         raise HTTPException(
             status_code=500,
             detail=f"Ollama embedding error: {res.text}"
         )
 
-    return res.json()["embedding"]
+    data = res.json()
+    record_ollama_usage(data.get("model", EMBED_MODEL), data)
+    model_manager.observe_load(EMBED_MODEL, data)
+    embeddings = data.get("embeddings") or []
+    if len(embeddings) != len(texts):
+        count_error("ollama", "embed")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Ollama embedding error: 입력 {len(texts)}개 / 결과 {len(embeddings)}개"
+        )
+    return embeddings
 
 
-async def ollama_embed_batch(texts: list[str]) -> list[list[float]]:
+embed_batcher = EmbedBatcher(_embed_batch_request)
+
+
+async def _embed_single_request(text: str, priority: str, session_id: str | None) -> list[float]:
+    payload = model_manager.apply({
+        "model": EMBED_MODEL,
+        "prompt": text
+    })
+
+    client = _get_client()
+    async with scheduler.slot(priority, session_id):
+        with stage_timer("embed"), track_call("ollama", "embed"):
+            res = await client.post(f"{OLLAMA_URL}/api/embeddings", json=payload)
+
+    if res.status_code != 200:
+        count_error("ollama", "embed")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Ollama embedding error: {res.text}"
+        )
+
+    # /api/embeddings 는 정규화 전 벡터 → /api/embed(배치 경로)와 같은 값이 되도록 L2 정규화
+    vector = res.json()["embedding"]
+    norm = math.sqrt(sum(x * x for x in vector))
+    return [x / norm for x in vector] if norm else vector
+
+
+async def ollama_embed(
+    text: str,
+    *,
+    priority: str = BATCH,
+    session_id: str | None = None,
+) -> list[float]:
+    if not text or not text.strip():
+        raise HTTPException(status_code=400, detail="embedding text가 비어있음")
+
+    if EMBED_BATCH_ENABLED:
+        return await embed_batcher.embed(text.strip(), priority=priority, session_id=session_id)
+    return await _embed_single_request(text.strip(), priority, session_id)
+
+
+async def ollama_embed_batch(
+    texts: list[str],
+    *,
+    priority: str = BATCH,
+    session_id: str | None = None,
+) -> list[list[float]]:
     if not texts:
         return []
 
+    # 마이크로배처가 EMBED_BATCH_MAX_SIZE 단위로 묶어서 전송
     return await asyncio.gather(
-        *(ollama_embed(text) for text in texts)
+        *(ollama_embed(text, priority=priority, session_id=session_id) for text in texts)
     )
 
 
-async def ollama_chat(prompt: str):
+async def _stream_until_done(client, payload: dict, profile: GenerationProfile, on_token=None) -> dict:
+    """
+    스트리밍으로 받으면서 profile.shape 가 완성되면 바로 연결을 끊는다
+    (연결이 끊기면 Ollama 도 생성을 멈춤)
+    호출 태스크가 취소돼도(클라이언트 연결 끊김 / 시간 초과) 같은 방식으로 연결이 닫힘
+    on_token: 받은 조각마다 호출 (async, WebSocket 스트리밍용)
+    """
+    parts: list[str] = []  # 스트림 1청크 ≈ 1토큰
+    try:
+        return await _read_stream(client, payload, profile, parts, on_token)
+    except asyncio.CancelledError:
+        tokens = len(parts)
+        GENERATION_TOKENS_ABANDONED.labels(profile.name).inc(tokens)
+        print(f"🛑 생성 중단 [{profile.name}] {tokens} tokens 에서 스트림 닫음", flush=True)
+        raise
+
+
+async def _read_stream(client, payload: dict, profile: GenerationProfile, parts: list[str], on_token) -> dict:
+    async with client.stream("POST", f"{OLLAMA_URL}/api/generate", json=payload) as res:
+        if res.status_code != 200:
+            body = (await res.aread()).decode("utf-8", errors="replace")
+            count_error("ollama", "generate")
+            raise HTTPException(status_code=500, detail=f"Ollama error: {body}")
+
+        async for line in res.aiter_lines():
+            if not line.strip():
+                continue
+            chunk = json.loads(line)
+            if chunk.get("error"):
+                count_error("ollama", "generate")
+                raise HTTPException(status_code=500, detail=f"Ollama error: {chunk['error']}")
+
+            if chunk.get("response"):
+                parts.append(chunk["response"])
+                if on_token is not None:
+                    await on_token(chunk["response"])
+
+            if chunk.get("done"):
+                text = "".join(parts)
+                chunk["response"] = (profile.done(text) if profile.done else None) or text
+                return chunk
+
+            if profile.done is None:
+                continue
+            shaped = profile.done("".join(parts))
+            if shaped is not None:
+                return {
+                    "model": chunk.get("model", payload["model"]),
+                    "response": shaped,
+                    "done": True,
+                    "done_reason": "shape",
+                    "eval_count": len(parts),
+                }
+
+    return {"model": payload["model"], "response": "".join(parts), "done_reason": "eof", "eval_count": len(parts)}
+
+
+async def ollama_chat(
+    prompt: str,
+    *,
+    priority: str = BATCH,
+    session_id: str | None = None,
+    profile: str | GenerationProfile = DEFAULT_PROFILE,
+    deadline: Deadline | None = None,
+    on_token=None,
+    **overrides,
+):
+    """
+    profile: api.llm.profiles 의 생성 프로필 이름 (옵션 / stop / 최대 토큰 / format)
+    deadline: 요청 마감 시간 (대기열 + 생성이 남은 시간을 넘기면 스트림을 닫고 TimeoutError)
+    on_token: 생성 조각을 받을 때마다 호출할 async 함수 (최종 answer 는 profile 로 다듬어진 값)
+    overrides: temperature, num_predict 등 프로필 옵션 덮어쓰기
+    """
     if not prompt or not prompt.strip():
         raise HTTPException(status_code=400, detail="prompt 값이 없다")
 
+    gen = get_profile(profile)
+    options = gen.payload_options(**overrides)
     payload = {
         "model": CHAT_MODEL,
         "prompt": prompt.strip(),
-        "stream": False,
-        "keep_alive": -1,
-        "options": {
-            "temperature": 0.7,
-            "top_p": 0.9,
-            "num_predict": 1000
-        }
+        # 항상 스트리밍: shape 완성 / 취소 시 연결을 닫아 Ollama 생성을 바로 멈출 수 있음
+        "stream": True,
+        "options": options,
     }
+    if gen.format:
+        payload["format"] = gen.format
+    # keep_alive / num_ctx 는 모델별 정책 (api.llm.models)
+    model_manager.apply(payload)
 
     client = _get_client()
-    res = await client.post(f"{OLLAMA_URL}/api/generate", json=payload)
+    async with deadline.stage("generate") if deadline is not None else nullcontext():
+        async with scheduler.slot(priority, session_id):
+            with stage_timer("generate"), track_call("ollama", "generate"):
+                data = await _stream_until_done(client, payload, gen, on_token)
 
-    if res.status_code != 200:
-        raise HTTPException(
-            status_code=500,
-            detail=f"Ollama error: {res.text}"
-        )
+    record_ollama_usage(data.get("model", CHAT_MODEL), data)
+    model_manager.observe_load(CHAT_MODEL, data)
+    record_generation(gen.name, data, options.get("num_predict") or 0)
 
-    data = res.json()
+    # 조립 시 추정한 토큰 수와 실제 prompt_eval_count 를 같은 라우트 라벨로 기록
+    estimated = prompt.tokens if isinstance(prompt, AssembledPrompt) else None
+    if estimated is not None and data.get("prompt_eval_count"):
+        PROMPT_TOKENS.labels(prompt.route, "ollama").observe(data["prompt_eval_count"])
 
     return {
         "success": True,
@@ -82,6 +239,9 @@ async def ollama_chat(prompt: str):
         "answer": data.get("response", ""),
         "model": data.get("model", CHAT_MODEL),
         "metadata": {
+            "profile": gen.name,
+            "prompt_tokens_estimated": estimated,
+            "done_reason": data.get("done_reason"),
             "total_duration": data.get("total_duration"),
             "load_duration": data.get("load_duration"),
             "prompt_eval_count": data.get("prompt_eval_count"),
@@ -1,12 +1,17 @@
 # mcp_server/ollama_client.py
+import os
 import httpx
 
+# 전체 상한 (요청별 마감 시간은 api.services.deadline 이 단계마다 남은 시간으로 끊음)
+OLLAMA_TIMEOUT = float(os.getenv("OLLAMA_TIMEOUT", 300))
+OLLAMA_CONNECT_TIMEOUT = float(os.getenv("OLLAMA_CONNECT_TIMEOUT", 5))
+
 ollama_http_client: httpx.AsyncClient | None = None
 
 
 async def create_client():
     global ollama_http_client
-    ollama_http_client = httpx.AsyncClient(timeout=300.0)
+    ollama_http_client = httpx.AsyncClient(timeout=httpx.Timeout(OLLAMA_TIMEOUT, connect=OLLAMA_CONNECT_TIMEOUT))
 
 
 async def close_client():
@@ -1,9 +1,43 @@
-from chroma_db import search
-from ollama import ollama_chat
+import os
+
+from chroma_db import search_by_vector
+from ollama import ollama_chat, ollama_embed
+from api.llm.scheduler import INTERACTIVE
+from api.llm.profiles import get_profile
+from api.llm.prompt import Section, assemble_prompt
+from api.services.semantic_cache import SemanticCache
+
+# 비슷한 질문 + 같은 검색 문서 → 이전 답변 재사용
+RAG_CACHE_THRESHOLD = float(os.getenv("RAG_CACHE_THRESHOLD", 0.95))
+RAG_CACHE_TTL = float(os.getenv("RAG_CACHE_TTL", 3600))
+RAG_CACHE_SIZE = int(os.getenv("RAG_CACHE_SIZE", 512))
+
+answer_cache = SemanticCache(
+    "rag_answer", ttl=RAG_CACHE_TTL, maxsize=RAG_CACHE_SIZE, threshold=RAG_CACHE_THRESHOLD
+)
+
+
+def _shareable(result: dict) -> dict:
+    """캐시에는 다른 사용자에게 돌려줘도 되는 필드만 저장 (question = 프롬프트 전체라 제외)"""
+    return {
+        "success": result.get("success", True),
+        "answer": result["answer"],
+        "model": result.get("model", ""),
+    }
 
 
 async def rag_chat(question: str):
-    docs = await search(question)
+    # 질문 임베딩은 한 번만 만들어 검색과 캐시 조회에 같이 사용
+    vector = await ollama_embed(question, priority=INTERACTIVE)
+    doc_ids, docs = search_by_vector(vector)
+
+    context_key = tuple(doc_ids)
+    cached = answer_cache.lookup(vector, context_key)
+    if cached is not None:
+        result, similarity = cached
+        print(f"♻️ RAG 답변 캐시 hit (유사도 {similarity:.3f}, 문서 {len(doc_ids)}개)", flush=True)
+        # 저장된 건 다른 사용자의 답변 → 이번 질문으로 응답 (이전 프롬프트 / 문맥은 돌려주지 않음)
+        return {**result, "question": question, "cached": True}
 
     # 기본 프롬프트 (문맥 없어도 동작)
     prompt = f"""
@@ -14,19 +48,27 @@ async def rag_chat(question: str):
 {question}
 """
 
-    # 문맥이 있을 경우만 RAG 프롬프트로 확장
+    # 문맥이 있을 경우만 RAG 프롬프트로 확장 (컨텍스트 예산 안에서 관련도 높은 문서부터)
     if docs:
-        context = "\n".join(docs)
-        prompt = f"""
-너는 문서 기반 RAG 어시스턴트야.
+        prompt = assemble_prompt(
+            [
+                """너는 문서 기반 RAG 어시스턴트야.
 아래 문맥을 참고해서 질문에 답해줘.
 문맥에 없는 내용은 추측하지 말고, 모르면 모른다고 말해.
 
 [문맥]
-{context}
+""",
+                Section("rag", items=docs),
+                f"""
 
 [질문]
-{question}
-"""
+{question}""",
+            ],
+            route="rag_chat",
+            num_predict=get_profile("default").num_predict,
+        )
 
-    return await ollama_chat(prompt)
+    result = await ollama_chat(prompt, priority=INTERACTIVE)
+    if result.get("answer", "").strip():
+        answer_cache.store(vector, context_key, _shareable(result))
+    return {**result, "cached": False}
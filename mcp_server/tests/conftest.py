@@ -0,0 +1,6 @@
+# tests/conftest.py
+import sys
+from pathlib import Path
+
+# mcp_server 루트 모듈(rag, ollama, api.*)을 그대로 import
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
@@ -0,0 +1,43 @@
+# tests/test_extractive.py
+from pathlib import Path
+
+from api.services.extractive import extractive_summary, split_sentences
+
+RESUME_KO = Path(__file__).resolve().parent.parent / "bench" / "fixtures" / "summarize" / "resume_ko.txt"
+
+
+def test_long_unpunctuated_text_stays_within_max_chars():
+    # 문장부호 / 줄바꿈 없는 긴 영문 (PDF 추출에서 흔한 형태) → 한 문장이 max_chars 를 넘음
+    words = [f"word{i % 97} skill{i % 13}, project{i % 7}" for i in range(400)]
+    text = " ".join(words)
+    assert len(text) > 9000 and "." not in text
+
+    summary = extractive_summary(text, max_chars=1200, style="bullet")
+
+    assert summary
+    assert len(summary) <= 1200
+
+
+def test_abbreviations_do_not_split_sentences():
+    text = (
+        "Education: B.S. in Computer Science, Ph.D. in Machine Learning at Korea Univ.\n"
+        "Worked with Dr. Kim on e.g. search ranking and i.e. retrieval quality. Shipped three services."
+    )
+    sentences = [s for s, _ in split_sentences(text)]
+
+    assert sentences[0] == "Education: B.S. in Computer Science, Ph.D. in Machine Learning at Korea Univ."
+    assert sentences[1] == "Worked with Dr. Kim on e.g. search ranking and i.e. retrieval quality."
+    assert sentences[2] == "Shipped three services."
+
+
+def test_korean_sentence_endings_still_split():
+    text = "결제 API 응답 시간을 개선했습니다 배치 처리 시간을 6시간에서 40분으로 줄였다 그 외 운영 업무."
+    assert len(split_sentences(text)) == 3
+
+
+def test_structured_summary_counts_heading_lines_within_max_chars():
+    text = RESUME_KO.read_text(encoding="utf-8")
+    for max_chars in (200, 300, 600, 1200):
+        summary = extractive_summary(text, max_chars=max_chars, style="structured")
+        assert "[" in summary  # 소제목이 실제로 들어간 출력
+        assert len(summary) <= max_chars
@@ -0,0 +1,81 @@
+# tests/test_job_index.py
+"""job_trend 역색인: 주기적 전체 재색인으로 수정 / 삭제된 공고 반영"""
+import asyncio
+
+from api.services import job_index as job_index_module
+from api.services.job_index import JobIndex
+
+
+class _Cursor:
+    def __init__(self, table):
+        self.table = table
+        self.rows = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, sql, args=None):
+        rows = sorted(self.table.values())
+        if "WHERE id >" in sql:
+            last_id, limit = args
+            rows = [r for r in rows if r[0] > last_id][:limit]
+        self.rows = rows
+
+    async def fetchall(self):
+        return self.rows
+
+
+class _Conn:
+    def __init__(self, table):
+        self.table = table
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def cursor(self):
+        return _Cursor(self.table)
+
+
+class _Pool:
+    def __init__(self, table):
+        self.table = table
+
+    def acquire(self):
+        return _Conn(self.table)
+
+
+def _row(id, tech):
+    return (id, "IT개발·데이터", f"공고 {id}", "회사", f"https://example.com/{id}", tech, "백엔드")
+
+
+def _hits(index, query):
+    return {p["title"] for p in index.search("IT개발·데이터", query)["jobs"]}
+
+
+def test_periodic_full_rebuild_drops_edited_and_deleted_postings(monkeypatch):
+    table = {1: _row(1, "Python, Django"), 2: _row(2, "Java, Spring"), 3: _row(3, "Python")}
+    pool = _Pool(table)
+    index = JobIndex()
+
+    assert asyncio.run(index.refresh(pool)) == 3
+    assert _hits(index, "Python") == {"공고 1", "공고 3"}
+
+    # 공고 1 수정, 공고 3 삭제 → 증분 갱신으로는 반영되지 않음
+    table[1] = _row(1, "Go")
+    del table[3]
+    asyncio.run(index.refresh(pool))
+    assert _hits(index, "Python") == {"공고 1", "공고 3"}
+
+    # 전체 재색인 주기가 지나면 반영
+    monkeypatch.setattr(job_index_module, "JOB_INDEX_FULL_REBUILD_INTERVAL", 1)
+    index._last_full -= 10
+    assert asyncio.run(index.refresh(pool)) == 2
+    assert _hits(index, "Python") == set()
+    assert _hits(index, "Go") == {"공고 1"}
+    assert index.generation == 1
@@ -0,0 +1,46 @@
+# tests/test_job_vectors.py
+"""공고 벡터 색인: job_index 전체 재색인 후 수정 / 삭제된 공고 대조"""
+import asyncio
+
+import chromadb
+
+from api.services import job_vectors
+from api.services.job_index import JobIndex, JobPosting, _CategoryIndex
+
+
+async def _fake_embed(docs, **kwargs):
+    return [[float(len(d)), 1.0, 0.5] for d in docs]
+
+
+def _load(index, *postings):
+    index._cats = {}
+    for p in postings:
+        index._cats.setdefault(p.job_cat, _CategoryIndex()).add(p)
+
+
+def test_sync_deletes_removed_and_reembeds_changed_postings(monkeypatch):
+    client = chromadb.EphemeralClient()
+    monkeypatch.setattr(job_vectors, "get_chroma", lambda: client)
+    monkeypatch.setattr(job_vectors, "ollama_embed_batch", _fake_embed)
+
+    index = JobIndex()
+    _load(
+        index,
+        JobPosting(1, "IT개발·데이터", "백엔드", "회사", "https://example.com/1", "Python", ""),
+        JobPosting(2, "IT개발·데이터", "프론트엔드", "회사", "https://example.com/2", "React", ""),
+    )
+    vectors = job_vectors.JobVectorIndex(index, "job_postings_test")
+    assert asyncio.run(vectors.sync()) == 2
+
+    # 공고 1 수정, 공고 2 삭제 후 job_index 전체 재색인
+    _load(index, JobPosting(1, "IT개발·데이터", "백엔드", "회사", "https://example.com/1", "Go", ""))
+    index.generation += 1
+
+    assert asyncio.run(vectors.sync()) == 1
+    stored = client.get_collection("job_postings_test").get(include=["documents"])
+    assert stored["ids"] == ["1"]
+    assert stored["documents"] == ["백엔드\n기술: Go"]
+    assert vectors.size() == 1
+
+    # 재시작한 워커도 대조만 하고 다시 임베딩하지 않음
+    assert asyncio.run(job_vectors.JobVectorIndex(index, "job_postings_test").sync()) == 0
@@ -0,0 +1,27 @@
+# tests/test_models.py
+"""모델 상주 정책: 같은 모델을 여러 용도로 설정했을 때 정책 병합"""
+from api.llm import models
+
+
+def test_crawl_model_same_as_chat_model_keeps_chat_policy(monkeypatch):
+    monkeypatch.setattr(models, "CRAWL_MODEL", models.CHAT_MODEL)
+    monkeypatch.setenv("OLLAMA_CHAT_KEEP_ALIVE", "-1")
+    monkeypatch.setenv("OLLAMA_CRAWL_KEEP_ALIVE", "10m")
+    monkeypatch.setenv("OLLAMA_CRAWL_NUM_CTX", str(models.OLLAMA_NUM_CTX * 2))
+    monkeypatch.setenv("JD_OCR_ENABLED", "false")
+
+    policy = models._default_policies()[models.CHAT_MODEL]
+
+    assert policy.keep_alive == -1
+    assert policy.num_ctx == models.OLLAMA_NUM_CTX * 2
+    assert policy.warm is True
+
+
+def test_longest_keep_alive_wins():
+    def policy(keep_alive):
+        return models.ModelPolicy("m", "generate", keep_alive=keep_alive, num_ctx=2048, warm=False)
+
+    assert policy("10m").merge(policy("1h")).keep_alive == "1h"
+    assert policy(300).merge(policy("4m")).keep_alive == 300
+    assert policy(0).merge(policy("30s")).keep_alive == "30s"
+    assert policy("1h").merge(policy(-1)).keep_alive == -1
@@ -0,0 +1,44 @@
+# tests/test_rag_cache.py
+"""rag_chat 의미 캐시: 다른 사용자의 프롬프트 / 문맥이 응답에 섞이지 않아야 함"""
+import asyncio
+
+import rag
+
+
+def _run(coro):
+    return asyncio.run(coro)
+
+
+def test_cache_hit_does_not_leak_previous_prompt(monkeypatch):
+    rag.answer_cache.invalidate()
+
+    # 두 질문이 거의 같은 임베딩 → 두 번째는 캐시 hit
+    vectors = {
+        "첫 번째 사용자의 비밀 질문 A": [1.0, 0.0, 0.0],
+        "두 번째 질문 B": [0.999, 0.01, 0.0],
+    }
+    calls = []
+
+    async def fake_embed(text, **kwargs):
+        return vectors[text]
+
+    async def fake_chat(prompt, **kwargs):
+        calls.append(prompt)
+        return {"success": True, "question": prompt, "answer": "공개 답변", "model": "stub", "metadata": {}}
+
+    monkeypatch.setattr(rag, "ollama_embed", fake_embed)
+    monkeypatch.setattr(rag, "ollama_chat", fake_chat)
+    monkeypatch.setattr(rag, "search_by_vector", lambda v: (["doc-1"], ["문맥: 첫 번째 사용자 이력서 내용"]))
+
+    first = _run(rag.rag_chat("첫 번째 사용자의 비밀 질문 A"))
+    second = _run(rag.rag_chat("두 번째 질문 B"))
+
+    assert first["cached"] is False
+    assert second["cached"] is True
+    assert len(calls) == 1
+    assert second["answer"] == "공개 답변"
+    assert second["question"] == "두 번째 질문 B"
+
+    leaked = str(second)
+    assert "비밀 질문 A" not in leaked
+    assert "첫 번째 사용자 이력서" not in leaked
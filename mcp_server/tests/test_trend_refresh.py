@@ -0,0 +1,39 @@
+# tests/test_trend_refresh.py
+"""/trend 요청이 job_trend 집계 갱신(MySQL 조회)을 반복해서 일으키지 않아야 함"""
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from api.routes import trend
+
+
+@pytest.fixture
+def refreshes(monkeypatch):
+    calls = []
+
+    async def fake_pool():
+        return object()
+
+    async def fake_refresh(pool):
+        calls.append(pool)
+        trend.job_trend_agg.last_refresh = 1.0
+        return set()
+
+    monkeypatch.setattr(trend, "get_mysql_pool", fake_pool)
+    monkeypatch.setattr(trend.job_trend_agg, "refresh", fake_refresh)
+    monkeypatch.setattr(trend.job_trend_agg, "last_refresh", None)
+    return calls
+
+
+def test_unknown_job_cat_is_rejected_without_refresh(refreshes):
+    with pytest.raises(HTTPException) as e:
+        asyncio.run(trend.jobfit(trend.TrendRequest(job_cat="없는 직무")))
+    assert e.value.status_code == 400
+    assert refreshes == []
+
+
+def test_empty_category_refreshes_only_until_first_load(refreshes):
+    for _ in range(3):
+        asyncio.run(trend.jobfit(trend.TrendRequest(job_cat="디자인")))
+    assert len(refreshes) == 1
@@ -0,0 +1,36 @@
+# tests/test_trend_rerank.py
+"""/trend/jobfit LLM 재정렬 점수 스케일 (0~10)"""
+import asyncio
+import json
+
+from api.routes import trend
+
+CANDIDATES = [
+    {"keyword": k, "score": 5.0, "count": 3}
+    for k in ("Python", "Django", "AWS", "Docker", "Redis", "Kafka")
+]
+
+
+def _rerank(monkeypatch, scores: list[float]) -> list[dict]:
+    answer = {"keywords": [{"keyword": c["keyword"], "score": s} for c, s in zip(CANDIDATES, scores)]}
+
+    async def fake_chat(prompt, **kwargs):
+        return {"answer": json.dumps(answer)}
+
+    monkeypatch.setattr(trend, "ollama_chat", fake_chat)
+    return asyncio.run(trend._llm_rerank("IT개발·데이터", CANDIDATES))
+
+
+def test_low_scores_on_ten_point_scale_are_not_inflated(monkeypatch):
+    result = _rerank(monkeypatch, [9, 7, 4, 1, 0.5])
+    assert [r["score"] for r in result] == [9, 7, 4, 1, 0.5]
+
+
+def test_scores_are_clamped_to_ten_point_scale(monkeypatch):
+    result = _rerank(monkeypatch, [15, -2, 6])
+    assert [r["score"] for r in result] == [10, 0, 6]
+
+
+def test_unit_scale_answer_is_rescaled_when_every_score_is_at_most_one(monkeypatch):
+    result = _rerank(monkeypatch, [0.9, 0.7, 0.3])
+    assert [r["score"] for r in result] == [9, 7, 3]